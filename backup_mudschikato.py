@@ -0,0 +1,227 @@
+"""
+backup_mudschikato.py
+---------------------
+Inkrementelles, deduplizierendes Backup aller Mudschikato-Datendateien.
+- Dateien werden in Blöcke zerlegt, jeder Block per Hash adressiert und nur einmal gespeichert
+- Unveränderte Dateien (Größe + mtime wie im letzten Snapshot) werden gar nicht gelesen
+- Blöcke werden beim Schreiben gestreamt komprimiert (zlib)
+- Snapshots sind kleine JSON-Dateien (Datei -> Blockliste), Wiederherstellung pro Snapshot
+- Alte Snapshots werden ausgedünnt, nicht mehr benutzte Blöcke entfernt
+"""
+
+import os
+import json
+import zlib
+import hashlib
+import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from PyQt6.QtCore import QThread, pyqtSignal
+from logging_mudschikato import LOGFILE, flush_log, log_event, resync_log
+
+BACKUPDIR = "mudschikato_backup"
+BACKUP_CHUNK = 1024 * 1024   # Blockgröße; angehängte Zeilen (Log) ändern nur den letzten Block
+KEEP_SNAPSHOTS = 30          # so viele Snapshots bleiben erhalten
+COMPRESS_LEVEL = 6
+
+# Datendateien der Module (Namen wie in den jeweiligen Modulen)
+BACKUP_DATEIEN = [
+    "mudschikato_todos.txt",
+    "mudschikato_kalender.txt",
+    "mudschikato_wiki.json",
+    "mudschikato_settings.json",
+    "mudschikato_playlist.txt",
+    "feedback_notes.json",
+    LOGFILE,
+]
+
+class BackupStore:
+    """
+    Ablage im Verzeichnis BACKUPDIR:
+      chunks/ab/abcdef....z   komprimierter Block, Name = blake2b des Klartexts
+      snapshots/<Zeit>.json   {Datei: {"size", "mtime_ns", "chunks": [...]}}
+    """
+    def __init__(self, root: str = BACKUPDIR):
+        self.root = root
+        self.chunk_dir = os.path.join(root, "chunks")
+        self.snap_dir = os.path.join(root, "snapshots")
+        os.makedirs(self.chunk_dir, exist_ok=True)
+        os.makedirs(self.snap_dir, exist_ok=True)
+
+    # --- Blöcke ---
+    def chunk_path(self, digest: str) -> str:
+        return os.path.join(self.chunk_dir, digest[:2], digest + ".z")
+
+    def put_chunk(self, data: bytes) -> Tuple[str, int]:
+        """Speichert einen Block (falls neu); liefert (Hash, geschriebene Bytes)."""
+        digest = hashlib.blake2b(data, digest_size=20).hexdigest()
+        path = self.chunk_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        comp = zlib.compressobj(COMPRESS_LEVEL)
+        tmp = path + ".tmp"
+        written = 0
+        with open(tmp, "wb") as f:
+            view = memoryview(data)
+            for pos in range(0, len(view), 64 * 1024):
+                out = comp.compress(view[pos:pos + 64 * 1024])
+                f.write(out)
+                written += len(out)
+            out = comp.flush()
+            f.write(out)
+            written += len(out)
+        os.replace(tmp, path)  # halb geschriebene Blöcke gibt es nie unter dem echten Namen
+        return digest, written
+
+    def read_chunk(self, digest: str, out) -> int:
+        """Entpackt einen Block gestreamt nach out und prüft den Hash."""
+        decomp = zlib.decompressobj()
+        h = hashlib.blake2b(digest_size=20)
+        size = 0
+        with open(self.chunk_path(digest), "rb") as f:
+            while True:
+                raw = f.read(64 * 1024)
+                if not raw:
+                    break
+                data = decomp.decompress(raw)
+                h.update(data)
+                out.write(data)
+                size += len(data)
+        data = decomp.flush()
+        h.update(data)
+        out.write(data)
+        size += len(data)
+        if h.hexdigest() != digest:
+            raise ValueError(f"Block beschädigt: {digest}")
+        return size
+
+    # --- Snapshots ---
+    def snapshots(self) -> List[str]:
+        """Snapshot-Namen, älteste zuerst."""
+        return sorted(n[:-5] for n in os.listdir(self.snap_dir) if n.endswith(".json"))
+
+    def load_snapshot(self, name: str) -> Dict[str, dict]:
+        with open(os.path.join(self.snap_dir, name + ".json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def write_snapshot(self, files: Dict[str, dict]) -> str:
+        name = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        path = os.path.join(self.snap_dir, name + ".json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(files, f, ensure_ascii=False, indent=1)
+        os.replace(path + ".tmp", path)
+        return name
+
+    def backup(self, paths: List[str] = None,
+               progress: Optional[Callable[[int, int], None]] = None, prune: bool = True) -> dict:
+        """
+        Sichert paths inkrementell. Dateien mit gleicher Größe und mtime wie im letzten
+        Snapshot übernehmen dessen Blockliste ungelesen. Ist gar nichts geändert,
+        wird kein neuer Snapshot geschrieben. prune=False lässt alte Snapshots stehen
+        (Sicherung vor dem Wiederherstellen, das Ziel darf nicht verschwinden).
+        """
+        paths = BACKUP_DATEIEN if paths is None else paths
+        flush_log()  # gepufferte Log-Einträge gehören mit ins Backup
+        names = self.snapshots()
+        last = self.load_snapshot(names[-1]) if names else {}
+        files = {}
+        stats = {"snapshot": None, "gelesen": 0, "unveraendert": 0, "neue_bloecke": 0, "geschrieben": 0}
+        for i, path in enumerate(paths):
+            if progress:
+                progress(i, len(paths))
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue  # Datei (noch) nicht vorhanden
+            old = last.get(path)
+            if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+                files[path] = old
+                stats["unveraendert"] += 1
+                continue
+            chunks, size = [], 0
+            with open(path, "rb") as f:
+                while True:
+                    data = f.read(BACKUP_CHUNK)
+                    if not data:
+                        break
+                    digest, written = self.put_chunk(data)
+                    chunks.append(digest)
+                    size += len(data)
+                    if written:
+                        stats["neue_bloecke"] += 1
+                        stats["geschrieben"] += written
+            files[path] = {"size": size, "mtime_ns": st.st_mtime_ns, "chunks": chunks}
+            stats["gelesen"] += 1
+        if progress:
+            progress(len(paths), len(paths))
+        if files != last:
+            stats["snapshot"] = self.write_snapshot(files)
+            if prune:
+                self.prune()
+        return stats
+
+    def restore(self, name: str, target_dir: str = None) -> List[str]:
+        """
+        Stellt alle Dateien eines Snapshots wieder her (am Originalort oder in target_dir).
+        Jede Datei wird erst komplett in eine Temp-Datei geschrieben und dann ersetzt.
+        """
+        restored = []
+        for path, info in self.load_snapshot(name).items():
+            dest = os.path.join(target_dir, os.path.basename(path)) if target_dir else path
+            if os.path.dirname(dest):
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+            tmp = dest + ".restore.tmp"
+            try:
+                with open(tmp, "wb") as out:
+                    size = sum(self.read_chunk(d, out) for d in info["chunks"])
+                if size != info["size"]:
+                    raise ValueError(f"Größe stimmt nicht ({size} statt {info['size']})")
+                os.replace(tmp, dest)
+            except (OSError, ValueError) as e:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                log_event(f"Wiederherstellen fehlgeschlagen: {path} ({e})", "Backup", "ERROR")
+                continue
+            restored.append(dest)
+            if dest == LOGFILE:
+                resync_log()  # Schreib-Thread kennt sonst noch die alte Größe
+        return restored
+
+    def prune(self, keep: int = None):
+        """Entfernt alte Snapshots und danach unbenutzte Blöcke (Mark & Sweep)."""
+        keep = KEEP_SNAPSHOTS if keep is None else keep
+        names = self.snapshots()
+        if len(names) <= keep:
+            return
+        for name in names[:-keep]:
+            os.remove(os.path.join(self.snap_dir, name + ".json"))
+        used = set()
+        for name in names[-keep:]:
+            for info in self.load_snapshot(name).values():
+                used.update(info["chunks"])
+        for sub in os.listdir(self.chunk_dir):
+            subdir = os.path.join(self.chunk_dir, sub)
+            for fname in os.listdir(subdir):
+                if fname[:-2] not in used:
+                    os.remove(os.path.join(subdir, fname))
+
+class BackupWorker(QThread):
+    """Backup oder Wiederherstellung im Hintergrund."""
+    backup_done = pyqtSignal(object)  # stats-dict, Liste wiederhergestellter Dateien oder Exception
+
+    def __init__(self, store: BackupStore, restore: str = None, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.restore_name = restore
+
+    def run(self):
+        try:
+            if self.restore_name:
+                # Vorher aktuellen Stand sichern, damit auch das Wiederherstellen umkehrbar ist
+                self.store.backup(prune=False)
+                result = self.store.restore(self.restore_name)
+            else:
+                result = self.store.backup()
+        except Exception as e:
+            result = e
+        self.backup_done.emit(result)
@@ -3,19 +3,30 @@ dashboard_mudschikato.py
 ------------------------
 Dashboard für Mudschikato.
 - Zeigt Status/Statistiken aller Kernmodule (z. B. ToDos offen, Dateien im Papierkorb)
+- Zähler kommen live über den Ereignis-Bus (keine Dateien lesen, keine Verzeichnisse listen)
 - Zeigt letzte Log-Einträge (max. 10)
 - Schnellzugriff auf wichtige Aktionen (Backup, Papierkorb leeren, Hilfe)
+- Backup: inkrementell und dedupliziert im Hintergrund, Wiederherstellen aus Snapshots
+- Papierkorb wird im Hintergrund geleert (ganz oder nach Alter/Größe), mit Fortschritt
 - Übersichtlicher, laienfreundlicher Startbildschirm
 """
 
-import os
+import time
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QListWidget, QPushButton, QHBoxLayout, QMessageBox
+    QWidget, QVBoxLayout, QLabel, QListWidget, QPushButton, QHBoxLayout, QMessageBox,
+    QComboBox, QProgressBar, QInputDialog
+)
+from PyQt6.QtCore import QTimer
+from logging_mudschikato import count_events, events_enabled, log_event, tail_lines
+from backup_mudschikato import BackupStore, BackupWorker
+from papierkorb_mudschikato import PURGE_OPTS, PurgeWorker, get_store
+from format_mudschikato import format_size
+from eventbus_mudschikato import (
+    get_bus, TODOS_OFFEN, TODOS_GESAMT, PAPIERKORB_ANZAHL, PAPIERKORB_BYTES, DOWNLOADS_DATEIEN,
+    DOWNLOADS_BYTES, ARCHIV_DATEIEN, ARCHIV_BYTES, WIKI_EINTRAEGE, KALENDER_FAELLIG, LOG_STRUKTURIERT
 )
-from logging_mudschikato import LOGFILE, log_event
 
-TODODATEI = "mudschikato_todos.txt"
-PAPIERKORB = "mudschikato_papierkorb"
+STATS_MS = 200  # Zähler-Änderungen sammeln, bevor die Anzeige neu gezeichnet wird
 
 class DashboardWidget(QWidget):
     def __init__(self):
@@ -23,12 +34,21 @@ class DashboardWidget(QWidget):
         self.setWindowTitle("Mudschikato Dashboard")
         self.layout = QVBoxLayout()
         
-        # ToDo-Zähler
+        # Zähler (werden von den Modulen über den Ereignis-Bus gemeldet)
         self.todo_label = QLabel("Offene Aufgaben: ?")
         self.layout.addWidget(self.todo_label)
-        # Papierkorb-Zähler
         self.papierkorb_label = QLabel("Dateien im Papierkorb: ?")
         self.layout.addWidget(self.papierkorb_label)
+        self.downloads_label = QLabel("Downloads: ?")
+        self.layout.addWidget(self.downloads_label)
+        self.archiv_label = QLabel("Archiviert seit Start: 0")
+        self.layout.addWidget(self.archiv_label)
+        self.wiki_label = QLabel("Wiki-Einträge: ?")
+        self.layout.addWidget(self.wiki_label)
+        self.kalender_label = QLabel("Fällige Termine: ?")
+        self.layout.addWidget(self.kalender_label)
+        self.fehler_label = QLabel("Fehler (24 h): ?")
+        self.layout.addWidget(self.fehler_label)
         # Letzte Log-Einträge
         self.layout.addWidget(QLabel("Letzte Aktionen:"))
         self.loglist = QListWidget()
@@ -38,6 +58,13 @@ class DashboardWidget(QWidget):
         self.btn_backup = QPushButton("Backup")
         self.btn_backup.clicked.connect(self.do_backup)
         btn_ly.addWidget(self.btn_backup)
+        self.btn_restore = QPushButton("Wiederherstellen")
+        self.btn_restore.clicked.connect(self.do_restore)
+        btn_ly.addWidget(self.btn_restore)
+        self.purge_mode = QComboBox()
+        for text, mode, value in PURGE_OPTS:
+            self.purge_mode.addItem(text, (mode, value))
+        btn_ly.addWidget(self.purge_mode)
         self.btn_clear_trash = QPushButton("Papierkorb leeren")
         self.btn_clear_trash.clicked.connect(self.clear_trash)
         btn_ly.addWidget(self.btn_clear_trash)
@@ -45,57 +72,170 @@ class DashboardWidget(QWidget):
         self.btn_help.clicked.connect(self.show_help)
         btn_ly.addWidget(self.btn_help)
         self.layout.addLayout(btn_ly)
+        self.purge_progress = QProgressBar()
+        self.purge_progress.hide()
+        self.layout.addWidget(self.purge_progress)
         self.setLayout(self.layout)
+        self.purge_worker = None
+        self.backup_worker = None
+        self.bus = get_bus()
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setSingleShot(True)
+        self.stats_timer.setInterval(STATS_MS)
+        self.stats_timer.timeout.connect(self.show_stats)
+        self.bus.counter_changed.connect(self.counter_changed)
+        get_store()  # Papierkorb-Manifest laden, meldet seine Zähler
         self.refresh_dashboard()
     
     def refresh_dashboard(self):
-        # ToDos zählen
-        open_tasks = 0
-        if os.path.exists(TODODATEI):
-            with open(TODODATEI, "r", encoding="utf-8") as f:
-                for line in f:
-                    if "\t" in line:
-                        text, state = line.strip().split("\t")
-                        if state == "0":
-                            open_tasks += 1
-        self.todo_label.setText(f"Offene Aufgaben: {open_tasks}")
-        # Papierkorb zählen
-        trash = 0
-        if os.path.exists(PAPIERKORB):
-            trash = len(os.listdir(PAPIERKORB))
-        self.papierkorb_label.setText(f"Dateien im Papierkorb: {trash}")
+        self.show_stats()
+        self.show_errors()
         # Logs einlesen
         self.loglist.clear()
-        if os.path.exists(LOGFILE):
-            with open(LOGFILE, "r", encoding="utf-8") as f:
-                lines = f.readlines()[-10:]
-            for l in lines:
-                self.loglist.addItem(l.strip())
+        for l in tail_lines(10):
+            self.loglist.addItem(l.strip())
     
+    def show_errors(self):
+        # Fehler zählen über den Event-Index (ohne das Log zu lesen)
+        if events_enabled():
+            self.fehler_label.setText(f"Fehler (24 h): {count_events(typ='ERROR', since=time.time() - 86400)}")
+        else:
+            self.fehler_label.setText("Fehler (24 h): aus (Einstellungen: strukturierte Log-Einträge)")
+
+    def counter_changed(self, name, value):
+        if name == LOG_STRUKTURIERT:
+            self.show_errors()  # Einstellung geändert (auch per Undo)
+            return
+        # Scans melden viele Deltas hintereinander, daher nur gesammelt neu anzeigen
+        if not self.stats_timer.isActive():
+            self.stats_timer.start()
+
+    def show_stats(self):
+        get = self.bus.get
+        def zahl(name):
+            value = get(name)
+            return "?" if value is None else str(value)
+        def groesse(name):
+            value = get(name)
+            return "?" if value is None else format_size(value)
+        self.todo_label.setText(f"Offene Aufgaben: {zahl(TODOS_OFFEN)} von {zahl(TODOS_GESAMT)}")
+        self.papierkorb_label.setText(
+            f"Dateien im Papierkorb: {zahl(PAPIERKORB_ANZAHL)} ({groesse(PAPIERKORB_BYTES)})")
+        self.downloads_label.setText(f"Downloads: {zahl(DOWNLOADS_DATEIEN)} Datei(en), {groesse(DOWNLOADS_BYTES)}")
+        self.archiv_label.setText(
+            f"Archiviert seit Start: {get(ARCHIV_DATEIEN, 0)} Datei(en), {format_size(get(ARCHIV_BYTES, 0))}")
+        self.wiki_label.setText(f"Wiki-Einträge: {zahl(WIKI_EINTRAEGE)}")
+        self.kalender_label.setText(f"Fällige Termine: {zahl(KALENDER_FAELLIG)}")
+
     def do_backup(self):
-        # Nur Dummy-Backup
-        log_event("Backup ausgelöst (Dummy).", "Dashboard", "INFO")
-        QMessageBox.information(self, "Backup", "Backup-Funktion ist noch ein Dummy.")
+        self.start_backup()
+
+    def do_restore(self):
+        names = BackupStore().snapshots()
+        if not names:
+            QMessageBox.information(self, "Wiederherstellen", "Noch kein Backup vorhanden.")
+            return
+        name, ok = QInputDialog.getItem(self, "Wiederherstellen", "Snapshot wählen:",
+                                        list(reversed(names)), 0, False)
+        if ok and name:
+            self.start_backup(restore=name)
+
+    def start_backup(self, restore=None):
+        if self.backup_worker is not None:
+            return
+        self.btn_backup.setEnabled(False)
+        self.btn_restore.setEnabled(False)
+        self.backup_worker = BackupWorker(BackupStore(), restore, parent=self)
+        self.backup_worker.backup_done.connect(self.backup_finished)
+        self.backup_worker.finished.connect(self.backup_worker.deleteLater)
+        self.backup_worker.start()
+
+    def backup_finished(self, result):
+        restore = self.backup_worker.restore_name
+        self.backup_worker = None
+        self.btn_backup.setEnabled(True)
+        self.btn_restore.setEnabled(True)
+        if isinstance(result, Exception):
+            log_event(f"Backup fehlgeschlagen: {result}", "Dashboard", "ERROR")
+            QMessageBox.warning(self, "Backup", f"Fehler: {result}")
+        elif restore:
+            log_event(f"Backup {restore} wiederhergestellt: {len(result)} Datei(en).", "Dashboard", "INFO")
+            QMessageBox.information(self, "Wiederherstellen",
+                f"{len(result)} Datei(en) aus {restore} wiederhergestellt.\n"
+                "Bitte Mudschikato neu starten, damit alle Module die Daten neu laden.")
+        elif result["snapshot"] is None:
+            log_event("Backup: keine Änderungen seit dem letzten Snapshot.", "Dashboard", "INFO")
+            QMessageBox.information(self, "Backup", "Keine Änderungen seit dem letzten Backup.")
+        else:
+            log_event(f"Backup {result['snapshot']}: {result['gelesen']} Datei(en) gelesen, "
+                      f"{result['unveraendert']} unverändert, {result['neue_bloecke']} neue Blöcke "
+                      f"({format_size(result['geschrieben'])}).", "Dashboard", "INFO")
+            QMessageBox.information(self, "Backup",
+                f"Backup {result['snapshot']} erstellt.\n"
+                f"{result['gelesen']} geänderte Datei(en), {format_size(result['geschrieben'])} neu gespeichert.")
+        self.refresh_dashboard()
 
     def clear_trash(self):
-        if not os.path.exists(PAPIERKORB):
-            QMessageBox.information(self, "Papierkorb", "Papierkorb ist leer.")
+        if self.purge_worker is not None:
+            self.purge_worker.cancel()  # zweiter Klick = Abbrechen
+            self.btn_clear_trash.setEnabled(False)
+            return
+        store = get_store()
+        mode, value = self.purge_mode.currentData()
+        keys = store.select(mode, value)
+        if not keys:
+            QMessageBox.information(self, "Papierkorb", "Keine passenden Einträge im Papierkorb.")
+            return
+        answer = QMessageBox.question(self, "Papierkorb",
+            f"{len(keys)} Eintrag/Einträge endgültig löschen ({self.purge_mode.currentText()})?")
+        if answer != QMessageBox.StandardButton.Yes:
             return
-        num = len(os.listdir(PAPIERKORB))
-        for fname in os.listdir(PAPIERKORB):
-            try:
-                os.remove(os.path.join(PAPIERKORB, fname))
-            except Exception:
-                pass
-        log_event(f"Papierkorb geleert: {num} Datei(en) entfernt.", "Dashboard", "INFO")
-        QMessageBox.information(self, "Papierkorb", f"{num} Datei(en) entfernt.")
+        self.purge_progress.setRange(0, len(keys))
+        self.purge_progress.setValue(0)
+        self.purge_progress.show()
+        self.purge_mode.setEnabled(False)
+        self.btn_clear_trash.setText("Abbrechen")
+        self.purge_worker = PurgeWorker(store, keys, parent=self)
+        self.purge_worker.progress.connect(self.purge_step)
+        self.purge_worker.purge_done.connect(self.purge_finished)
+        self.purge_worker.finished.connect(self.purge_worker.deleteLater)
+        self.purge_worker.start()
+
+    def purge_step(self, done, total, freed):
+        self.purge_progress.setValue(done)
+        self.purge_progress.setFormat(f"%v / %m – {format_size(freed)} frei")
+
+    def purge_finished(self, num, freed, errors):
+        self.purge_worker = None
+        self.purge_progress.hide()
+        self.purge_mode.setEnabled(True)
+        self.btn_clear_trash.setEnabled(True)
+        self.btn_clear_trash.setText("Papierkorb leeren")
+        log_event(f"Papierkorb geleert: {num} Eintrag/Einträge entfernt, {format_size(freed)} frei.",
+                  "Dashboard", "INFO")
+        text = f"{num} Eintrag/Einträge entfernt, {format_size(freed)} freigegeben."
+        if errors:
+            text += f"\n{len(errors)} konnten nicht gelöscht werden (siehe Log)."
+        QMessageBox.information(self, "Papierkorb", text)
         self.refresh_dashboard()
 
+    def shutdown(self):
+        # Beim Beenden (auch als Tab im Hauptfenster): Hintergrund-Threads abschließen
+        if self.purge_worker is not None:
+            self.purge_worker.cancel()
+            self.purge_worker.wait()
+        if self.backup_worker is not None:
+            self.backup_worker.wait()  # Backup nicht mitten im Snapshot abbrechen
+
+    def closeEvent(self, event):
+        self.shutdown()
+        super().closeEvent(event)
+
     def show_help(self):
         QMessageBox.information(self, "Hilfe", 
             "Mudschikato Dashboard\n\n"
             "- Zeigt Status aller Kernmodule\n"
-            "- Schnellzugriffe: Backup, Papierkorb leeren\n"
+            "- Schnellzugriffe: Backup, Wiederherstellen, Papierkorb leeren\n"
             "- Log: letzte Aktionen\n"
             "\nWeitere Hilfe: www.provoware.de"
         )
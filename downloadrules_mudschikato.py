@@ -0,0 +1,130 @@
+"""
+downloadrules_mudschikato.py
+----------------------------
+Regelbasiertes Auto-Aufräumen für den Downloads-Manager.
+- Regeln deklarativ in mudschikato_downloadregeln.json
+- Auswertung in einem einzigen Durchlauf über den DownloadIndex (kein Dateisystem-Zugriff)
+- Pro Datei gilt die erste passende Regel
+
+Beispiel einer Regel:
+    {"name": "Große Videos", "typ": "Video", "groesser_als_mb": 100,
+     "aelter_als_tage": 30, "aktion": "papierkorb"}
+Alle Bedingungen sind optional, "aktion" ist "archiv" oder "papierkorb".
+"""
+
+import os
+import json
+import time
+from typing import Dict, List, NamedTuple, Tuple
+from logging_mudschikato import log_event
+from filetypes_mudschikato import KAT_CODE
+from downloadscan_mudschikato import DownloadIndex
+
+REGELDATEI = "mudschikato_downloadregeln.json"
+AUTODATEI = "mudschikato_autoaufraeumen.json"   # merkt sich, ob stündlich aufgeräumt wird
+AKTIONEN = ("archiv", "papierkorb")
+
+DEFAULT_REGELN = [
+    {"name": "Alte Archive archivieren", "typ": "Archive", "aelter_als_tage": 90, "aktion": "archiv"},
+    {"name": "Große Videos in den Papierkorb", "typ": "Video", "groesser_als_mb": 100, "aktion": "papierkorb"},
+]
+
+class CompiledRule(NamedTuple):
+    name: str
+    kind: int          # None = alle Typen
+    size_min: int
+    mtime_max: float
+    aktion: str
+
+def load_rules(path: str = REGELDATEI) -> List[dict]:
+    """Lädt die Regeln; fehlt die Datei, wird sie mit Beispielregeln angelegt."""
+    if not os.path.exists(path):
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(DEFAULT_REGELN, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            log_event(f"Regeldatei konnte nicht angelegt werden: {e}", "DownloadRegeln", "ERROR")
+        return [dict(r) for r in DEFAULT_REGELN]
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            rules = json.load(f)
+    except Exception as e:
+        log_event(f"Regeldatei nicht lesbar: {e}", "DownloadRegeln", "ERROR")
+        return []
+    if not isinstance(rules, list):
+        log_event("Regeldatei muss eine Liste von Regeln enthalten.", "DownloadRegeln", "ERROR")
+        return []
+    return rules
+
+def load_auto() -> bool:
+    """Stand der Option "Stündlich automatisch aufräumen" (Standard: aus)."""
+    try:
+        with open(AUTODATEI, "r", encoding="utf-8") as f:
+            return json.load(f).get("aktiv") is True
+    except Exception:
+        return False
+
+def save_auto(on: bool):
+    try:
+        with open(AUTODATEI, "w", encoding="utf-8") as f:
+            json.dump({"aktiv": on}, f)
+    except Exception as e:
+        log_event(f"Auto-Aufräumen-Einstellung nicht gespeichert: {e}", "DownloadRegeln", "ERROR")
+
+def _number(rule: dict, key: str):
+    # Fehlend = keine Bedingung; sonst eine Zahl >= 0 (bool zählt nicht als Zahl)
+    value = rule.get(key)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise ValueError(f"{key} muss eine Zahl >= 0 sein")
+    return value
+
+def compile_rules(rules: List[dict], now: float = None) -> List[CompiledRule]:
+    """Rechnet die Regeln einmal in Grenzwerte um; ungültige Regeln werden geloggt und übersprungen."""
+    now = time.time() if now is None else now
+    compiled = []
+    for rule in rules:
+        try:
+            if not isinstance(rule, dict):
+                raise TypeError("Regel muss ein Objekt sein")
+            name = str(rule.get("name", "?"))
+            typ = rule.get("typ")
+            aktion = rule.get("aktion")
+            if aktion not in AKTIONEN:
+                raise ValueError(f"aktion muss {' oder '.join(AKTIONEN)} sein")
+            if typ is not None and (not isinstance(typ, str) or typ not in KAT_CODE):
+                raise ValueError(f"unbekannter typ {typ!r}")
+            mb = _number(rule, "groesser_als_mb")
+            days = _number(rule, "aelter_als_tage")
+        except (TypeError, ValueError) as e:
+            log_event(f"Ungültige Regel übersprungen ({e}): {rule}", "DownloadRegeln", "WARNING")
+            continue
+        compiled.append(CompiledRule(
+            name,
+            KAT_CODE.get(typ) if typ is not None else None,
+            int((mb or 0) * 1_000_000),
+            now - days * 86400 if days else float("inf"),
+            aktion,
+        ))
+    return compiled
+
+def evaluate(index: DownloadIndex, rules: List[CompiledRule]) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    Ein Durchlauf über die Index-Spalten, erste passende Regel gewinnt.
+    Liefert {aktion: [(pfad, regelname), ...]}.
+    """
+    hits = {aktion: [] for aktion in AKTIONEN}
+    if not rules:
+        return hits
+    paths, sizes, mtimes, kinds, alive = index.paths, index.sizes, index.mtimes, index.kinds, index.alive
+    for i in range(len(paths)):
+        if not alive[i]:
+            continue
+        kind, size, mtime = kinds[i], sizes[i], mtimes[i]
+        for rule in rules:
+            if ((rule.kind is None or kind == rule.kind)
+                    and size >= rule.size_min and mtime <= rule.mtime_max):
+                hits[rule.aktion].append((paths[i], rule.name))
+                break
+    return hits
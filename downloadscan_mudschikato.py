@@ -0,0 +1,432 @@
+"""
+downloadscan_mudschikato.py
+---------------------------
+Scan-Schicht für den Downloads-Manager.
+- Ein einziger Durchlauf mit os.scandir, pro Datei genau ein stat()
+- Kompakter Datensatz je Datei: Pfad, Größe, mtime, Typklasse (Code aus filetypes_mudschikato)
+- Filter (Typ, Alter, Größe) arbeiten nur noch auf diesen Datensätzen
+- DownloadIndex hält den letzten Scan spaltenweise im Speicher
+- Änderungen im Ordner werden inkrementell pro Verzeichnis eingepflegt
+- DirSizeTree summiert Größe und Dateianzahl je Ordner
+- ScanCache speichert den letzten Scan samt Ordner-mtimes in einer SQLite-Datei
+- CacheWriter schreibt ihn in genau einem Hintergrund-Thread (neuester Stand gewinnt)
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from array import array
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Set
+from filetypes_mudschikato import KATEGORIEN, KAT_CODE, kategorie_code
+from logging_mudschikato import log_event
+
+SCANCACHE = "mudschikato_scancache.db"
+
+AGE_OPTS = {
+    "Alle": None,
+    "Letzte 24h": 1,
+    "Letzte 7 Tage": 7,
+    "Letzter Monat": 31,
+    "Älter als 3 Monate": -90,
+}
+SIZE_OPTS = {
+    "Alle Größen": 0,
+    "> 1 MB": 1_000_000,
+    "> 10 MB": 10_000_000,
+    "> 100 MB": 100_000_000,
+}
+
+class FileRecord(NamedTuple):
+    """Metadaten-Schnappschuss einer Datei aus genau einem stat()."""
+    path: str
+    size: int
+    mtime: float
+    kind: int
+
+def scan_records(root: str, recursive: bool = False,
+                 cancelled: Callable[[], bool] = lambda: False,
+                 dirs: Dict[str, float] = None) -> Iterator[FileRecord]:
+    """
+    Durchläuft root mit os.scandir und liefert je Datei einen FileRecord.
+    Unterordner nur bei recursive=True; cancelled() wird pro Eintrag geprüft.
+    Ist dirs ein Dict, wird dort jeder besuchte Ordner mit seiner mtime eingetragen
+    (gemessen vor dem Listing, damit spätere Änderungen sicher auffallen).
+    """
+    stack = [root]
+    while stack:
+        dirpath = stack.pop()
+        try:
+            dir_mtime = os.stat(dirpath).st_mtime if dirs is not None else 0.0
+            it = os.scandir(dirpath)
+        except OSError:
+            continue
+        if dirs is not None:
+            dirs[dirpath] = dir_mtime
+        subdirs = []
+        with it:
+            for entry in it:
+                if cancelled():
+                    return
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                        continue
+                    if entry.is_dir():
+                        continue  # Link auf Ordner: wie os.walk nicht folgen (Schleifen, Doppelzählung)
+                    st = entry.stat()
+                except OSError:
+                    continue  # Datei zwischenzeitlich verschwunden
+                yield FileRecord(entry.path, st.st_size, st.st_mtime, kategorie_code(entry.name))
+        if recursive:
+            # Umgekehrt auf den Stapel, damit die Reihenfolge wie bei os.walk bleibt
+            stack.extend(reversed(subdirs))
+
+def list_dir(dirpath: str):
+    """
+    Listet genau einen Ordner (ohne Rekursion).
+    Liefert (FileRecords, Unterordner-Pfade); fehlt der Ordner, ist beides leer.
+    """
+    records, subdirs = [], []
+    try:
+        it = os.scandir(dirpath)
+    except OSError:
+        return records, subdirs
+    with it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                    continue
+                if entry.is_dir():
+                    continue  # Link auf Ordner
+                st = entry.stat()
+            except OSError:
+                continue
+            records.append(FileRecord(entry.path, st.st_size, st.st_mtime, kategorie_code(entry.name)))
+    return records, subdirs
+
+def filter_bounds(filters: dict, now: float = None):
+    """
+    Rechnet die Combo-Werte (typ, alter, groesse) einmalig in Grenzwerte um:
+    (kind oder None, mtime_min, mtime_max, size_min).
+    """
+    typ = filters.get("typ", "Alle Typen")
+    kind = KAT_CODE.get(typ)
+    days = AGE_OPTS.get(filters.get("alter", "Alle"))
+    size_min = SIZE_OPTS.get(filters.get("groesse", "Alle Größen"), 0)
+    now = time.time() if now is None else now
+    mtime_min, mtime_max = float("-inf"), float("inf")
+    if days is not None and days > 0:
+        # "höchstens days volle Tage alt"
+        mtime_min = now - (days + 1) * 86400
+    elif days is not None and days < 0:
+        # "mindestens abs(days) volle Tage alt"
+        mtime_max = now + days * 86400
+    return kind, mtime_min, mtime_max, size_min
+
+class DownloadIndex:
+    """
+    Spaltenweiser In-Memory-Index des letzten Scans.
+    Größe, mtime und Typklasse liegen in kompakten array-Spalten,
+    Filterwechsel sind reine Abfragen ohne Dateisystem-Zugriff.
+    Einzelne Dateien können über add/remove/sync_dir nachgeführt werden,
+    entfernte Zeilen werden nur als tot markiert und gelegentlich kompaktiert.
+    Beobachter (z. B. DirSizeTree) werden über file_added/file_removed/reset informiert.
+    """
+    COMPACT_MIN = 1024  # ab so vielen toten Zeilen lohnt das Kompaktieren
+
+    def __init__(self):
+        self.observers = []
+        self.clear()
+
+    def clear(self):
+        self._reset_columns()
+        for obs in self.observers:
+            obs.reset()
+
+    def _reset_columns(self):
+        self.paths: List[str] = []
+        self.sizes = array("q")
+        self.mtimes = array("d")
+        self.kinds = array("B")
+        self.alive = array("B")
+        self.rows: Dict[str, int] = {}
+        self.by_dir: Dict[str, Set[str]] = {}
+        self.dead = 0
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, path):
+        return path in self.rows
+
+    def add(self, rec: FileRecord):
+        i = self.rows.get(rec.path)
+        if i is not None:
+            # Bekannte Datei (z. B. Download wächst noch): Spalten aktualisieren
+            if self.observers:
+                old = self.record(i)
+                for obs in self.observers:
+                    obs.file_removed(old)
+                    obs.file_added(rec)
+            self.sizes[i] = rec.size
+            self.mtimes[i] = rec.mtime
+            self.kinds[i] = rec.kind
+            return
+        self.rows[rec.path] = len(self.paths)
+        self.by_dir.setdefault(os.path.dirname(rec.path), set()).add(rec.path)
+        self.paths.append(rec.path)
+        self.sizes.append(rec.size)
+        self.mtimes.append(rec.mtime)
+        self.kinds.append(rec.kind)
+        self.alive.append(1)
+        for obs in self.observers:
+            obs.file_added(rec)
+
+    def extend(self, records: Iterable[FileRecord]) -> int:
+        """Hängt Datensätze an und liefert die erste neue Zeilennummer."""
+        start = len(self.paths)
+        for rec in records:
+            self.add(rec)
+        return start
+
+    def remove(self, path: str) -> bool:
+        i = self.rows.pop(path, None)
+        if i is None:
+            return False
+        self.alive[i] = 0
+        self.dead += 1
+        for obs in self.observers:
+            obs.file_removed(self.record(i))
+        dir_paths = self.by_dir.get(os.path.dirname(path))
+        if dir_paths is not None:
+            dir_paths.discard(path)
+            if not dir_paths:
+                del self.by_dir[os.path.dirname(path)]
+        if self.dead >= self.COMPACT_MIN and self.dead * 2 > len(self.paths):
+            self.compact()
+        return True
+
+    def remove_tree(self, dirpath: str) -> List[str]:
+        """Entfernt alle Dateien in dirpath und darunter (Ordner wurde gelöscht)."""
+        prefix = dirpath.rstrip(os.sep) + os.sep
+        gone = [p for d in list(self.by_dir) if d == dirpath or d.startswith(prefix)
+                for p in list(self.by_dir[d])]
+        for path in gone:
+            self.remove(path)
+        return gone
+
+    def sync_dir(self, dirpath: str, records: Iterable[FileRecord]):
+        """
+        Gleicht die Dateien direkt in dirpath mit einem frischen Listing ab.
+        Liefert (neu_oder_geändert, entfernt) als Pfadlisten.
+        """
+        known = set(self.by_dir.get(dirpath, ()))
+        changed = []
+        for rec in records:
+            known.discard(rec.path)
+            i = self.rows.get(rec.path)
+            if i is None or self.sizes[i] != rec.size or self.mtimes[i] != rec.mtime:
+                self.add(rec)
+                changed.append(rec.path)
+        for path in known:
+            self.remove(path)
+        return changed, list(known)
+
+    def compact(self):
+        """Baut die Spalten ohne tote Zeilen neu auf (Zeilennummern ändern sich)."""
+        live = [self.record(i) for i in range(len(self.paths)) if self.alive[i]]
+        observers, self.observers = self.observers, []  # Inhalt bleibt gleich, nichts melden
+        self._reset_columns()
+        self.extend(live)
+        self.observers = observers
+
+    def record(self, i: int) -> FileRecord:
+        return FileRecord(self.paths[i], self.sizes[i], self.mtimes[i], self.kinds[i])
+
+    def query(self, filters: dict, start: int = 0, now: float = None) -> List[int]:
+        """Liefert die Zeilennummern ab start, die zu den Filtern passen."""
+        kind, mtime_min, mtime_max, size_min = filter_bounds(filters, now)
+        rows = range(start, len(self.paths))
+        if self.dead:
+            alive = self.alive
+            rows = [i for i in rows if alive[i]]
+        # Spalte für Spalte eingrenzen, die selektivste Prüfung zuerst
+        if kind is not None:
+            kinds = self.kinds
+            rows = [i for i in rows if kinds[i] == kind]
+        if size_min:
+            sizes = self.sizes
+            rows = [i for i in rows if sizes[i] >= size_min]
+        if mtime_min > float("-inf") or mtime_max < float("inf"):
+            mtimes = self.mtimes
+            rows = [i for i in rows if mtime_min < mtimes[i] <= mtime_max]
+        return list(rows)
+
+class DirSizeTree:
+    """
+    Ordnergrößen (du-artig) über dem DownloadIndex.
+    build() rechnet einmal von unten nach oben; danach halten file_added/file_removed
+    die Summen entlang der Elternkette aktuell. Geänderte Ordner landen in changed.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.root = None
+        self.size: Dict[str, int] = {}
+        self.count: Dict[str, int] = {}
+        self.children: Dict[str, Set[str]] = {}
+        self.changed: Set[str] = set()
+
+    def build(self, index: DownloadIndex, root: str):
+        self.reset()
+        self.root = root
+        # Eigene Dateien je Ordner in einem Durchlauf über die Spalten
+        for i in range(len(index.paths)):
+            if index.alive[i]:
+                d = os.path.dirname(index.paths[i])
+                self.size[d] = self.size.get(d, 0) + index.sizes[i]
+                self.count[d] = self.count.get(d, 0) + 1
+        self.size.setdefault(root, 0)
+        self.count.setdefault(root, 0)
+        # Von der tiefsten Ebene aufwärts in den Elternordner einrechnen
+        root_depth = root.count(os.sep)
+        by_depth = defaultdict(set)
+        for d in self.size:
+            if self._inside(d):
+                by_depth[d.count(os.sep)].add(d)
+        for depth in range(max(by_depth), root_depth, -1):
+            for d in by_depth.get(depth, ()):
+                parent = os.path.dirname(d)
+                if parent not in self.size:
+                    self.size[parent] = 0
+                    self.count[parent] = 0
+                    by_depth[depth - 1].add(parent)
+                self.size[parent] += self.size[d]
+                self.count[parent] += self.count[d]
+                self.children.setdefault(parent, set()).add(d)
+
+    def _inside(self, d: str) -> bool:
+        return d == self.root or d.startswith(self.root.rstrip(os.sep) + os.sep)
+
+    def _update(self, path: str, size: int, count: int):
+        if self.root is None:
+            return  # noch nicht aufgebaut
+        d = os.path.dirname(path)
+        if not self._inside(d):
+            return
+        while True:
+            if d not in self.size:
+                self.size[d] = 0
+                self.count[d] = 0
+            self.size[d] += size
+            self.count[d] += count
+            self.changed.add(d)
+            if d == self.root:
+                break
+            parent = os.path.dirname(d)
+            self.children.setdefault(parent, set()).add(d)
+            d = parent
+
+    def file_added(self, rec: FileRecord):
+        self._update(rec.path, rec.size, 1)
+
+    def file_removed(self, rec: FileRecord):
+        self._update(rec.path, -rec.size, -1)
+
+    def take_changed(self) -> Set[str]:
+        changed, self.changed = self.changed, set()
+        return changed
+
+class ScanCache:
+    """
+    Letzter Scan als SQLite-Datei: alle FileRecords plus mtime je Ordner.
+    Beim Start wird daraus sofort angezeigt; neu gelistet werden nur Ordner,
+    deren mtime sich seitdem geändert hat.
+    """
+    def __init__(self, path: str = SCANCACHE):
+        self.path = path
+
+    def _connect(self):
+        con = sqlite3.connect(self.path)
+        con.executescript(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);"
+            "CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, mtime REAL);"
+            "CREATE TABLE IF NOT EXISTS files (path TEXT, size INTEGER, mtime REAL, kind INTEGER);"
+        )
+        return con
+
+    def _meta(self, root: str, recursive: bool) -> Dict[str, str]:
+        # Typ-Codes gehören zur Kategorie-Tabelle, ändert sie sich, ist der Cache ungültig
+        return {"root": root, "recursive": str(int(recursive)), "kinds": ",".join(KATEGORIEN)}
+
+    def load(self, root: str, recursive: bool):
+        """Liefert (records, {ordner: mtime}) oder None, wenn kein passender Cache existiert."""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            con = self._connect()
+            try:
+                if dict(con.execute("SELECT key, value FROM meta")) != self._meta(root, recursive):
+                    return None
+                dirs = dict(con.execute("SELECT path, mtime FROM dirs"))
+                records = [FileRecord(*row) for row in con.execute("SELECT path, size, mtime, kind FROM files")]
+            finally:
+                con.close()
+        except sqlite3.Error as e:
+            log_event(f"Scan-Cache nicht lesbar: {e}", "DownloadsManager", "WARNING")
+            return None
+        return records, dirs
+
+    def save(self, root: str, recursive: bool, records: Iterable[FileRecord], dirs: Dict[str, float]):
+        """Ersetzt den Cache-Inhalt in einer Transaktion (darf aus einem Hintergrund-Thread laufen)."""
+        try:
+            con = self._connect()
+            try:
+                with con:
+                    con.execute("DELETE FROM meta")
+                    con.execute("DELETE FROM dirs")
+                    con.execute("DELETE FROM files")
+                    con.executemany("INSERT INTO meta VALUES (?, ?)", self._meta(root, recursive).items())
+                    con.executemany("INSERT INTO dirs VALUES (?, ?)", dirs.items())
+                    con.executemany("INSERT INTO files VALUES (?, ?, ?, ?)", records)
+            finally:
+                con.close()
+        except sqlite3.Error as e:
+            log_event(f"Scan-Cache konnte nicht gespeichert werden: {e}", "DownloadsManager", "ERROR")
+
+class CacheWriter:
+    """
+    Ein einziger Schreib-Thread für den ScanCache. submit() während eines laufenden Schreibens
+    merkt sich nur den neuesten Stand, dazwischenliegende werden übersprungen; so greifen
+    nie zwei Verbindungen gleichzeitig auf die SQLite-Datei zu. join() wartet beim Beenden.
+    """
+    def __init__(self, cache: ScanCache):
+        self.cache = cache
+        self.lock = threading.Lock()
+        self.pending = None
+        self.thread = None
+
+    def submit(self, root: str, recursive: bool, records: List[FileRecord], dirs: Dict[str, float]):
+        with self.lock:
+            self.pending = (root, recursive, records, dirs)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="mudschikato-scancache", daemon=True)
+                self.thread.start()
+
+    def _run(self):
+        while True:
+            with self.lock:
+                args, self.pending = self.pending, None
+                if args is None:
+                    self.thread = None
+                    return
+            self.cache.save(*args)
+
+    def join(self):
+        thread = self.thread
+        if thread is not None:
+            thread.join()
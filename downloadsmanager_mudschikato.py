@@ -2,28 +2,247 @@
 downloadsmanager_mudschikato.py
 -------------------------------
 Manager zur sicheren und flexiblen Bereinigung & Organisation des Downloads-Ordners.
-- Übersicht & Filter: Typ, Alter, Größe
+- Übersicht & Filter: Typ, Alter, Größe (sortierbare Tabelle)
 - Interaktive Auswahl: verschieben, archivieren, löschen, ignorieren
+- Ordnergrößen-Baum (mit Unterordnern), aktualisiert sich bei Archivieren/Papierkorb
+- Auto-Aufräumen nach Regeln (mudschikato_downloadregeln.json), auch zeitgesteuert
+- Duplikate finden (Größe -> Teil-Hash -> Voll-Hash, mit Cache)
 - Alle Aktionen validiert & mit Undo
 - Logging jeder Aktion
+- Scan im Hintergrund, Ordner wird danach überwacht und inkrementell nachgeführt
+- Start aus dem Scan-Cache, neu gelistet werden nur geänderte Ordner
 - Nichts wird endgültig gelöscht, alles erst verschoben
+- Dateien/Bytes im Index und Archiviertes werden live an den Ereignis-Bus gemeldet
 - Perfekt für Laien & Profis
 """
 
 import os
-import shutil
 import datetime
+from collections import Counter
+from typing import List
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QListWidget,
-    QListWidgetItem, QFileDialog, QComboBox, QMessageBox, QCheckBox
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableView, QTreeWidget,
+    QTreeWidgetItem, QSplitter, QAbstractItemView, QHeaderView, QFileDialog, QComboBox,
+    QMessageBox, QCheckBox
+)
+from PyQt6.QtCore import (
+    Qt, QThread, QTimer, QFileSystemWatcher, QAbstractTableModel, QModelIndex,
+    QItemSelection, QItemSelectionModel, pyqtSignal
 )
-from PyQt6.QtCore import Qt
 from undo_mudschikato import UndoManager, UndoAction
 from logging_mudschikato import log_event
+from downloadscan_mudschikato import (
+    scan_records, list_dir, FileRecord, DownloadIndex, DirSizeTree, ScanCache, CacheWriter
+)
+from filetypes_mudschikato import KATEGORIEN, kategorie_code
+from format_mudschikato import format_size
+from transfer_mudschikato import TransferWorker, plan_moves, log_batch
+from duplicates_mudschikato import DuplicateWorker
+from downloadrules_mudschikato import load_rules, compile_rules, evaluate, load_auto, save_auto
+from eventbus_mudschikato import (
+    CounterObserver, get_bus, DOWNLOADS_DATEIEN, DOWNLOADS_BYTES, ARCHIV_DATEIEN, ARCHIV_BYTES
+)
 
 DOWNLOADS_PATH = os.path.expanduser("~/Downloads")
 SAFE_ARCHIV = "mudschikato_archiv"
 SAFE_TRASH = "mudschikato_downloads_trash"
+SCAN_BATCH = 500  # Treffer pro Paket an die Liste
+WATCH_DEBOUNCE_MS = 300  # Ordner-Ereignisse sammeln, bevor nachgeführt wird
+AUTO_RULES_MS = 60 * 60 * 1000  # Auto-Aufräumen: einmal pro Stunde
+CACHE_SAVE_MS = 5000  # Scan-Cache nach Ordner-Änderungen gesammelt speichern
+
+# Texte je Zielordner für Log, Undo und Meldungen
+TRANSFER_TEXTE = {
+    SAFE_ARCHIV: {
+        "log": "Download archiviert", "undo": "Archiv-Undo",
+        "undo_desc": "Downloads archiviert", "titel": "Archiviert", "kurz": "archiviert",
+    },
+    SAFE_TRASH: {
+        "log": "Download in Papierkorb", "undo": "Papierkorb-Undo",
+        "undo_desc": "Downloads in Papierkorb verschoben", "titel": "Papierkorb", "kurz": "Papierkorb",
+    },
+    "regeln": {
+        "log": "Auto-Aufräumen", "undo": "Auto-Aufräumen-Undo",
+        "undo_desc": "Downloads nach Regeln aufgeräumt", "titel": "Auto-Aufräumen", "kurz": "nach Regeln",
+    },
+}
+
+class DownloadScanWorker(QThread):
+    """
+    Durchsucht den Downloads-Ordner im Hintergrund.
+    Alle Dateien werden paketweise als FileRecord gemeldet (gefiltert wird im Index),
+    jeder Scan trägt seine scan_id, damit veraltete Pakete verworfen werden können.
+    Am Ende werden alle besuchten Ordner mit mtime gemeldet (für Überwachung und Cache).
+    """
+    batch_ready = pyqtSignal(int, list)
+    scan_done = pyqtSignal(int, dict)
+
+    def __init__(self, scan_id: int, root: str, recursive: bool,
+                 batch_size: int = SCAN_BATCH, parent=None):
+        super().__init__(parent)
+        self.scan_id = scan_id
+        self.root = root
+        self.recursive = recursive
+        self.batch_size = batch_size
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        dirs = {}
+        batch = []
+        for hit in scan_records(self.root, self.recursive, lambda: self._cancelled, dirs):
+            batch.append(hit)
+            if len(batch) >= self.batch_size:
+                self.batch_ready.emit(self.scan_id, batch)
+                batch = []
+        if self._cancelled:
+            return
+        if batch:
+            self.batch_ready.emit(self.scan_id, batch)
+        self.scan_done.emit(self.scan_id, dirs)
+
+class RevalidateWorker(QThread):
+    """
+    Prüft nach dem Start aus dem Scan-Cache nur die Ordner-mtimes.
+    Geänderte Ordner werden neu gelistet (dir_listed), neue Unterordner komplett
+    erfasst (records_found), verschwundene gemeldet (dir_gone).
+    """
+    dir_listed = pyqtSignal(int, str, list)
+    records_found = pyqtSignal(int, list)
+    dir_gone = pyqtSignal(int, str)
+    revalidate_done = pyqtSignal(int, dict)
+
+    def __init__(self, scan_id: int, dir_mtimes: dict, recursive: bool, parent=None):
+        super().__init__(parent)
+        self.scan_id = scan_id
+        self.dir_mtimes = dir_mtimes
+        self.recursive = recursive
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        result = {}
+        for dirpath, old_mtime in self.dir_mtimes.items():
+            if self._cancelled:
+                return
+            try:
+                mtime = os.stat(dirpath).st_mtime
+            except OSError:
+                self.dir_gone.emit(self.scan_id, dirpath)
+                continue
+            result[dirpath] = mtime
+            if mtime == old_mtime:
+                continue  # Ordner unverändert, Cache-Inhalt stimmt
+            records, subdirs = list_dir(dirpath)
+            self.dir_listed.emit(self.scan_id, dirpath, records)
+            if not self.recursive:
+                continue
+            for sub in subdirs:
+                if sub in self.dir_mtimes:
+                    continue
+                new_dirs = {}
+                found = list(scan_records(sub, True, lambda: self._cancelled, new_dirs))
+                self.records_found.emit(self.scan_id, found)
+                result.update(new_dirs)
+        if not self._cancelled:
+            self.revalidate_done.emit(self.scan_id, result)
+
+class DownloadTableModel(QAbstractTableModel):
+    """
+    Tabellenmodell über dem DownloadIndex.
+    Hält nur Zeilennummern des Index; Texte werden erst beim Zeichnen formatiert,
+    sortiert wird direkt auf den Index-Spalten.
+    """
+    HEADERS = ["Pfad", "Größe", "Geändert", "Typ"]
+
+    def __init__(self, dindex: DownloadIndex, parent=None):
+        super().__init__(parent)
+        self.dindex = dindex
+        self.rows: List[int] = []
+        self.sort_column = -1
+        self.sort_order = Qt.SortOrder.AscendingOrder
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, idx, role=Qt.ItemDataRole.DisplayRole):
+        if not idx.isValid():
+            return None
+        i = self.rows[idx.row()]
+        col = idx.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == 0:
+                return self.dindex.paths[i]
+            if col == 1:
+                return f"{self.dindex.sizes[i]//1024} KB"
+            if col == 2:
+                return datetime.datetime.fromtimestamp(self.dindex.mtimes[i]).strftime("%Y-%m-%d %H:%M")
+            return KATEGORIEN[self.dindex.kinds[i]]
+        if role == Qt.ItemDataRole.TextAlignmentRole and col == 1:
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def record(self, row: int) -> FileRecord:
+        return self.dindex.record(self.rows[row])
+
+    def set_rows(self, rows: List[int], sort: bool = True):
+        # sort=False behält die übergebene Reihenfolge (z. B. Duplikat-Gruppen)
+        self.beginResetModel()
+        self.rows = rows
+        if sort:
+            self.sort_rows()
+        self.endResetModel()
+
+    def append_rows(self, rows: List[int]):
+        # Während des Scans nur anhängen, sortiert wird am Ende (sort_now)
+        if not rows:
+            return
+        n = len(self.rows)
+        self.beginInsertRows(QModelIndex(), n, n + len(rows) - 1)
+        self.rows.extend(rows)
+        self.endInsertRows()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sort_column = column
+        self.sort_order = order
+        self.sort_now()
+
+    def sort_now(self):
+        if self.sort_column < 0:
+            return
+        # Auswahl über die Sortierung hinweg an den Index-Zeilen festhalten
+        self.layoutAboutToBeChanged.emit()
+        old = self.persistentIndexList()
+        ids = [self.rows[p.row()] for p in old]
+        self.sort_rows()
+        pos = {i: r for r, i in enumerate(self.rows)}
+        self.changePersistentIndexList(old, [self.index(pos[i], p.column()) for p, i in zip(old, ids)])
+        self.layoutChanged.emit()
+
+    def sort_rows(self):
+        if self.sort_column < 0:
+            return
+        ix = self.dindex
+        keys = [
+            lambda i: ix.paths[i].lower(),
+            ix.sizes.__getitem__,
+            ix.mtimes.__getitem__,
+            lambda i: KATEGORIEN[ix.kinds[i]],
+        ]
+        self.rows.sort(key=keys[self.sort_column],
+                       reverse=self.sort_order == Qt.SortOrder.DescendingOrder)
 
 class DownloadsManagerWidget(QWidget):
     def __init__(self, undo_manager: UndoManager):
@@ -41,19 +260,19 @@ class DownloadsManagerWidget(QWidget):
         opt_ly = QHBoxLayout()
         self.cb_typ = QComboBox()
         self.cb_typ.addItems(["Alle Typen", "Bilder", "Audio", "Video", "Dokumente", "Archive", "Andere"])
-        self.cb_typ.currentIndexChanged.connect(self.refresh_filelist)
+        self.cb_typ.currentIndexChanged.connect(self.apply_filters)
         opt_ly.addWidget(QLabel("Typ:"))
         opt_ly.addWidget(self.cb_typ)
 
         self.cb_alter = QComboBox()
         self.cb_alter.addItems(["Alle", "Letzte 24h", "Letzte 7 Tage", "Letzter Monat", "Älter als 3 Monate"])
-        self.cb_alter.currentIndexChanged.connect(self.refresh_filelist)
+        self.cb_alter.currentIndexChanged.connect(self.apply_filters)
         opt_ly.addWidget(QLabel("Alter:"))
         opt_ly.addWidget(self.cb_alter)
 
         self.cb_groesse = QComboBox()
         self.cb_groesse.addItems(["Alle Größen", "> 1 MB", "> 10 MB", "> 100 MB"])
-        self.cb_groesse.currentIndexChanged.connect(self.refresh_filelist)
+        self.cb_groesse.currentIndexChanged.connect(self.apply_filters)
         opt_ly.addWidget(QLabel("Größe:"))
         opt_ly.addWidget(self.cb_groesse)
 
@@ -62,9 +281,35 @@ class DownloadsManagerWidget(QWidget):
         opt_ly.addWidget(self.chk_subdirs)
         self.layout.addLayout(opt_ly)
 
-        # Datei-Liste
-        self.filelist = QListWidget()
-        self.layout.addWidget(self.filelist)
+        # Datei-Tabelle (Model/View, Zeilen werden erst beim Zeichnen formatiert)
+        self.index = DownloadIndex()
+        self.model = DownloadTableModel(self.index, self)
+        self.fileview = QTableView()
+        self.fileview.setModel(self.model)
+        self.fileview.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.fileview.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.fileview.verticalHeader().setVisible(False)
+        self.fileview.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.fileview.setSortingEnabled(True)
+        self.fileview.sortByColumn(0, Qt.SortOrder.AscendingOrder)
+
+        # Ordnergrößen (nur mit Unterordnern): Summen je Ordner, inkrementell nachgeführt
+        self.dirtree = DirSizeTree()
+        self.index.observers.append(self.dirtree)
+        self.bus = get_bus()
+        self.index.observers.append(CounterObserver(self.bus, DOWNLOADS_DATEIEN, DOWNLOADS_BYTES))
+        self.dir_items = {}
+        self.dirview = QTreeWidget()
+        self.dirview.setHeaderLabels(["Ordner", "Größe", "Dateien"])
+        self.dirview.header().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.dirview.hide()
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        splitter.addWidget(self.dirview)
+        splitter.addWidget(self.fileview)
+        splitter.setStretchFactor(1, 2)
+        self.layout.addWidget(splitter)
+        self.status_label = QLabel("")
+        self.layout.addWidget(self.status_label)
 
         # Aktionen
         act_ly = QHBoxLayout()
@@ -77,156 +322,503 @@ class DownloadsManagerWidget(QWidget):
         self.btn_trash = QPushButton("Auswahl → Papierkorb")
         self.btn_trash.clicked.connect(self.trash_files)
         act_ly.addWidget(self.btn_trash)
+        self.btn_dups = QPushButton("Duplikate finden")
+        self.btn_dups.clicked.connect(self.find_duplicates)
+        act_ly.addWidget(self.btn_dups)
+        self.btn_rules = QPushButton("Regeln anwenden")
+        self.btn_rules.clicked.connect(self.apply_rules)
+        act_ly.addWidget(self.btn_rules)
+        self.chk_auto = QCheckBox("Stündlich automatisch aufräumen")
+        self.chk_auto.stateChanged.connect(self.toggle_auto_rules)
+        act_ly.addWidget(self.chk_auto)
         self.btn_undo = QPushButton("Undo")
         self.btn_undo.clicked.connect(self.undo_action)
         act_ly.addWidget(self.btn_undo)
         self.layout.addLayout(act_ly)
 
         self.setLayout(self.layout)
-        self.refresh_filelist()
-
-    def get_files(self):
-        # Hole alle Dateien mit Filter (Typ, Alter, Größe)
-        filetypes = {
-            "Bilder": [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".webp"],
-            "Audio": [".mp3", ".wav", ".ogg", ".flac", ".aac", ".m4a"],
-            "Video": [".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv"],
-            "Dokumente": [".pdf", ".doc", ".docx", ".odt", ".txt", ".xls", ".xlsx", ".ppt", ".pptx"],
-            "Archive": [".zip", ".tar", ".gz", ".rar", ".7z"],
-        }
-        age_opts = {
-            "Alle": None,
-            "Letzte 24h": 1,
-            "Letzte 7 Tage": 7,
-            "Letzter Monat": 31,
-            "Älter als 3 Monate": -90,
-        }
-        size_opts = {
-            "Alle Größen": 0,
-            "> 1 MB": 1_000_000,
-            "> 10 MB": 10_000_000,
-            "> 100 MB": 100_000_000,
+
+        # Hintergrund-Scan und -Verschiebung
+        self.scan_worker = None
+        self.retired_workers = set()  # abgebrochene Scans, die noch auslaufen
+        self.transfer_worker = None
+        self.dup_worker = None
+        self.scan_id = 0
+        self.scan_cache = ScanCache()
+        self.cache_writer = CacheWriter(self.scan_cache)
+        self.dir_mtimes = {}  # Ordner -> mtime zum Zeitpunkt des letzten Listings
+        self.cache_timer = QTimer(self)
+        self.cache_timer.setSingleShot(True)
+        self.cache_timer.setInterval(CACHE_SAVE_MS)
+        self.cache_timer.timeout.connect(self.save_scan_cache)
+
+        # Ordner-Überwachung: Änderungen werden pro Verzeichnis nachgeführt
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.dir_changed)
+        self.pending_dirs = set()
+        self.watch_timer = QTimer(self)
+        self.watch_timer.setSingleShot(True)
+        self.watch_timer.setInterval(WATCH_DEBOUNCE_MS)
+        self.watch_timer.timeout.connect(self.sync_pending_dirs)
+
+        # Zeitgesteuertes Auto-Aufräumen (ohne Dialoge, ein Undo pro Lauf)
+        self.auto_timer = QTimer(self)
+        self.auto_timer.setInterval(AUTO_RULES_MS)
+        self.auto_timer.timeout.connect(self.auto_rules)
+        # Gilt, solange das Fenster offen ist; der Haken übersteht einen Neustart
+        self.chk_auto.setChecked(load_auto())
+        self.load_cached()
+
+    def current_filters(self):
+        # Filterwerte im GUI-Thread einsammeln, der Scanner sieht nur diese Kopie
+        return {
+            "typ": self.cb_typ.currentText(),
+            "alter": self.cb_alter.currentText(),
+            "groesse": self.cb_groesse.currentText(),
         }
 
-        root = DOWNLOADS_PATH
-        if not os.path.exists(root):
-            return []
-        result = []
-        for dirpath, dirs, files in os.walk(root):
-            for fname in files:
-                fpath = os.path.join(dirpath, fname)
-                # Filter Typ
-                typ = self.cb_typ.currentText()
-                if typ != "Alle Typen":
-                    if not any(fname.lower().endswith(ext) for ext in filetypes.get(typ, [])):
-                        if typ != "Andere":
-                            continue
-                        else:
-                            if any(fname.lower().endswith(ext) for exts in filetypes.values() for ext in exts):
-                                continue
-                # Filter Alter
-                alter = self.cb_alter.currentText()
-                if alter != "Alle":
-                    days = age_opts[alter]
-                    mtime = datetime.datetime.fromtimestamp(os.path.getmtime(fpath))
-                    now = datetime.datetime.now()
-                    if days > 0 and (now - mtime).days > days:
-                        continue
-                    if days < 0 and (now - mtime).days < abs(days):
-                        continue
-                # Filter Größe
-                groesse = self.cb_groesse.currentText()
-                size_min = size_opts[groesse]
-                if os.path.getsize(fpath) < size_min:
-                    continue
-                result.append(fpath)
-            if not self.chk_subdirs.isChecked():
-                break
-        return result
+    def load_cached(self):
+        # Start aus dem Scan-Cache: sofort anzeigen, danach nur geänderte Ordner nachprüfen
+        recursive = self.chk_subdirs.isChecked()
+        cached = self.scan_cache.load(DOWNLOADS_PATH, recursive)
+        if cached is None:
+            self.refresh_filelist()
+            return
+        records, self.dir_mtimes = cached
+        self.scan_id += 1
+        self.index.extend(records)
+        self.apply_filters()
+        worker = RevalidateWorker(self.scan_id, dict(self.dir_mtimes), recursive, parent=self)
+        worker.dir_listed.connect(self.revalidated_dir)
+        worker.records_found.connect(self.revalidated_records)
+        worker.dir_gone.connect(self.revalidated_gone)
+        worker.revalidate_done.connect(self.revalidate_finished)
+        worker.finished.connect(worker.deleteLater)
+        self.scan_worker = worker
+        worker.start()
+
+    # Jede Änderung am Index kann kompaktieren (Zeilennummern ändern sich),
+    # daher die Tabelle danach immer neu abfragen statt alte Zeilennummern zu behalten
+    def revalidated_dir(self, scan_id, dirpath, records):
+        if scan_id != self.scan_id:
+            return
+        added, removed = self.index.sync_dir(dirpath, records)
+        if added or removed:
+            self.apply_filters()
+
+    def revalidated_records(self, scan_id, records):
+        if scan_id == self.scan_id and records:
+            self.index.extend(records)
+            self.apply_filters()
+
+    def revalidated_gone(self, scan_id, dirpath):
+        if scan_id == self.scan_id and self.index.remove_tree(dirpath):
+            self.apply_filters()
+
+    def revalidate_finished(self, scan_id, dirs):
+        if scan_id != self.scan_id:
+            return
+        self.scan_worker = None
+        self.dir_mtimes = dirs
+        if dirs:
+            self.watcher.addPaths(list(dirs))
+        self.apply_filters()
+        self.build_dir_view()
+        self.save_scan_cache()
+        if self.pending_dirs:
+            self.watch_timer.start()  # während der Prüfung gesammelte Ordner-Ereignisse
+
+    def save_scan_cache(self):
+        # Schnappschuss im GUI-Thread, Schreiben im (einzigen) Hintergrund-Thread
+        self.cache_timer.stop()
+        if self.scan_worker is not None:
+            return  # halber Scan; das Scan-Ende speichert ohnehin
+        records = [self.index.record(i) for i in self.index.query({})]
+        self.cache_writer.submit(DOWNLOADS_PATH, self.chk_subdirs.isChecked(), records, dict(self.dir_mtimes))
+
+    def touch_dirs(self, dirs):
+        # Ordner wurden neu gelistet bzw. geändert: mtimes nachführen, Cache gesammelt speichern
+        for dirpath in dirs:
+            try:
+                self.dir_mtimes[dirpath] = os.stat(dirpath).st_mtime
+            except OSError:
+                self.forget_dir(dirpath)
+        self.cache_timer.start()
+
+    def forget_dir(self, dirpath):
+        prefix = dirpath + os.sep
+        for d in [d for d in self.dir_mtimes if d == dirpath or d.startswith(prefix)]:
+            del self.dir_mtimes[d]
 
     def refresh_filelist(self):
-        self.filelist.clear()
-        files = self.get_files()
-        for f in files:
-            size = os.path.getsize(f)
-            mtime = datetime.datetime.fromtimestamp(os.path.getmtime(f)).strftime("%Y-%m-%d %H:%M")
-            self.filelist.addItem(f"{f}   [{size//1024} KB, {mtime}]")
-        if not files:
-            self.filelist.addItem("Keine Dateien gefunden.")
+        # Neuer Scan von der Platte, nur über Button oder Unterordner-Option
+        if self.scan_worker is not None:
+            self.retire_worker(self.scan_worker)
+        self.scan_id += 1
+        self.index.clear()
+        self.model.set_rows([])
+        self.dirview.clear()
+        self.dir_items = {}
+        self.status_label.setText("Suche läuft ...")
+        self.pending_dirs.clear()
+        if self.watcher.directories():
+            self.watcher.removePaths(self.watcher.directories())
+        worker = DownloadScanWorker(
+            self.scan_id, DOWNLOADS_PATH, self.chk_subdirs.isChecked(), parent=self
+        )
+        worker.batch_ready.connect(self.add_batch)
+        worker.scan_done.connect(self.scan_finished)
+        worker.finished.connect(worker.deleteLater)
+        self.scan_worker = worker
+        worker.start()
 
-    def move_files(self):
-        sel = self.filelist.selectedItems()
-        if not sel:
-            QMessageBox.information(self, "Hinweis", "Keine Datei ausgewählt.")
+    def retire_worker(self, worker):
+        # Abbrechen und bis zum Ende festhalten, damit shutdown() darauf warten kann
+        worker.cancel()
+        worker.finished.connect(lambda: self.retired_workers.discard(worker))
+        if not worker.isFinished():
+            self.retired_workers.add(worker)
+
+    def apply_filters(self):
+        # Filterwechsel = Abfrage auf dem Index, kein Dateisystem-Zugriff
+        self.model.set_rows(self.index.query(self.current_filters()))
+        self.update_status()
+        self.update_dir_view()
+
+    def build_dir_view(self):
+        # Einmal von unten nach oben summieren, danach nur noch Änderungen nachziehen
+        self.dirview.clear()
+        self.dir_items = {}
+        if not self.chk_subdirs.isChecked():
+            self.dirtree.reset()
+            self.dirview.hide()
             return
-        moved = []
-        for item in sel:
-            if item.text().startswith("Keine Dateien"):
+        self.dirtree.build(self.index, DOWNLOADS_PATH)
+        self.dirtree.take_changed()
+        root = self.dirtree.root
+        stack = [(root, None)]
+        while stack:
+            d, parent_item = stack.pop()
+            item = self.make_dir_item(d, parent_item)
+            # Größte Unterordner zuerst
+            for child in sorted(self.dirtree.children.get(d, ()), key=lambda c: self.dirtree.size[c]):
+                stack.append((child, item))
+        self.dir_items[root].setExpanded(True)
+        self.dirview.show()
+
+    def make_dir_item(self, d, parent_item):
+        name = d if parent_item is None else os.path.basename(d)
+        item = QTreeWidgetItem([name, "", ""])
+        item.setTextAlignment(1, Qt.AlignmentFlag.AlignRight)
+        item.setTextAlignment(2, Qt.AlignmentFlag.AlignRight)
+        if parent_item is None:
+            self.dirview.addTopLevelItem(item)
+        else:
+            parent_item.addChild(item)
+        self.dir_items[d] = item
+        self.set_dir_item_text(d)
+        return item
+
+    def set_dir_item_text(self, d):
+        item = self.dir_items[d]
+        item.setText(1, format_size(self.dirtree.size[d]))
+        item.setText(2, str(self.dirtree.count[d]))
+
+    def update_dir_view(self):
+        # Nur die Ordner anfassen, deren Summen sich geändert haben (Eltern vor Kindern)
+        if self.dirtree.root is None:
+            return
+        for d in sorted(self.dirtree.take_changed(), key=lambda p: p.count(os.sep)):
+            if d in self.dir_items:
+                self.set_dir_item_text(d)
+            elif os.path.dirname(d) in self.dir_items:
+                self.make_dir_item(d, self.dir_items[os.path.dirname(d)])
+
+    def update_status(self):
+        n = self.model.rowCount()
+        if n:
+            self.status_label.setText(f"{n} Datei(en)")
+        elif self.scan_worker is not None:
+            self.status_label.setText("Suche läuft ...")
+        else:
+            self.status_label.setText("Keine Dateien gefunden.")
+
+    def add_batch(self, scan_id, batch):
+        if scan_id != self.scan_id:
+            return  # Paket eines abgebrochenen Scans
+        start = self.index.extend(batch)
+        self.model.append_rows(self.index.query(self.current_filters(), start=start))
+        self.update_status()
+
+    def scan_finished(self, scan_id, dirs):
+        if scan_id != self.scan_id:
+            return
+        self.scan_worker = None
+        self.dir_mtimes = dirs
+        if dirs:
+            self.watcher.addPaths(list(dirs))
+        self.model.sort_now()
+        self.update_status()
+        self.build_dir_view()
+        self.save_scan_cache()
+        if self.pending_dirs:
+            self.watch_timer.start()  # während des Scans gesammelte Ordner-Ereignisse
+
+    def selected_records(self):
+        # Auswahl über Zeilennummern auf die Datensätze abbilden
+        rows = sorted({idx.row() for idx in self.fileview.selectionModel().selectedRows()})
+        return [self.model.record(r) for r in rows]
+
+    def dir_changed(self, dirpath):
+        # Browser-Downloads feuern viele Ereignisse, daher gesammelt nachführen
+        self.pending_dirs.add(dirpath)
+        self.watch_timer.start()
+
+    def sync_pending_dirs(self):
+        if self.scan_worker is not None:
+            return  # laufender Scan liefert ohnehin den neuen Stand
+        dirs, self.pending_dirs = self.pending_dirs, set()
+        changed = False
+        for dirpath in dirs:
+            try:
+                dir_mtime = os.stat(dirpath).st_mtime  # vor dem Listing, wie beim Scan
+            except OSError:
+                dir_mtime = None
+            if dir_mtime is None or not os.path.isdir(dirpath):
+                # Ordner gelöscht oder umbenannt
+                changed |= bool(self.index.remove_tree(dirpath))
+                self.watcher.removePath(dirpath)
+                self.forget_dir(dirpath)
+                self.cache_timer.start()
                 continue
-            fpath = item.text().split("   [")[0]
-            fname = os.path.basename(fpath)
-            target = os.path.join(SAFE_ARCHIV, fname)
-            # Keine Überschreibung!
-            if os.path.exists(target):
-                target = os.path.join(SAFE_ARCHIV, self.unique_name(fname))
+            records, subdirs = list_dir(dirpath)
+            self.dir_mtimes[dirpath] = dir_mtime
+            self.cache_timer.start()
+            added, removed = self.index.sync_dir(dirpath, records)
+            changed |= bool(added or removed)
+            if not self.chk_subdirs.isChecked():
+                continue
+            watched = set(self.watcher.directories())
+            for sub in subdirs:
+                if sub in watched:
+                    continue
+                # Neuer Unterordner: einmalig komplett erfassen und beobachten
+                new_dirs = {}
+                self.index.extend(scan_records(sub, True, dirs=new_dirs))
+                self.watcher.addPaths(list(new_dirs))
+                self.dir_mtimes.update(new_dirs)
+                changed = True
+        if changed:
+            self.apply_filters()
+
+    def reindex(self, paths):
+        # Einzelne Dateien im Index nachführen statt den Ordner neu zu scannen
+        for path in paths:
             try:
-                shutil.move(fpath, target)
-                moved.append((fpath, target))
-                log_event(f"Download archiviert: {fpath} -> {target}", "DownloadsManager", "INFO")
-            except Exception as e:
-                log_event(f"Fehler beim Archivieren: {fpath} ({e})", "DownloadsManager", "ERROR")
-        self.refresh_filelist()
-        def undo():
-            for src, dst in moved:
-                if os.path.exists(dst):
-                    shutil.move(dst, src)
-                    log_event(f"Archiv-Undo: {dst} -> {src}", "DownloadsManager", "UNDO")
-            self.refresh_filelist()
-        if moved:
-            self.undo_manager.add(UndoAction(undo, description="Downloads archiviert"))
-            QMessageBox.information(self, "Archiviert", f"{len(moved)} Datei(en) verschoben (archiviert).")
+                st = os.stat(path)
+            except OSError:
+                self.index.remove(path)
+                continue
+            self.index.add(FileRecord(path, st.st_size, st.st_mtime, kategorie_code(path)))
+        self.touch_dirs({os.path.dirname(path) for path in paths} & self.dir_mtimes.keys())
+        self.apply_filters()
+
+    def move_files(self):
+        self.start_transfer(SAFE_ARCHIV)
 
     def trash_files(self):
-        sel = self.filelist.selectedItems()
+        self.start_transfer(SAFE_TRASH)
+
+    def start_transfer(self, target_dir):
+        # Auswahl als ein Stapel im Hintergrund verschieben
+        if self.transfer_worker is not None:
+            QMessageBox.information(self, "Hinweis", "Es läuft bereits eine Verschiebung.")
+            return
+        if self.scan_worker is not None:
+            # Während des Scans kann sich die Zuordnung Zeile -> Datei noch ändern
+            QMessageBox.information(self, "Hinweis", "Bitte warten, bis der Scan abgeschlossen ist.")
+            return
+        sel = self.selected_records()
         if not sel:
             QMessageBox.information(self, "Hinweis", "Keine Datei ausgewählt.")
             return
-        moved = []
-        for item in sel:
-            if item.text().startswith("Keine Dateien"):
-                continue
-            fpath = item.text().split("   [")[0]
-            fname = os.path.basename(fpath)
-            target = os.path.join(SAFE_TRASH, fname)
-            # Keine Überschreibung!
-            if os.path.exists(target):
-                target = os.path.join(SAFE_TRASH, self.unique_name(fname))
-            try:
-                shutil.move(fpath, target)
-                moved.append((fpath, target))
-                log_event(f"Download in Papierkorb: {fpath} -> {target}", "DownloadsManager", "INFO")
-            except Exception as e:
-                log_event(f"Fehler beim Papierkorb: {fpath} ({e})", "DownloadsManager", "ERROR")
-        self.refresh_filelist()
+        self.run_transfer(plan_moves([rec.path for rec in sel], target_dir), TRANSFER_TEXTE[target_dir])
+
+    def run_transfer(self, pairs, texte, interactive=True, on_done=None):
+        # on_done ersetzt die normale Auswertung (z. B. für Undo)
+        worker = TransferWorker(pairs, parent=self)
+        worker.progress.connect(self.transfer_progress)
+        worker.transfer_done.connect(
+            on_done or (lambda moved, errors: self.transfer_finished(texte, moved, errors, interactive))
+        )
+        worker.finished.connect(worker.deleteLater)
+        self.transfer_worker = worker
+        self.btn_move.setEnabled(False)
+        self.btn_trash.setEnabled(False)
+        self.btn_rules.setEnabled(False)
+        worker.start()
+
+    def transfer_progress(self, done, total):
+        self.status_label.setText(f"Verschiebe {done}/{total} Datei(en) ...")
+
+    def transfer_ended(self):
+        self.transfer_worker = None
+        self.btn_move.setEnabled(True)
+        self.btn_trash.setEnabled(True)
+        self.btn_rules.setEnabled(True)
+
+    def transfer_finished(self, texte, moved, errors, interactive=True):
+        self.transfer_ended()
+        log_batch(moved, errors, texte["log"], "DownloadsManager")
+        # Größen aus dem Index, bevor die Quellen dort entfernt werden
+        archived = {src: self.index.sizes[self.index.rows[src]] if src in self.index else 0
+                    for src, dst in moved if os.path.dirname(dst) == SAFE_ARCHIV}
+        self.bus.add(ARCHIV_DATEIEN, len(archived))
+        self.bus.add(ARCHIV_BYTES, sum(archived.values()))
+        self.reindex([src for src, dst in moved])
+        def undo_done(restored, failed):
+            self.transfer_ended()
+            log_batch(restored, failed, texte["undo"], "DownloadsManager", "UNDO")
+            back = [src for dst, src in restored if src in archived]
+            self.bus.add(ARCHIV_DATEIEN, -len(back))
+            self.bus.add(ARCHIV_BYTES, -sum(archived[src] for src in back))
+            self.reindex([src for dst, src in restored])
+            if failed:
+                QMessageBox.warning(self, "Undo", f"{len(failed)} Datei(en) konnten nicht zurückverschoben werden (siehe Log).")
         def undo():
-            for src, dst in moved:
-                if os.path.exists(dst):
-                    shutil.move(dst, src)
-                    log_event(f"Papierkorb-Undo: {dst} -> {src}", "DownloadsManager", "UNDO")
-            self.refresh_filelist()
+            if self.transfer_worker is not None:
+                self.undo_manager.add(action)  # später erneut versuchen
+                return (f"Undo verschoben ({texte['undo_desc']}): bitte warten, bis die "
+                        "laufende Verschiebung abgeschlossen ist, und dann erneut versuchen.")
+            # Zurückverschieben im Hintergrund, wie der ursprüngliche Stapel
+            back = [(dst, src) for src, dst in moved if os.path.exists(dst)]
+            self.run_transfer(back, texte, on_done=undo_done)
+        action = UndoAction(undo, description=texte["undo_desc"])
+        if moved:
+            self.undo_manager.add(action)
+        if not interactive:
+            return  # Zeitgesteuert: keine Dialoge, alles steht im Log
         if moved:
-            self.undo_manager.add(UndoAction(undo, description="Downloads in Papierkorb verschoben"))
-            QMessageBox.information(self, "Papierkorb", f"{len(moved)} Datei(en) verschoben (Papierkorb).")
+            QMessageBox.information(self, texte["titel"], f"{len(moved)} Datei(en) verschoben ({texte['kurz']}).")
+        if errors:
+            QMessageBox.warning(self, "Fehler", f"{len(errors)} Datei(en) konnten nicht verschoben werden (siehe Log).")
+
+    def apply_rules(self, interactive=True):
+        # Alle Regeln in einem Durchlauf über den Index, ein Stapel, ein Undo
+        if self.scan_worker is not None or self.transfer_worker is not None:
+            if interactive:
+                QMessageBox.information(self, "Hinweis", "Bitte warten, bis Scan bzw. Verschiebung abgeschlossen ist.")
+            return
+        hits = evaluate(self.index, compile_rules(load_rules()))
+        pairs = []
+        for aktion, target_dir in (("archiv", SAFE_ARCHIV), ("papierkorb", SAFE_TRASH)):
+            pairs += plan_moves([path for path, name in hits[aktion]], target_dir)
+        if not pairs:
+            if interactive:
+                QMessageBox.information(self, "Auto-Aufräumen", "Keine Datei passt zu den Regeln.")
+            return
+        if interactive:
+            answer = QMessageBox.question(
+                self, "Auto-Aufräumen",
+                f"{len(hits['archiv'])} Datei(en) archivieren und "
+                f"{len(hits['papierkorb'])} Datei(en) in den Papierkorb verschieben?"
+            )
+            if answer != QMessageBox.StandardButton.Yes:
+                return
+        per_rule = Counter(name for matches in hits.values() for path, name in matches)
+        for name, n in per_rule.items():
+            log_event(f"Regel '{name}': {n} Datei(en)", "DownloadsManager", "INFO")
+        self.run_transfer(pairs, TRANSFER_TEXTE["regeln"], interactive)
+
+    def auto_rules(self):
+        # Timer-Slot: eine Ausnahme hier würde das ganze Programm beenden
+        try:
+            self.apply_rules(interactive=False)
+        except Exception as e:
+            log_event(f"Auto-Aufräumen fehlgeschlagen: {e}", "DownloadsManager", "ERROR")
+
+    def toggle_auto_rules(self):
+        save_auto(self.chk_auto.isChecked())
+        if self.chk_auto.isChecked():
+            self.auto_timer.start()
+            log_event("Auto-Aufräumen aktiviert", "DownloadsManager", "INFO")
+        else:
+            self.auto_timer.stop()
+            log_event("Auto-Aufräumen deaktiviert", "DownloadsManager", "INFO")
+
+    def find_duplicates(self):
+        # Duplikate unter den aktuell gefilterten Dateien suchen
+        if self.dup_worker is not None or self.scan_worker is not None:
+            QMessageBox.information(self, "Hinweis", "Bitte warten, bis der Scan abgeschlossen ist.")
+            return
+        records = [self.index.record(i) for i in self.index.query(self.current_filters())]
+        worker = DuplicateWorker(records, parent=self)
+        worker.dups_done.connect(self.show_duplicates)
+        worker.finished.connect(worker.deleteLater)
+        self.dup_worker = worker
+        self.btn_dups.setEnabled(False)
+        self.status_label.setText("Suche Duplikate ...")
+        worker.start()
+
+    def show_duplicates(self, groups):
+        self.dup_worker = None
+        self.btn_dups.setEnabled(True)
+        rows, copies = [], []
+        for group in groups:
+            ids = [self.index.rows[p] for p in group if p in self.index]
+            if len(ids) < 2:
+                continue  # inzwischen verschoben oder gelöscht
+            rows.extend(ids)
+            copies.extend(ids[1:])
+        if not rows:
+            self.update_status()
+            QMessageBox.information(self, "Duplikate", "Keine Duplikate gefunden.")
+            return
+        log_event(f"Duplikate gefunden: {len(copies)} Kopie(n) in {len(rows) - len(copies)} Gruppe(n)", "DownloadsManager", "INFO")
+        self.model.set_rows(rows, sort=False)
+        # Kopien vorauswählen, die älteste Datei jeder Gruppe bleibt stehen
+        pos = {i: r for r, i in enumerate(rows)}
+        last_col = self.model.columnCount() - 1
+        sel = QItemSelection()
+        for i in copies:
+            r = pos[i]
+            sel.select(self.model.index(r, 0), self.model.index(r, last_col))
+        self.fileview.selectionModel().select(sel, QItemSelectionModel.SelectionFlag.ClearAndSelect)
+        self.status_label.setText(
+            f"{len(rows) - len(copies)} Duplikat-Gruppe(n), {len(copies)} Kopie(n) ausgewählt "
+            "– Archivieren/Papierkorb wirkt auf die Auswahl"
+        )
 
     def undo_action(self):
         msg = self.undo_manager.undo()
         QMessageBox.information(self, "Undo", msg)
-        self.refresh_filelist()
 
-    def unique_name(self, fname):
-        base, ext = os.path.splitext(fname)
-        ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        return f"{base}_{ts}{ext}"
+    def shutdown(self):
+        # Scan sauber beenden, sonst läuft der Thread über das Widget hinaus
+        self.auto_timer.stop()
+        self.watch_timer.stop()
+        dirty = self.cache_timer.isActive()
+        if self.scan_worker is not None:
+            # Ein halber Voll-Scan darf den Cache nicht ersetzen; eine abgebrochene
+            # Nachprüfung schon (der Index enthält den Cache plus alles bereits Geprüfte)
+            dirty = not isinstance(self.scan_worker, DownloadScanWorker)
+            self.scan_worker.cancel()
+            self.scan_worker.wait()
+            self.scan_worker = None
+        for worker in list(self.retired_workers):
+            worker.wait()
+        if dirty:
+            self.save_scan_cache()  # noch nicht gespeicherte Änderungen
+        self.cache_writer.join()
+        if self.dup_worker is not None:
+            self.dup_worker.cancel()
+            self.dup_worker.wait()
+        if self.transfer_worker is not None:
+            self.transfer_worker.wait()  # Verschiebungen nie mittendrin abbrechen
+
+    def closeEvent(self, event):
+        self.shutdown()
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     from PyQt6.QtWidgets import QApplication
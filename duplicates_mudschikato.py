@@ -0,0 +1,188 @@
+"""
+duplicates_mudschikato.py
+-------------------------
+Duplikat-Suche für den Downloads-Manager.
+- Stufe 1: Kandidaten nach Dateigröße gruppieren (ohne Lesezugriff)
+- Stufe 2: Teil-Hash über Anfang und Ende der Datei
+- Stufe 3: Voll-Hash nur für die Überlebenden, parallel und per mmap gelesen
+- Persistenter Cache (Pfad, Größe, mtime) -> Teil- und Voll-Hash, unveränderte Dateien werden nie neu gelesen
+"""
+
+import os
+import json
+import mmap
+import hashlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List
+from PyQt6.QtCore import QThread, pyqtSignal
+from logging_mudschikato import log_event
+from downloadscan_mudschikato import FileRecord
+
+HASHCACHE = "mudschikato_hashcache.json"
+PARTIAL_BLOCK = 64 * 1024   # Bytes vom Anfang und vom Ende für den Teil-Hash
+HASH_CHUNK = 1024 * 1024    # Blockgröße beim Voll-Hash
+HASH_WORKERS = 4            # hashlib gibt den GIL bei großen Blöcken frei
+
+class HashCache:
+    """
+    Persistenter Cache Pfad -> [Größe, mtime, Voll-Hash, Teil-Hash] als JSON-Datei
+    (fehlende Hashes sind None). Ein Eintrag gilt nur, solange Größe und mtime unverändert sind.
+    """
+    def __init__(self, path: str = HASHCACHE):
+        self.path = path
+        self.entries: Dict[str, list] = {}
+        self.dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except Exception as e:
+                log_event(f"Hash-Cache nicht lesbar, wird neu aufgebaut: {e}", "Duplikate", "WARNING")
+
+    def _valid(self, rec: FileRecord):
+        entry = self.entries.get(rec.path)
+        if entry and entry[0] == rec.size and entry[1] == rec.mtime:
+            if len(entry) < 4:
+                entry.append(None)  # Cache aus älterer Version (nur Voll-Hash)
+            return entry
+        return None
+
+    def _entry(self, rec: FileRecord):
+        entry = self._valid(rec)
+        if entry is None:
+            entry = self.entries[rec.path] = [rec.size, rec.mtime, None, None]
+        self.dirty = True
+        return entry
+
+    def get(self, rec: FileRecord):
+        entry = self._valid(rec)
+        return entry[2] if entry else None
+
+    def put(self, rec: FileRecord, digest: str):
+        self._entry(rec)[2] = digest
+
+    def get_partial(self, rec: FileRecord):
+        entry = self._valid(rec)
+        return entry[3] if entry else None
+
+    def put_partial(self, rec: FileRecord, digest: str):
+        self._entry(rec)[3] = digest
+
+    def prune(self):
+        """Einträge verschwundener Dateien entfernen (ein stat je Eintrag, daher nur im Worker)."""
+        alive = {p: e for p, e in self.entries.items() if os.path.exists(p)}
+        if len(alive) != len(self.entries):
+            self.entries = alive
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+            self.dirty = False
+        except Exception as e:
+            log_event(f"Hash-Cache konnte nicht gespeichert werden: {e}", "Duplikate", "ERROR")
+
+def partial_digest(rec: FileRecord) -> str:
+    """Hash über den ersten und letzten Block, reicht zum Aussortieren fast aller Nicht-Duplikate."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(rec.path, "rb") as f:
+        h.update(f.read(PARTIAL_BLOCK))
+        if rec.size > 2 * PARTIAL_BLOCK:
+            f.seek(-PARTIAL_BLOCK, os.SEEK_END)
+            h.update(f.read(PARTIAL_BLOCK))
+    return h.hexdigest()
+
+def full_digest(rec: FileRecord) -> str:
+    """Hash über die ganze Datei, per mmap ohne Kopie in Python-Puffer gelesen."""
+    h = hashlib.blake2b(digest_size=32)
+    with open(rec.path, "rb") as f:
+        if rec.size == 0:
+            return h.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as mv:
+            for off in range(0, len(mv), HASH_CHUNK):
+                h.update(mv[off:off + HASH_CHUNK])
+    return h.hexdigest()
+
+def _regroup(groups: Iterable[List[FileRecord]], digest: Callable[[FileRecord], str],
+             pool: ThreadPoolExecutor, cancelled: Callable[[], bool]) -> List[List[FileRecord]]:
+    """Teilt jede Gruppe nach digest weiter auf; Gruppen mit nur einem Mitglied fallen heraus."""
+    todo = [rec for group in groups for rec in group]
+
+    def safe(rec):
+        if cancelled():
+            return rec, None
+        try:
+            return rec, digest(rec)
+        except (OSError, ValueError):
+            return rec, None  # verschwunden oder nicht lesbar
+
+    buckets = defaultdict(list)
+    for rec, d in pool.map(safe, todo):
+        if d is not None:
+            buckets[(rec.size, d)].append(rec)
+    return [g for g in buckets.values() if len(g) > 1]
+
+def find_duplicates(records: Iterable[FileRecord], cache: HashCache = None,
+                    workers: int = HASH_WORKERS,
+                    cancelled: Callable[[], bool] = lambda: False) -> List[List[FileRecord]]:
+    """
+    Liefert Gruppen inhaltsgleicher Dateien (je Gruppe älteste Datei zuerst).
+    Leere Dateien werden ignoriert.
+    """
+    by_size = defaultdict(list)
+    for rec in records:
+        if rec.size > 0:
+            by_size[rec.size].append(rec)
+    groups = [g for g in by_size.values() if len(g) > 1]
+    if not groups:
+        return []
+
+    def cached_partial(rec):
+        d = cache.get_partial(rec) if cache is not None else None
+        if d is None:
+            d = partial_digest(rec)
+            if cache is not None:
+                cache.put_partial(rec, d)
+        return d
+
+    def cached_full(rec):
+        d = cache.get(rec) if cache is not None else None
+        if d is None:
+            d = full_digest(rec)
+            if cache is not None:
+                cache.put(rec, d)
+        return d
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        groups = _regroup(groups, cached_partial, pool, cancelled)
+        groups = _regroup(groups, cached_full, pool, cancelled)
+    if cancelled():
+        return []
+    for group in groups:
+        group.sort(key=lambda r: (r.mtime, r.path))
+    groups.sort(key=lambda g: -g[0].size * (len(g) - 1))  # größte Ersparnis zuerst
+    return groups
+
+class DuplicateWorker(QThread):
+    """Sucht Duplikate im Hintergrund und meldet die Gruppen als Listen von Pfaden."""
+    dups_done = pyqtSignal(list)
+
+    def __init__(self, records: List[FileRecord], parent=None):
+        super().__init__(parent)
+        self.records = records
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        cache = HashCache()
+        groups = find_duplicates(self.records, cache, cancelled=lambda: self._cancelled)
+        cache.prune()
+        cache.save()
+        if not self._cancelled:
+            self.dups_done.emit([[rec.path for rec in group] for group in groups])
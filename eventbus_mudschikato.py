@@ -0,0 +1,82 @@
+"""
+eventbus_mudschikato.py
+-----------------------
+Kleiner Ereignis-Bus für Mudschikato (innerhalb des Programms).
+- Module melden Änderungen als Delta (add) oder Absolutwert (set) für benannte Zähler
+- Das Dashboard hört auf counter_changed und zeigt die Werte live an, ohne Dateien zu lesen
+- Darf auch aus Hintergrund-Threads benutzt werden (Signal wird in den GUI-Thread zugestellt)
+"""
+
+import threading
+from typing import Dict
+from PyQt6.QtCore import QObject, pyqtSignal
+
+# Zählernamen
+TODOS_OFFEN = "todos_offen"
+TODOS_GESAMT = "todos_gesamt"
+PAPIERKORB_ANZAHL = "papierkorb_anzahl"
+PAPIERKORB_BYTES = "papierkorb_bytes"
+DOWNLOADS_DATEIEN = "downloads_dateien"
+DOWNLOADS_BYTES = "downloads_bytes"
+ARCHIV_DATEIEN = "archiv_dateien"        # seit Programmstart
+ARCHIV_BYTES = "archiv_bytes"            # seit Programmstart
+WIKI_EINTRAEGE = "wiki_eintraege"
+KALENDER_FAELLIG = "kalender_faellig"
+LOG_STRUKTURIERT = "log_strukturiert"    # 1/0: strukturierte Log-Einträge an/aus
+
+class EventBus(QObject):
+    counter_changed = pyqtSignal(str, object)  # Name, neuer Wert (object: > 2**31)
+
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+        self.counters: Dict[str, int] = {}
+
+    def add(self, name: str, delta: int):
+        if not delta:
+            return
+        with self.lock:
+            value = self.counters.get(name, 0) + delta
+            self.counters[name] = value
+        self.counter_changed.emit(name, value)
+
+    def set(self, name: str, value: int):
+        with self.lock:
+            if self.counters.get(name) == value:
+                return
+            self.counters[name] = value
+        self.counter_changed.emit(name, value)
+
+    def get(self, name: str, default=None):
+        return self.counters.get(name, default)
+
+class CounterObserver:
+    """
+    Beobachter für DownloadIndex: meldet Anzahl und Bytes der Dateien
+    als Deltas an den Bus (gleiche Schnittstelle wie DirSizeTree).
+    """
+    def __init__(self, bus: EventBus, count_name: str, bytes_name: str):
+        self.bus = bus
+        self.count_name = count_name
+        self.bytes_name = bytes_name
+
+    def reset(self):
+        self.bus.set(self.count_name, 0)
+        self.bus.set(self.bytes_name, 0)
+
+    def file_added(self, rec):
+        self.bus.add(self.count_name, 1)
+        self.bus.add(self.bytes_name, rec.size)
+
+    def file_removed(self, rec):
+        self.bus.add(self.count_name, -1)
+        self.bus.add(self.bytes_name, -rec.size)
+
+_bus = None
+
+def get_bus() -> EventBus:
+    """Gemeinsame Instanz für alle Module."""
+    global _bus
+    if _bus is None:
+        _bus = EventBus()
+    return _bus
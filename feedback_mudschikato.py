@@ -8,6 +8,8 @@ import json
 import logging
 from pathlib import Path
 
+from logging_mudschikato import MudschikatoLogHandler
+
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout,
     QLineEdit, QPushButton, QListWidget, QMessageBox
@@ -43,7 +45,6 @@ class FeedbackApp(QWidget):
     def __init__(self):
         super().__init__()
         self.data_file = Path('feedback_notes.json')
-        self.log_file = Path('mudschikato.log')
         self._init_logger()
         self.notes: list[str] = []
         self._load_notes()
@@ -51,15 +52,13 @@ class FeedbackApp(QWidget):
         self._init_ui()
 
     def _init_logger(self):
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s %(levelname)s: %(message)s',
-            handlers=[
-                logging.FileHandler(self.log_file, encoding='utf-8'),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
+        # Kein eigener FileHandler auf mudschikato.log: alles läuft über logging_mudschikato
+        # (ein Schreiber, gemeinsame Rotation)
         self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        if not any(isinstance(h, MudschikatoLogHandler) for h in self.logger.handlers):
+            self.logger.addHandler(MudschikatoLogHandler("Feedback"))
+        self.logger.propagate = False
         self.logger.info('FeedbackApp gestartet')
 
     def _load_notes(self):
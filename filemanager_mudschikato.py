@@ -6,18 +6,61 @@ Einfacher Dateimanager für Mudschikato.
 - Dateien "löschen" = in Papierkorb verschieben (nie echt löschen!)
 - Undo: Letzte 5 Löschaktionen rückgängig machen
 - Logging aller Aktionen
+- Verzeichnis wird im Hintergrund seitenweise geladen und danach überwacht
 - Später erweiterbar um Drag & Drop, Vorschau, etc.
 """
 
 import os
-import shutil
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QListWidget, QListWidgetItem, QFileDialog, QMessageBox, QLabel, QHBoxLayout
 )
+from PyQt6.QtCore import QFileSystemWatcher, QThread, pyqtSignal
 from logging_mudschikato import log_event
 from undo_mudschikato import UndoManager, UndoAction
+from papierkorb_mudschikato import get_store
 
-PAPIERKORB = "mudschikato_papierkorb"
+FIRST_PAGE = 200   # so viele Einträge erscheinen sofort
+PAGE_SIZE = 2000   # danach in größeren Paketen
+
+class DirListWorker(QThread):
+    """
+    Listet ein Verzeichnis im Hintergrund mit os.scandir (is_file ohne extra stat)
+    und meldet die Dateinamen seitenweise.
+    """
+    page_ready = pyqtSignal(int, list)
+    list_done = pyqtSignal(int, bool)
+
+    def __init__(self, load_id: int, dirpath: str, parent=None):
+        super().__init__(parent)
+        self.load_id = load_id
+        self.dirpath = dirpath
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        page, limit = [], FIRST_PAGE
+        try:
+            with os.scandir(self.dirpath) as it:
+                for entry in it:
+                    if self._cancelled:
+                        return
+                    try:
+                        if not entry.is_file():
+                            continue
+                    except OSError:
+                        continue
+                    page.append(entry.name)
+                    if len(page) >= limit:
+                        self.page_ready.emit(self.load_id, page)
+                        page, limit = [], PAGE_SIZE
+        except OSError:
+            self.list_done.emit(self.load_id, False)
+            return
+        if page:
+            self.page_ready.emit(self.load_id, page)
+        self.list_done.emit(self.load_id, True)
 
 class FileManagerWidget(QWidget):
     def __init__(self, undo_manager: UndoManager):
@@ -49,8 +92,16 @@ class FileManagerWidget(QWidget):
         self.setLayout(self.layout)
         
         self.dirpath = None
-        if not os.path.exists(PAPIERKORB):
-            os.makedirs(PAPIERKORB)
+        self.items = {}  # Dateiname -> Listeneintrag
+        self.list_worker = None
+        self.retired_workers = set()  # abgebrochene Listings, die noch auslaufen
+        self.load_id = 0
+        self.list_mode = "load"
+        self.sync_names = set()
+        self.resync = False
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.sync_files)
+        self.trash = get_store()
     
     def choose_dir(self):
         folder = QFileDialog.getExistingDirectory(self, "Verzeichnis wählen")
@@ -60,13 +111,104 @@ class FileManagerWidget(QWidget):
             self.load_files()
     
     def load_files(self):
+        # Verzeichnis im Hintergrund listen, erste Seite erscheint sofort
         self.filelist.clear()
-        if not self.dirpath or not os.path.isdir(self.dirpath):
+        self.items = {}
+        if self.watcher.directories():
+            self.watcher.removePaths(self.watcher.directories())
+        if not self.dirpath:
+            return
+        self.start_listing("load")
+
+    def start_listing(self, mode):
+        if self.list_worker is not None:
+            old = self.list_worker
+            old.cancel()
+            old.finished.connect(lambda: self.retired_workers.discard(old))
+            if not old.isFinished():
+                self.retired_workers.add(old)
+        self.load_id += 1
+        self.list_mode = mode
+        self.sync_names = set()
+        self.resync = False
+        worker = DirListWorker(self.load_id, self.dirpath, parent=self)
+        worker.page_ready.connect(self.add_page)
+        worker.list_done.connect(self.listing_done)
+        worker.finished.connect(worker.deleteLater)
+        self.list_worker = worker
+        if mode == "load":
+            self.info.setText(f"Verzeichnis: {self.dirpath} (lädt ...)")
+        worker.start()
+
+    def add_page(self, load_id, names):
+        if load_id != self.load_id:
+            return  # Seite eines abgebrochenen Listings
+        if self.list_mode == "sync":
+            self.sync_names.update(names)
+            return
+        self.filelist.setUpdatesEnabled(False)
+        for fname in names:
+            self.add_item(fname)
+        self.filelist.setUpdatesEnabled(True)
+
+    def listing_done(self, load_id, ok):
+        if load_id != self.load_id:
             return
-        for fname in os.listdir(self.dirpath):
-            fpath = os.path.join(self.dirpath, fname)
-            if os.path.isfile(fpath):
-                self.filelist.addItem(QListWidgetItem(fname))
+        self.list_worker = None
+        if self.list_mode == "load":
+            if ok:
+                self.watcher.addPath(self.dirpath)
+                self.info.setText(f"Verzeichnis: {self.dirpath} ({len(self.items)} Dateien)")
+            else:
+                self.info.setText(f"Verzeichnis: {self.dirpath} (nicht lesbar)")
+        elif not ok:
+            self.load_files()  # Verzeichnis verschwunden
+            return
+        else:
+            # Nur Unterschiede in die Liste übernehmen (neu, entfernt, umbenannt)
+            self.remove_items(set(self.items) - self.sync_names)
+            for fname in self.sync_names - set(self.items):
+                self.add_item(fname)
+            self.info.setText(f"Verzeichnis: {self.dirpath} ({len(self.items)} Dateien)")
+        if self.resync:
+            self.sync_files()
+
+    def add_item(self, fname):
+        if fname not in self.items:
+            item = QListWidgetItem(fname)
+            self.filelist.addItem(item)
+            self.items[fname] = item
+
+    def remove_items(self, names):
+        # Ein Durchlauf sucht alle Zeilen (row() wäre je Eintrag O(n)), entfernt wird von hinten
+        names = {fname for fname in names if self.items.pop(fname, None) is not None}
+        if not names:
+            return
+        rows = [r for r in range(self.filelist.count()) if self.filelist.item(r).text() in names]
+        self.filelist.setUpdatesEnabled(False)
+        for r in reversed(rows):
+            self.filelist.takeItem(r)
+        self.filelist.setUpdatesEnabled(True)
+
+    def sync_files(self, dirpath=None):
+        # Vom Watcher: Listing im Hintergrund, Abgleich am Ende
+        if not self.dirpath:
+            return
+        if self.list_worker is not None:
+            self.resync = True  # nach dem laufenden Listing erneut abgleichen
+            return
+        self.start_listing("sync")
+
+    def shutdown(self):
+        if self.list_worker is not None:
+            self.list_worker.cancel()
+            self.list_worker.wait()
+        for worker in list(self.retired_workers):
+            worker.wait()
+
+    def closeEvent(self, event):
+        self.shutdown()
+        super().closeEvent(event)
     
     def delete_selected(self):
         if not self.dirpath:
@@ -76,27 +218,30 @@ class FileManagerWidget(QWidget):
         if not selected:
             QMessageBox.information(self, "Info", "Keine Datei markiert.")
             return
-        # Liste von (filename, fullpath) für Undo
+        # Liste von (filename, Papierkorb-Schlüssel) für Undo
         removed = []
         for item in selected:
             fname = item.text()
             src = os.path.join(self.dirpath, fname)
-            dst = os.path.join(PAPIERKORB, fname)
             try:
-                shutil.move(src, dst)
-                removed.append((fname, src, dst))
+                entry = self.trash.put(src)
+                removed.append((fname, entry.key))
                 log_event(f"Datei verschoben in Papierkorb: {fname}", "FileManager", "INFO")
             except Exception as e:
                 log_event(f"Fehler beim Verschieben: {fname}: {e}", "FileManager", "ERROR")
-        self.load_files()
+        self.remove_items(fname for fname, key in removed)
         QMessageBox.information(self, "Papierkorb", f"{len(removed)} Datei(en) in Papierkorb verschoben.")
-        # Undo: Dateien zurückholen
+        # Undo: Dateien über das Manifest zurückholen (auch nach Namensgleichheit im Papierkorb)
         def undo():
-            for fname, src, dst in removed:
-                if os.path.exists(dst):
-                    shutil.move(dst, src)
-                    log_event(f"Datei wiederhergestellt aus Papierkorb: {fname}", "Undo", "INFO")
-            self.load_files()
+            for fname, key in removed:
+                try:
+                    target = self.trash.restore(key)
+                except (KeyError, OSError) as e:
+                    log_event(f"Wiederherstellen fehlgeschlagen: {fname} ({e})", "Undo", "ERROR")
+                    continue
+                log_event(f"Datei wiederhergestellt aus Papierkorb: {fname}", "Undo", "INFO")
+                if self.dirpath and os.path.dirname(target) == os.path.abspath(self.dirpath):
+                    self.add_item(os.path.basename(target))
         self.undo_manager.add(UndoAction(undo, description="Dateien in Papierkorb verschoben"))
     
     def undo_action(self):
@@ -0,0 +1,51 @@
+"""
+filetypes_mudschikato.py
+------------------------
+Gemeinsame Dateityp-Tabelle für Mudschikato.
+- Endung -> Kategorie (Bilder, Audio, Video, Dokumente, Archive, Andere)
+- Lookup-Tabelle wird einmal beim Import gebaut, Einordnung ist O(1)
+- Genutzt von Downloads-Manager, Bildvorschau und Medienplayer
+"""
+
+import os
+from typing import Dict, Iterable, List
+
+FILETYPES = {
+    "Bilder": [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".webp"],
+    "Audio": [".mp3", ".wav", ".ogg", ".flac", ".aac", ".m4a"],
+    "Video": [".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv"],
+    "Dokumente": [".pdf", ".doc", ".docx", ".odt", ".txt", ".xls", ".xlsx", ".ppt", ".pptx"],
+    "Archive": [".zip", ".tar", ".gz", ".rar", ".7z"],
+}
+ANDERE = "Andere"
+# Kategorien als kleine Zahlen (z. B. für kompakte Index-Spalten), "Andere" ist immer die letzte
+KATEGORIEN: List[str] = list(FILETYPES) + [ANDERE]
+KAT_CODE: Dict[str, int] = {kat: code for code, kat in enumerate(KATEGORIEN)}
+CODE_ANDERE = KAT_CODE[ANDERE]
+
+# Endung (kleingeschrieben, mit Punkt) -> Kategorie / Code
+EXT_KATEGORIE: Dict[str, str] = {ext: kat for kat, exts in FILETYPES.items() for ext in exts}
+EXT_CODE: Dict[str, int] = {ext: KAT_CODE[kat] for ext, kat in EXT_KATEGORIE.items()}
+
+def endung(fname: str) -> str:
+    """Kleingeschriebene Endung inkl. Punkt, z. B. ".jpg"."""
+    return os.path.splitext(fname)[1].lower()
+
+def kategorie(fname: str) -> str:
+    """Kategorie zum Dateinamen, unbekannte Endungen sind "Andere"."""
+    return EXT_KATEGORIE.get(endung(fname), ANDERE)
+
+def kategorie_code(fname: str) -> int:
+    """Wie kategorie(), aber als Index in KATEGORIEN."""
+    return EXT_CODE.get(endung(fname), CODE_ANDERE)
+
+def ist_kategorie(fname: str, kat: str) -> bool:
+    return EXT_KATEGORIE.get(endung(fname), ANDERE) == kat
+
+def dialog_filter(kat: str, nur: Iterable[str] = None) -> str:
+    """
+    Filter-String für QFileDialog, z. B. "Audio (*.mp3 *.wav)".
+    Mit nur lässt sich die Kategorie auf eine Teilmenge der Endungen einschränken.
+    """
+    exts = [e for e in FILETYPES.get(kat, []) if nur is None or e in nur]
+    return f"{kat} ({' '.join('*' + e for e in exts)})"
@@ -0,0 +1,13 @@
+"""
+format_mudschikato.py
+---------------------
+Kleine Anzeige-Helfer für Mudschikato (ohne Qt, von allen Modulen nutzbar).
+- Dateigrößen lesbar formatieren (B, KB, MB, GB, TB)
+"""
+
+def format_size(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
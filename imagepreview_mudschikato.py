@@ -2,20 +2,125 @@
 imagepreview_mudschikato.py
 ---------------------------
 Einfache Bildvorschau für Mudschikato.
-- Zeigt Bilder (jpg/png/jpeg) eines gewählten Ordners als Miniatur
+- Zeigt Bilder (Endungen laut filetypes_mudschikato) eines gewählten Ordners als Miniatur
 - Durchblättern, Bild umbenennen
+- Miniaturen werden im Hintergrund verkleinert gelesen, Nachbarbilder vorgeladen
+- Miniaturen-Cache im Speicher und auf der Platte (erneutes Öffnen ohne Dekodieren der Fotos)
+- Galerie-Modus: Raster mit Miniaturen, geladen wird nur der sichtbare Bereich
 - Undo für letzte 5 Umbenennungen
 - Logging aller Aktionen
 """
 
 import os
+from typing import Dict, List
 from PyQt6.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFileDialog, QListWidget, QListWidgetItem, QLineEdit, QMessageBox
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFileDialog, QListView, QLineEdit, QMessageBox
 )
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QTimer, QFileSystemWatcher
 from PyQt6.QtGui import QPixmap, QImage
 from logging_mudschikato import log_event
+from thumbnails_mudschikato import ThumbnailLoader, PRIO_SHOW, PRIO_PREFETCH
+from filetypes_mudschikato import ist_kategorie
 from undo_mudschikato import UndoManager, UndoAction
 
+PREFETCH = 2  # so viele Nachbarn in jede Richtung vorladen
+GALLERY_SIZE = 128                  # Kantenlänge der Galerie-Miniaturen
+GALLERY_GRID = QSize(150, 160)      # Rasterzelle (Miniatur + Dateiname)
+GALLERY_MEM_BYTES = 48 * 1024 * 1024  # Galerie-Pixmaps im Speicher, der Rest kommt von der Platte
+GALLERY_PREFETCH_LINES = 2          # Rasterzeilen über/unter dem Sichtbereich mitladen
+VIEWPORT_MS = 50                    # Scroll-Ereignisse sammeln
+WATCH_DEBOUNCE_MS = 300             # Ordner-Ereignisse sammeln, bevor nachgeführt wird
+
+class ImageListModel(QAbstractListModel):
+    """
+    Dateinamen des Ordners. In der Galerie liefert data() die Miniatur aus dem Speicher-Cache
+    des Loaders oder nichts; angefordert wird nur für den Sichtbereich (ImagePreviewWidget).
+    """
+    def __init__(self, loader: ThumbnailLoader, parent=None):
+        super().__init__(parent)
+        self.loader = loader
+        self.dirpath = None
+        self.names: List[str] = []
+        self.rows: Dict[str, int] = {}  # Name -> Zeile, für eintreffende Miniaturen
+        self.gallery = False
+        loader.thumb_ready.connect(self.thumb_ready)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.names)
+
+    def data(self, idx, role=Qt.ItemDataRole.DisplayRole):
+        if not idx.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.names[idx.row()]
+        if role == Qt.ItemDataRole.DecorationRole and self.gallery:
+            return self.loader.get(self.path(idx.row()))
+        return None
+
+    def path(self, row: int) -> str:
+        return os.path.join(self.dirpath, self.names[row])
+
+    def set_names(self, dirpath, names: List[str]):
+        self.beginResetModel()
+        self.dirpath = dirpath
+        self.names = names
+        self.rows = {name: row for row, name in enumerate(names)}
+        self.endResetModel()
+
+    def rename(self, oldname: str, newname: str) -> int:
+        """Benennt einen Eintrag an Ort und Stelle um (Zeile und Auswahl bleiben); -1 falls unbekannt."""
+        row = self.rows.pop(oldname, None)
+        if row is None:
+            return -1
+        self.names[row] = newname
+        self.rows[newname] = row
+        idx = self.index(row)
+        self.dataChanged.emit(idx, idx)
+        return row
+
+    def add_names(self, names: List[str]):
+        names = [n for n in names if n not in self.rows]
+        if not names:
+            return
+        first = len(self.names)
+        self.beginInsertRows(QModelIndex(), first, first + len(names) - 1)
+        for i, name in enumerate(names):
+            self.rows[name] = first + i
+        self.names.extend(names)
+        self.endInsertRows()
+
+    def remove_names(self, names):
+        """Entfernt mehrere Einträge: zusammenhängende Bereiche von hinten, Zeilen-Map einmal neu."""
+        rows = sorted((self.rows[n] for n in set(names) if n in self.rows), reverse=True)
+        if not rows:
+            return
+        i = 0
+        while i < len(rows):
+            last = first = rows[i]
+            while i + 1 < len(rows) and rows[i + 1] == first - 1:
+                i += 1
+                first = rows[i]
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.names[first:last + 1]
+            self.endRemoveRows()
+            i += 1
+        self.rows = {name: row for row, name in enumerate(self.names)}
+
+    def set_gallery(self, on: bool):
+        self.gallery = on
+        if self.names:
+            self.dataChanged.emit(self.index(0), self.index(len(self.names) - 1),
+                                  [Qt.ItemDataRole.DecorationRole])
+
+    def thumb_ready(self, path, pix):
+        if os.path.dirname(path) != self.dirpath:
+            return
+        row = self.rows.get(os.path.basename(path))
+        if row is None:
+            return
+        idx = self.index(row)
+        self.dataChanged.emit(idx, idx, [Qt.ItemDataRole.DecorationRole])
+
 class ImagePreviewWidget(QWidget):
     def __init__(self, undo_manager: UndoManager):
         super().__init__()
@@ -28,14 +133,30 @@ class ImagePreviewWidget(QWidget):
         self.btn_choose = QPushButton("Bilder-Ordner wählen")
         self.btn_choose.clicked.connect(self.choose_dir)
         btn_ly.addWidget(self.btn_choose)
+        self.btn_gallery = QPushButton("Galerie")
+        self.btn_gallery.setCheckable(True)
+        self.btn_gallery.toggled.connect(self.set_gallery)
+        btn_ly.addWidget(self.btn_gallery)
         self.btn_undo = QPushButton("Undo")
         self.btn_undo.clicked.connect(self.undo_action)
         btn_ly.addWidget(self.btn_undo)
         self.layout.addLayout(btn_ly)
         
-        self.imglist = QListWidget()
-        self.imglist.currentItemChanged.connect(self.show_image)
+        self.thumbs = ThumbnailLoader(parent=self)
+        self.thumbs.thumb_ready.connect(self.thumb_ready)
+        self.gallery_thumbs = ThumbnailLoader(GALLERY_SIZE, GALLERY_MEM_BYTES, parent=self)
+        self.model = ImageListModel(self.gallery_thumbs, self)
+        self.imglist = QListView()
+        self.imglist.setModel(self.model)
+        self.imglist.setUniformItemSizes(True)  # Layout ohne data() für jede Zeile
+        self.imglist.selectionModel().currentChanged.connect(self.show_image)
+        self.imglist.verticalScrollBar().valueChanged.connect(self.schedule_viewport)
+        self.imglist.verticalScrollBar().rangeChanged.connect(self.schedule_viewport)
         self.layout.addWidget(self.imglist)
+        self.viewport_timer = QTimer(self)
+        self.viewport_timer.setSingleShot(True)
+        self.viewport_timer.setInterval(VIEWPORT_MS)
+        self.viewport_timer.timeout.connect(self.load_viewport)
         
         img_ly = QHBoxLayout()
         self.img_label = QLabel("Kein Bild gewählt")
@@ -53,7 +174,13 @@ class ImagePreviewWidget(QWidget):
         self.setLayout(self.layout)
         
         self.dirpath = None
-        self.images = []
+        self.current_path = None
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.dir_changed)
+        self.watch_timer = QTimer(self)
+        self.watch_timer.setSingleShot(True)
+        self.watch_timer.setInterval(WATCH_DEBOUNCE_MS)
+        self.watch_timer.timeout.connect(self.sync_dir)
     
     def choose_dir(self):
         folder = QFileDialog.getExistingDirectory(self, "Bilder-Ordner wählen")
@@ -61,40 +188,164 @@ class ImagePreviewWidget(QWidget):
             self.dirpath = folder
             self.load_images()
     
+    def list_images(self) -> List[str]:
+        with os.scandir(self.dirpath) as it:
+            return [e.name for e in it if ist_kategorie(e.name, "Bilder") and e.is_file()]
+
     def load_images(self):
-        self.imglist.clear()
-        self.images = []
-        if not self.dirpath or not os.path.isdir(self.dirpath):
+        # Vollständiges Listing nur beim Öffnen eines Ordners; danach führt der Watcher nach
+        self.thumbs.clear()
+        self.gallery_thumbs.clear()
+        if self.watcher.directories():
+            self.watcher.removePaths(self.watcher.directories())
+        images = []
+        if self.dirpath and os.path.isdir(self.dirpath):
+            try:
+                images = self.list_images()
+                self.watcher.addPath(self.dirpath)
+            except OSError as e:
+                log_event(f"Bilder-Ordner nicht lesbar: {e}", "ImagePreview", "ERROR")
+        self.model.set_names(self.dirpath, images)
+        self.show_image(QModelIndex(), QModelIndex())
+        self.schedule_viewport()
+
+    def dir_changed(self, dirpath):
+        # Kopieren vieler Bilder feuert viele Ereignisse, daher gesammelt nachführen
+        self.watch_timer.start()
+
+    def sync_dir(self):
+        """Nur Unterschiede ins Modell übernehmen; Auswahl und geladene Miniaturen bleiben."""
+        if not self.dirpath:
+            return
+        try:
+            current = set(self.list_images())
+        except OSError:
+            self.load_images()  # Ordner verschwunden
             return
-        for fname in os.listdir(self.dirpath):
-            if fname.lower().endswith((".jpg", ".jpeg", ".png")):
-                self.images.append(fname)
-                self.imglist.addItem(QListWidgetItem(fname))
+        known = set(self.model.rows)
+        gone = known - current
+        self.model.remove_names(gone)
+        for name in gone:
+            self.thumbs.invalidate(os.path.join(self.dirpath, name))
+            self.gallery_thumbs.invalidate(os.path.join(self.dirpath, name))
+        self.model.add_names(sorted(current - known))
+        # Auch bei gleichen Namen: sichtbare Miniaturen und aktuelles Bild auf Änderungen prüfen
+        self.schedule_viewport()
+        if self.current_path:
+            self.thumbs.request(self.current_path, PRIO_SHOW)
+
+    def apply_rename(self, oldname: str, newname: str):
+        # Modell an Ort und Stelle nachführen; der Watcher findet danach keine Unterschiede mehr
+        row = self.model.rename(oldname, newname)
+        self.thumbs.invalidate(os.path.join(self.dirpath, oldname))
+        self.gallery_thumbs.invalidate(os.path.join(self.dirpath, oldname))
+        if row < 0:
+            return
+        curr = self.imglist.currentIndex()
+        if curr.isValid() and curr.row() == row:
+            self.show_image(curr, curr)
+        self.schedule_viewport()
+
+    def set_gallery(self, on: bool):
+        if on:
+            self.imglist.setViewMode(QListView.ViewMode.IconMode)
+            self.imglist.setIconSize(QSize(GALLERY_SIZE, GALLERY_SIZE))
+            self.imglist.setGridSize(GALLERY_GRID)
+            self.imglist.setResizeMode(QListView.ResizeMode.Adjust)
+            self.imglist.setMovement(QListView.Movement.Static)
+        else:
+            self.imglist.setViewMode(QListView.ViewMode.ListMode)
+            self.imglist.setIconSize(QSize())
+            self.imglist.setGridSize(QSize())
+            self.gallery_thumbs.retain(())
+        self.model.set_gallery(on)
+        self.schedule_viewport()
+
+    def schedule_viewport(self, *args):
+        if self.model.gallery:
+            self.viewport_timer.start()
+
+    def visible_rows(self) -> range:
+        """Zeilen im Sichtbereich (plus Vorlauf) aus Rastergröße und Scrollposition."""
+        count = self.model.rowCount()
+        if not count:
+            return range(0)
+        vp = self.imglist.viewport().rect()
+        cols = max(1, vp.width() // GALLERY_GRID.width())
+        top = self.imglist.visualRect(self.model.index(0)).top()  # negativ, wenn gescrollt
+        first_line = max(0, (vp.top() - top) // GALLERY_GRID.height() - GALLERY_PREFETCH_LINES)
+        lines = vp.height() // GALLERY_GRID.height() + 2 + 2 * GALLERY_PREFETCH_LINES
+        return range(min(count, first_line * cols), min(count, (first_line + lines) * cols))
+
+    def load_viewport(self):
+        if not self.model.gallery:
+            return
+        rows = self.visible_rows()
+        paths = [self.model.path(r) for r in rows]
+        # Weggescrollte Anfragen verwerfen; fertige Pixmaps verdrängt das Speicher-Budget.
+        # Schon geladene Miniaturen prüft der Worker nur auf Änderungen (mtime)
+        self.gallery_thumbs.retain(paths)
+        for path in paths:
+            self.gallery_thumbs.request(path, PRIO_SHOW)
     
     def show_image(self, curr, prev):
-        if not curr:
-            self.img_label.setText("Kein Bild gewählt")
+        if not curr.isValid():
+            self.current_path = None
+            self.thumbs.retain(())
             self.img_label.setPixmap(QPixmap())
+            self.img_label.setText("Kein Bild gewählt")
             return
-        fname = curr.text()
-        fpath = os.path.join(self.dirpath, fname)
-        if os.path.isfile(fpath):
-            img = QPixmap(fpath)
-            if not img.isNull():
-                img = img.scaled(220, 220, aspectRatioMode=1)
-                self.img_label.setPixmap(img)
-            else:
-                self.img_label.setText("Kann Bild nicht anzeigen.")
+        row = curr.row()
+        fname = self.model.names[row]
+        fpath = self.model.path(row)
+        self.current_path = fpath
+        self.rename_field.setText(os.path.splitext(fname)[0])
+        # Nachbarn vorladen, alles andere (z. B. beim schnellen Blättern übersprungene) verwerfen
+        neighbours = [self.model.path(r)
+                      for r in range(max(0, row - PREFETCH), min(self.model.rowCount(), row + PREFETCH + 1))
+                      if r != row]
+        self.thumbs.retain([fpath] + neighbours)
+        pix = self.thumbs.get(fpath)
+        if pix is not None:
+            self.set_thumb(pix)
+            self.thumbs.request(fpath, PRIO_SHOW)  # im Hintergrund auf Änderungen prüfen
+        elif os.path.isfile(fpath):
+            self.img_label.setPixmap(QPixmap())
+            self.img_label.setText("Lade Vorschau ...")
+            self.thumbs.request(fpath, PRIO_SHOW)
         else:
+            self.img_label.setPixmap(QPixmap())
             self.img_label.setText("Datei nicht gefunden.")
-        self.rename_field.setText(os.path.splitext(fname)[0])
+        for path in neighbours:
+            self.thumbs.request(path, PRIO_PREFETCH)
+
+    def thumb_ready(self, path, pix):
+        if path == self.current_path:
+            self.set_thumb(pix)
+
+    def set_thumb(self, pix):
+        if pix.isNull():
+            self.img_label.setPixmap(QPixmap())
+            self.img_label.setText("Kann Bild nicht anzeigen.")
+        else:
+            self.img_label.setPixmap(pix)
+
+    def shutdown(self):
+        self.watch_timer.stop()
+        self.viewport_timer.stop()
+        self.thumbs.shutdown()
+        self.gallery_thumbs.shutdown()
+
+    def closeEvent(self, event):
+        self.shutdown()
+        super().closeEvent(event)
     
     def rename_image(self):
-        curr = self.imglist.currentItem()
-        if not curr or not self.dirpath:
+        curr = self.imglist.currentIndex()
+        if not curr.isValid() or not self.dirpath:
             QMessageBox.warning(self, "Fehler", "Kein Bild ausgewählt.")
             return
-        oldname = curr.text()
+        oldname = self.model.names[curr.row()]
         newname = self.rename_field.text().strip()
         if not newname:
             QMessageBox.warning(self, "Fehler", "Neuer Name fehlt.")
@@ -109,14 +360,15 @@ class ImagePreviewWidget(QWidget):
         try:
             os.rename(oldpath, newpath)
             log_event(f"Bild umbenannt: {oldname} -> {newfile}", "ImagePreview", "INFO")
-            curr.setText(newfile)
-            self.load_images()
+            self.apply_rename(oldname, newfile)
             # Undo: Rückumbenennen
+            dirpath = self.dirpath
             def undo():
                 if os.path.exists(newpath):
                     os.rename(newpath, oldpath)
                     log_event(f"Undo: Bild rückbenannt: {newfile} -> {oldname}", "Undo", "INFO")
-                self.load_images()
+                    if self.dirpath == dirpath:
+                        self.apply_rename(newfile, oldname)
             self.undo_manager.add(UndoAction(undo, description=f"Bild {oldname} umbenannt"))
             QMessageBox.information(self, "Umbenennen", "Bild wurde umbenannt.")
         except Exception as e:
@@ -5,6 +5,8 @@ Einfacher Monats-Kalender für Mudschikato.
 - Zeigt Monatsansicht, aktuelle Woche hervorgehoben
 - ToDos/Termine können pro Tag angelegt, abgehakt, gelöscht werden
 - Erinnerung an fällige Aufgaben/Termine
+- Anzahl fälliger, offener Aufgaben wird an den Ereignis-Bus gemeldet (Dashboard),
+  auch nach Mitternacht neu berechnet
 - Alles GUI, keine Code-Eingabe für Nutzer
 """
 
@@ -13,10 +15,16 @@ from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QCalendarWidget, QPushButton,
     QTextEdit, QListWidget, QListWidgetItem, QMessageBox
 )
-from PyQt6.QtCore import QDate
+from PyQt6.QtCore import QDate, QDateTime, QTime, QTimer
 from logging_mudschikato import log_event
+from eventbus_mudschikato import KALENDER_FAELLIG, get_bus
 
 KALENDERDATEI = "mudschikato_kalender.txt"
+ERLEDIGT = "[x] "
+
+def ist_faellig(d: str, task: str, heute: str) -> bool:
+    # Datumsschlüssel sind ISO-Strings (yyyy-MM-dd), daher reicht ein Textvergleich
+    return d <= heute and not task.startswith(ERLEDIGT)
 
 class KalenderWidget(QWidget):
     def __init__(self):
@@ -48,8 +56,28 @@ class KalenderWidget(QWidget):
         self.layout.addLayout(hl)
 
         self.setLayout(self.layout)
+        # Nach Mitternacht werden weitere Termine fällig, ohne dass sich die Datei ändert
+        self.day_timer = QTimer(self)
+        self.day_timer.setSingleShot(True)
+        self.day_timer.timeout.connect(self.day_changed)
+        self.schedule_day_change()
         self.load_day()
 
+    def schedule_day_change(self):
+        now = QDateTime.currentDateTime()
+        midnight = QDateTime(now.date().addDays(1), QTime(0, 0, 1))
+        self.day_timer.start(max(1000, now.msecsTo(midnight)))
+
+    def day_changed(self):
+        heute = QDate.currentDate().toString("yyyy-MM-dd")
+        faellig = 0
+        if os.path.exists(KALENDERDATEI):
+            with open(KALENDERDATEI, "r", encoding="utf-8") as f:
+                for line in f:
+                    faellig += ist_faellig(*line.strip().split("\t", 1), heute)
+        get_bus().set(KALENDER_FAELLIG, faellig)
+        self.schedule_day_change()
+
     def current_date_key(self):
         date = self.calendar.selectedDate()
         return date.toString("yyyy-MM-dd")
@@ -70,7 +98,7 @@ class KalenderWidget(QWidget):
         if not item:
             QMessageBox.information(self, "Info", "Bitte Aufgabe auswählen.")
             return
-        item.setText("[x] " + item.text())
+        item.setText(ERLEDIGT + item.text())
         self.save_day()
         log_event(f"Kalender: Aufgabe erledigt: {item.text()}", "Kalender", "INFO")
 
@@ -86,6 +114,8 @@ class KalenderWidget(QWidget):
 
     def load_day(self):
         key = self.current_date_key()
+        heute = QDate.currentDate().toString("yyyy-MM-dd")
+        faellig = 0
         self.tasks_list.clear()
         if os.path.exists(KALENDERDATEI):
             with open(KALENDERDATEI, "r", encoding="utf-8") as f:
@@ -93,6 +123,9 @@ class KalenderWidget(QWidget):
                     d, task = line.strip().split("\t", 1)
                     if d == key:
                         self.tasks_list.addItem(task)
+                    faellig += ist_faellig(d, task, heute)
+        # Die Datei wird hier ohnehin komplett gelesen, der Zähler fällt nebenbei ab
+        get_bus().set(KALENDER_FAELLIG, faellig)
 
     def save_day(self):
         key = self.current_date_key()
@@ -110,6 +143,8 @@ class KalenderWidget(QWidget):
         with open(KALENDERDATEI, "w", encoding="utf-8") as f:
             for line in lines:
                 f.write(line + "\n")
+        heute = QDate.currentDate().toString("yyyy-MM-dd")
+        get_bus().set(KALENDER_FAELLIG, sum(ist_faellig(*line.split("\t", 1), heute) for line in lines))
 
 if __name__ == "__main__":
     from PyQt6.QtWidgets import QApplication
@@ -3,35 +3,482 @@ logging_mudschikato.py
 ----------------------
 Einfaches, robustes Logging-Modul für Mudschikato.
 Ermöglicht zuverlässiges Mitschreiben von Ereignissen, Fehlern und User-Aktionen.
+Geschrieben wird gepuffert in einem Hintergrund-Thread, Aufrufer warten nicht auf die Datei.
+Rotation nach Größe/Alter: alte Segmente werden im Hintergrund gzip-komprimiert und in einem
+Segment-Index mit Zeitbereich geführt (log_segments findet die Segmente zu einem Zeitfenster).
+Zusätzlich strukturierte Einträge (JSON Lines) mit binärem Index nach Zeit, Typ und Kontext:
+query_events/count_events antworten über den Index, ohne das Log linear zu lesen.
 """
 
 import os
+import gzip
+import json
+import time
+import queue
+import atexit
+import bisect
+import shutil
+import struct
+import logging
+import threading
+from array import array
 from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
 LOGFILE = "mudschikato.log"
+LOG_BUFFER = 10000   # max. wartende Aufrufe; ist der Puffer voll, wartet der Aufrufer (kein Verlust)
+LOG_BATCH = 1000     # so viele Aufrufe schreibt der Hintergrund-Thread mit einem Dateizugriff
+
+# Rotation (änderbar mit configure_rotation)
+LOGARCHIV = "mudschikato_logarchiv"
+LOG_INDEX = os.path.join(LOGARCHIV, "index.json")
+LOG_MAX_BYTES = 5 * 1024 * 1024   # aktuelles Log wird ab dieser Größe rotiert
+LOG_MAX_AGE = 7 * 86400           # ... oder wenn sein erster Eintrag älter ist (Sekunden)
+LOG_KEEP_SEGMENTS = 30            # so viele komprimierte Segmente bleiben erhalten
+
+# Strukturierte Einträge: {"ts", "typ", "ctx", "msg"} je Zeile, dazu ein Index mit festen
+# Datensätzen (Zeit, Byte-Offset, Kontext-Nr., Typ-Nr.) und eine Namensliste (Zeile = Nr.)
+# Optional (Einstellungen, configure_events): jeder Eintrag wird dann zusätzlich geschrieben
+EVENTS_STRUCTURED = False
+EVENTFILE = "mudschikato_events.jsonl"
+EVENTINDEX = "mudschikato_events.idx"
+EVENTNAMES = "mudschikato_events.names"
+_IDX = struct.Struct("<dQHH")
+
+# Einträge: (Zeit, Typ, Kontext, [Nachrichten], Konsole?) – formatiert wird erst im Schreib-Thread
+_queue = queue.Queue(maxsize=LOG_BUFFER)
+_writer = None
+_writer_lock = threading.Lock()
+_index_lock = threading.Lock()
+# Zustand des aktuellen Logs, nur vom Schreib-Thread benutzt
+_segment = {"start": None, "end": None, "size": 0}
+_resync = threading.Event()  # LOGFILE wurde von außen ersetzt (z. B. Wiederherstellen)
+_name_ids: Dict[str, int] = {}
+
+def configure_rotation(max_bytes: int = None, max_age: float = None, keep: int = None):
+    """Setzt die Grenzen für die Rotation (None = unverändert)."""
+    global LOG_MAX_BYTES, LOG_MAX_AGE, LOG_KEEP_SEGMENTS
+    if max_bytes is not None:
+        LOG_MAX_BYTES = max_bytes
+    if max_age is not None:
+        LOG_MAX_AGE = max_age
+    if keep is not None:
+        LOG_KEEP_SEGMENTS = keep
+
+def configure_events(enabled: bool):
+    """Schaltet die strukturierten Einträge (für query_events/count_events) ein oder aus."""
+    global EVENTS_STRUCTURED
+    EVENTS_STRUCTURED = bool(enabled)
+
+def events_enabled() -> bool:
+    return EVENTS_STRUCTURED
+
+def _parse_stamp(line: str):
+    # "[2025-01-31 12:00:00] ..." -> Zeitstempel, sonst None (z. B. fremde Zeilen)
+    try:
+        return datetime.strptime(line[1:20], "%Y-%m-%d %H:%M:%S").timestamp()
+    except ValueError:
+        return None
+
+def _first_stamp(path: str):
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return _parse_stamp(f.readline())
+    except OSError:
+        return None
+
+def _load_index() -> list:
+    try:
+        with open(LOG_INDEX, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+def _save_index(index: list):
+    tmp = LOG_INDEX + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp, LOG_INDEX)
+
+def _init_segment():
+    # Vorhandenes Log beim Start übernehmen
+    for i, name in enumerate(_load_names()):
+        _name_ids[name] = i
+    try:
+        st = os.stat(LOGFILE)
+    except OSError:
+        return
+    _segment["size"] = st.st_size
+    _segment["start"] = _first_stamp(LOGFILE) or st.st_mtime
+    _segment["end"] = st.st_mtime
+
+def resync_log():
+    """Nach Ersetzen von LOGFILE von außen: Größe und Zeitraum vor dem nächsten Schreiben neu lesen."""
+    _resync.set()
+
+def _rotate():
+    """Benennt das aktuelle Log in ein Segment um; komprimiert wird in einem eigenen Thread."""
+    os.makedirs(LOGARCHIV, exist_ok=True)
+    base = "mudschikato_" + datetime.fromtimestamp(_segment["start"]).strftime("%Y%m%d_%H%M%S")
+    name, n = base + ".log", 1
+    while os.path.exists(os.path.join(LOGARCHIV, name)) or os.path.exists(os.path.join(LOGARCHIV, name + ".gz")):
+        name, n = f"{base}_{n}.log", n + 1
+    os.replace(LOGFILE, os.path.join(LOGARCHIV, name))
+    seg = {"file": name, "start": _segment["start"], "end": _segment["end"], "bytes": _segment["size"]}
+    compress = [name]
+    if os.path.exists(EVENTFILE):
+        events = name[:-4] + ".events.jsonl"
+        os.replace(EVENTFILE, os.path.join(LOGARCHIV, events))
+        if os.path.exists(EVENTINDEX):
+            os.replace(EVENTINDEX, os.path.join(LOGARCHIV, name[:-4] + ".events.idx"))
+        seg["events"] = events
+        seg["events_idx"] = name[:-4] + ".events.idx"
+        compress.append(events)
+    with _index_lock:
+        index = _load_index()
+        index.append(seg)
+        # Älteste Segmente verwerfen
+        for old in index[:-LOG_KEEP_SEGMENTS]:
+            names = [old["file"], old["file"] + ".gz"]
+            if "events" in old:
+                names += [old["events"], old["events"] + ".gz", old["events_idx"]]
+            for fname in names:
+                try:
+                    os.remove(os.path.join(LOGARCHIV, fname))
+                except OSError:
+                    pass
+        index = index[-LOG_KEEP_SEGMENTS:]
+        _save_index(index)
+    _segment.update(start=None, end=None, size=0)
+    for fname in compress:
+        threading.Thread(target=_compress_segment, args=(fname,), name="mudschikato-log-gzip", daemon=True).start()
+
+def _compress_segment(name: str):
+    src = os.path.join(LOGARCHIV, name)
+    dst = src + ".gz"
+    try:
+        with open(src, "rb") as fin, gzip.open(dst + ".tmp", "wb") as fout:
+            shutil.copyfileobj(fin, fout, 1024 * 1024)
+        os.replace(dst + ".tmp", dst)
+        with _index_lock:
+            index = _load_index()
+            for seg in index:
+                if seg["file"] == name:
+                    seg["file"] = name + ".gz"
+                    seg["gz_bytes"] = os.path.getsize(dst)
+                elif seg.get("events") == name:
+                    seg["events"] = name + ".gz"
+            _save_index(index)
+        os.remove(src)
+    except OSError as e:
+        print(f"!! Fehler beim Komprimieren von {name}: {e}")
+
+def _compress_pending():
+    # Nach Absturz: noch unkomprimierte Segmente nachholen
+    for seg in _load_index():
+        for fname in (seg["file"], seg.get("events")):
+            if fname and not fname.endswith(".gz") and os.path.exists(os.path.join(LOGARCHIV, fname)):
+                threading.Thread(target=_compress_segment, args=(fname,), daemon=True).start()
+
+def _load_names() -> List[str]:
+    try:
+        with open(EVENTNAMES, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except (OSError, ValueError):
+        return []
+
+def _write_structured(batch: list):
+    """Hängt die Einträge als JSON Lines an und indiziert sie (nur im Schreib-Thread)."""
+    new_names, records, index = [], [], []
+    def name_id(name):
+        i = _name_ids.get(name)
+        if i is None:
+            i = _name_ids[name] = len(_name_ids)
+            new_names.append(name)
+        return i
+    with open(EVENTFILE, "ab") as f:
+        offset = f.seek(0, os.SEEK_END)
+        for ts, typ, context, events, print_console in batch:
+            ctx_id, typ_id = name_id(context), name_id(typ)
+            for event in events:
+                rec = (json.dumps({"ts": ts, "typ": typ, "ctx": context, "msg": event}, ensure_ascii=False)
+                       + "\n").encode("utf-8")
+                records.append(rec)
+                index.append(_IDX.pack(ts, offset, ctx_id, typ_id))
+                offset += len(rec)
+        # Reihenfolge: Namen, Daten, Index – ein Indexeintrag zeigt nie auf Fehlendes
+        if new_names:
+            with open(EVENTNAMES, "a", encoding="utf-8") as names:
+                names.write("".join(json.dumps(n, ensure_ascii=False) + "\n" for n in new_names))
+        f.write(b"".join(records))
+    with open(EVENTINDEX, "ab") as f:
+        f.write(b"".join(index))
+
+def _start_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_write_loop, name="mudschikato-log", daemon=True)
+            _writer.start()
+
+def _write_loop():
+    last_sec, stamp = None, ""
+    _init_segment()
+    _compress_pending()
+    while True:
+        batch = [_queue.get()]
+        while len(batch) < LOG_BATCH:
+            try:
+                batch.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        lines, console = [], []
+        for ts, typ, context, events, print_console in batch:
+            sec = int(ts)
+            if sec != last_sec:  # Zeitstempel nur einmal pro Sekunde formatieren
+                last_sec, stamp = sec, datetime.fromtimestamp(sec).strftime("%Y-%m-%d %H:%M:%S")
+            prefix = f"[{stamp}] [{typ}]"
+            if context:
+                prefix += f" [{context}]"
+            entries = [f"{prefix} {event}\n" for event in events]
+            lines += entries
+            if print_console:
+                console += entries
+        data = "".join(lines)
+        first_ts, last_ts = batch[0][0], batch[-1][0]
+        try:
+            if _resync.is_set():
+                _resync.clear()
+                _segment.update(start=None, end=None, size=0)
+                _init_segment()
+            if _segment["size"] and (_segment["size"] >= LOG_MAX_BYTES
+                                     or first_ts - _segment["start"] >= LOG_MAX_AGE):
+                _rotate()
+            with open(LOGFILE, "a", encoding="utf-8") as f:
+                f.write(data)
+                _segment["size"] = f.tell()
+            if EVENTS_STRUCTURED:
+                _write_structured(batch)
+            if _segment["start"] is None:
+                _segment["start"] = first_ts
+            _segment["end"] = last_ts
+            if console:
+                print("".join(console), end="")
+        except Exception as e:
+            # Fallback bei Log-Fehler
+            print(f"!! Fehler beim Logging: {e}")
+        for _ in batch:
+            _queue.task_done()
+
+def _enqueue(events: list, context: str, typ: str, print_console: bool):
+    if _writer is None:
+        _start_writer()
+    _queue.put((time.time(), typ, context, events, print_console))
 
 def log_event(event:str, context:str="", typ:str="INFO", print_console:bool=True):
     """
     Schreibt einen Log-Eintrag mit Zeitstempel, Typ, Kontext und Event.
+    Der Eintrag wird nur in eine Warteschlange gelegt; ein Hintergrund-Thread
+    schreibt gesammelt in die Datei (siehe flush_log).
     Args:
         event (str): Die zu loggende Nachricht
         context (str): Modul, Funktion oder Benutzerbereich
         typ (str): z.B. INFO, ERROR, WARNING, SUCCESS, DEBUG
         print_console (bool): Auch auf Konsole ausgeben? (Standard: True)
     """
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    entry = f"[{timestamp}] [{typ}]"
-    if context:
-        entry += f" [{context}]"
-    entry += f" {event}"
+    _enqueue([event], context, typ, print_console)
+
+def log_events(events: list, context: str = "", typ: str = "INFO", print_console: bool = True):
+    """
+    Schreibt mehrere Log-Einträge als ein Eintrag in der Warteschlange (z. B. für Stapel-Aktionen).
+    Args:
+        events (list): Die zu loggenden Nachrichten
+        context, typ, print_console: wie bei log_event
+    """
+    if not events:
+        return
+    _enqueue(list(events), context, typ, print_console)
+
+def flush_log():
+    """Wartet, bis alle bisher übergebenen Einträge in der Datei stehen."""
+    if _writer is not None:
+        _queue.join()
+
+def log_segments(since: float = None, until: float = None) -> list:
+    """
+    Log-Dateien, die Einträge im Zeitfenster [since, until] enthalten können, älteste zuerst
+    (komprimierte Segmente laut Index, zuletzt das aktuelle Log). Andere werden nicht geöffnet.
+    """
+    with _index_lock:
+        index = _load_index()
+    paths = [os.path.join(LOGARCHIV, seg["file"]) for seg in index
+             if (since is None or seg["end"] >= since) and (until is None or seg["start"] <= until)]
+    if os.path.exists(LOGFILE):
+        start = _first_stamp(LOGFILE)
+        if until is None or start is None or start <= until:
+            paths.append(LOGFILE)
+    return paths
+
+def open_log(path: str):
+    """Öffnet ein Log-Segment als Text, egal ob gzip-komprimiert oder nicht."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+class EventIndex:
+    """
+    Index einer Event-Datei im Speicher: (Kontext-Nr., Typ-Nr.) -> Zeiten und Offsets.
+    refresh() liest nur die seit dem letzten Mal angehängten Indexdatensätze.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.pos = 0
+        self.inode = None
+        self.postings: Dict[Tuple[int, int], Tuple[array, array]] = {}
+
+    def refresh(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self.pos, self.postings = 0, {}
+            return
+        if st.st_ino != self.inode or st.st_size < self.pos:
+            # Datei wurde rotiert und neu begonnen
+            self.inode, self.pos, self.postings = st.st_ino, 0, {}
+        if st.st_size - self.pos < _IDX.size:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self.pos)
+            data = f.read(st.st_size - self.pos)
+        usable = len(data) - len(data) % _IDX.size  # halb geschriebenen Datensatz auslassen
+        postings = self.postings
+        for ts, offset, ctx_id, typ_id in _IDX.iter_unpack(data[:usable]):
+            entry = postings.get((ctx_id, typ_id))
+            if entry is None:
+                entry = postings[(ctx_id, typ_id)] = (array("d"), array("Q"))
+            entry[0].append(ts)
+            entry[1].append(offset)
+        self.pos += usable
+
+    def offsets(self, ctx_id: Optional[int], typ_id: Optional[int],
+                since: Optional[float], until: Optional[float]) -> List[int]:
+        """Offsets aller passenden Einträge, per Binärsuche auf den Zeitbereich begrenzt."""
+        result = []
+        for (c, t), (times, offs) in self.postings.items():
+            if (ctx_id is not None and c != ctx_id) or (typ_id is not None and t != typ_id):
+                continue
+            lo = bisect.bisect_left(times, since) if since is not None else 0
+            hi = bisect.bisect_right(times, until) if until is not None else len(times)
+            result.extend(offs[lo:hi])
+        result.sort()
+        return result
+
+_event_indexes: Dict[str, EventIndex] = {}
+
+def _event_sources(since: Optional[float], until: Optional[float]) -> List[Tuple[str, EventIndex]]:
+    # Archivierte Event-Segmente aus dem Segment-Index, zuletzt die aktuelle Datei
+    with _index_lock:
+        index = _load_index()
+    sources = [(os.path.join(LOGARCHIV, seg["events"]), os.path.join(LOGARCHIV, seg["events_idx"]))
+               for seg in index if "events" in seg
+               and (since is None or seg["end"] >= since) and (until is None or seg["start"] <= until)]
+    sources.append((EVENTFILE, EVENTINDEX))
+    result = []
+    for data_path, idx_path in sources:
+        ei = _event_indexes.get(idx_path)
+        if ei is None:
+            ei = _event_indexes[idx_path] = EventIndex(idx_path)
+        ei.refresh()
+        result.append((data_path, ei))
+    return result
+
+def _event_hits(context, typ, since, until) -> List[Tuple[str, List[int]]]:
+    # Liest nur, was schon auf der Platte steht (kein flush_log: würde den GUI-Thread blockieren)
+    ids = {name: i for i, name in enumerate(_load_names())}
+    if (context is not None and context not in ids) or (typ is not None and typ not in ids):
+        return []
+    ctx_id = ids[context] if context is not None else None
+    typ_id = ids[typ] if typ is not None else None
+    return [(data_path, ei.offsets(ctx_id, typ_id, since, until))
+            for data_path, ei in _event_sources(since, until)]
+
+def query_events(context: str = None, typ: str = None, since: float = None,
+                 until: float = None, limit: int = None) -> List[dict]:
+    """
+    Strukturierte Log-Einträge nach Kontext, Typ und Zeitraum (älteste zuerst).
+    Gesucht wird im Index; gelesen werden nur die Treffer (bei limit nur die neuesten).
+    Beispiel: query_events(context="DownloadsManager", typ="ERROR", since=time.time() - 86400)
+    """
+    hits = _event_hits(context, typ, since, until)
+    if limit is not None:
+        trimmed, rest = [], limit
+        for data_path, offsets in reversed(hits):
+            if rest <= 0:
+                break
+            trimmed.append((data_path, offsets[-rest:]))
+            rest -= len(trimmed[-1][1])
+        hits = list(reversed(trimmed))
+    events = []
+    for data_path, offsets in hits:
+        if not offsets:
+            continue
+        if not os.path.exists(data_path) and os.path.exists(data_path + ".gz"):
+            data_path += ".gz"  # inzwischen komprimiert
+        opener = gzip.open if data_path.endswith(".gz") else open
+        try:
+            with opener(data_path, "rb") as f:
+                for offset in offsets:  # aufsteigend, daher auch in gzip nur vorwärts
+                    f.seek(offset)
+                    events.append(json.loads(f.readline()))
+        except (OSError, ValueError) as e:
+            print(f"!! Fehler beim Lesen von {data_path}: {e}")
+    return events
+
+def count_events(context: str = None, typ: str = None, since: float = None, until: float = None) -> int:
+    """Anzahl passender Einträge, nur aus dem Index (ohne die Einträge zu lesen)."""
+    return sum(len(offsets) for data_path, offsets in _event_hits(context, typ, since, until))
+
+class MudschikatoLogHandler(logging.Handler):
+    """Leitet Einträge des Standard-logging-Moduls (z. B. FeedbackApp) an log_event weiter."""
+    def __init__(self, context: str = ""):
+        super().__init__()
+        self.context = context
+
+    def emit(self, record):
+        try:
+            log_event(record.getMessage(), self.context or record.name, record.levelname)
+        except Exception:
+            self.handleError(record)
+
+# Beim Beenden nichts verlieren (der Schreib-Thread ist ein Daemon)
+atexit.register(flush_log)
+
+def tail_lines(n: int = 10, path: str = LOGFILE, block: int = 8192) -> list:
+    """
+    Liefert die letzten n Zeilen einer Datei, ohne sie ganz zu lesen.
+    Liest blockweise vom Dateiende rückwärts, bis genug Zeilenumbrüche gefunden sind;
+    der Aufwand hängt also nur von n und der Zeilenlänge ab, nicht von der Dateigröße.
+    Noch gepufferte Einträge fehlen (Millisekunden); wer sie braucht, ruft vorher flush_log().
+    """
+    if n <= 0:
+        return []
     try:
-        with open(LOGFILE, "a", encoding="utf-8") as f:
-            f.write(entry + "\n")
-        if print_console:
-            print(entry)
-    except Exception as e:
-        # Fallback bei Log-Fehler
-        print(f"!! Fehler beim Logging: {e}")
+        with open(path, "rb") as f:
+            pos = f.seek(0, os.SEEK_END)
+            chunks = []
+            newlines = 0
+            while pos > 0 and newlines <= n:
+                step = min(block, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step)
+                chunks.append(data)
+                newlines += data.count(b"\n")
+    except OSError:
+        return []
+    # Erst nach dem Zusammensetzen dekodieren (Blockgrenzen können UTF-8-Zeichen teilen)
+    text = b"".join(reversed(chunks)).decode("utf-8", errors="replace")
+    return text.splitlines()[-n:]
 
 # Test und Beispiel
 if __name__ == "__main__":
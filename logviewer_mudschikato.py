@@ -0,0 +1,349 @@
+"""
+logviewer_mudschikato.py
+------------------------
+Log-Explorer für Mudschikato (eigener Tab).
+- mudschikato.log wird per mmap gelesen, nie komplett in den Speicher geladen
+- Zeilen-Offset-Index wird im Hintergrund aufgebaut und beim Wachsen der Datei fortgeschrieben
+- Virtualisierte Tabelle: Texte werden erst beim Zeichnen aus der Datei gelesen (auch Millionen Zeilen)
+- Filter nach Typ, Kontext und regulärem Ausdruck im Hintergrund, Treffer erscheinen fortlaufend
+- Rotation des Logs wird erkannt, die Anzeige beginnt dann neu
+"""
+
+import os
+import re
+import mmap
+from array import array
+from PyQt6.QtWidgets import (
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QComboBox,
+    QPushButton, QTableView, QHeaderView, QMessageBox
+)
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QThread, QTimer, pyqtSignal
+from PyQt6.QtGui import QColor
+from logging_mudschikato import LOGFILE, log_event
+
+WINDOW = 4 * 1024 * 1024   # Bytes pro Suchfenster; nach jedem Fenster werden Treffer gemeldet
+POLL_MS = 1000             # so oft wird auf neue Zeilen geprüft
+LOG_TYPEN = ["Alle", "INFO", "WARNING", "ERROR", "SUCCESS", "UNDO", "DEBUG"]
+LINE_RE = re.compile(r"^\[([^\]]*)\] \[([^\]]*)\](?: \[([^\]]*)\])? ?(.*)$")
+TYP_FARBEN = {"ERROR": QColor("#c0392b"), "WARNING": QColor("#d68910")}
+
+def map_file(path: str, size: int):
+    """Liest-only-mmap der ersten size Bytes (None bei leerer/fehlender Datei)."""
+    if size <= 0:
+        return None
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+
+def build_pattern(typ: str, context: str, regex: str):
+    """
+    Filter als (Zeilen-Muster, Text-Muster); None, wenn kein Filter gesetzt ist.
+    Das Zeilen-Muster (bytes, MULTILINE) prüft Typ und Kontext direkt im mmap am Zeilenanfang.
+    Das Suchmuster des Nutzers bleibt ein str-Ausdruck und wird auf den dekodierten Rest der
+    Zeile angewandt, damit \\w, [äöü], . und (?i) auf Text statt auf UTF-8-Bytes wirken.
+    Ungültige Ausdrücke lösen re.error aus.
+    """
+    if not typ and not context and not regex:
+        return None
+    typ_part = re.escape(typ.encode("utf-8")) if typ else rb"[^\]\n]*"
+    ctx_part = rb" \[" + re.escape(context.encode("utf-8")) + rb"\]" if context else b""
+    line_re = re.compile(rb"(?m)^\[[^\]\n]*\] \[" + typ_part + rb"\]" + ctx_part)
+    return line_re, re.compile(regex) if regex else None
+
+class ScanWorker(QThread):
+    """
+    Durchläuft den Bereich [start, end) der Logdatei fensterweise im Hintergrund.
+    Ohne Muster werden alle Zeilenanfänge gemeldet (Offset-Index), mit Muster nur die Treffer.
+    Gemeldet wird nach jedem Fenster, die ersten Zeilen erscheinen also sofort.
+    """
+    offsets_ready = pyqtSignal(int, object)  # job_id, array("Q") mit Zeilenanfängen
+    scan_done = pyqtSignal(int, int)         # job_id, Ende (nur vollständige Zeilen)
+
+    def __init__(self, job_id: int, path: str, start: int, end: int, pattern=None, parent=None):
+        super().__init__(parent)
+        self.job_id = job_id
+        self.path = path
+        self.start_pos = start
+        self.end = end
+        self.pattern = pattern
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            mm = map_file(self.path, self.end)
+        except (OSError, ValueError):
+            mm = None
+        if mm is None:
+            self.scan_done.emit(self.job_id, self.start_pos)
+            return
+        # Nur vollständige Zeilen: halb geschriebene letzte Zeile kommt beim nächsten Mal
+        end = mm.rfind(b"\n", self.start_pos, self.end) + 1
+        if end <= 0:
+            end = self.start_pos
+        pos = self.start_pos
+        try:
+            while pos < end:
+                if self._cancelled:
+                    return
+                wend = min(pos + WINDOW, end)
+                if wend < end:
+                    wend = mm.find(b"\n", wend - 1, end) + 1 or end
+                found = array("Q")
+                if self.pattern is None:
+                    p = pos
+                    while p < wend:
+                        found.append(p)
+                        p = mm.find(b"\n", p, wend) + 1
+                        if p == 0:
+                            break
+                else:
+                    line_re, text_re = self.pattern
+                    search = line_re.search
+                    p = pos
+                    while p < wend:
+                        m = search(mm, p, wend)
+                        if m is None:
+                            break
+                        eol = mm.find(b"\n", m.start(), wend)
+                        line_end = eol if eol >= 0 else wend
+                        if text_re is None or text_re.search(
+                                mm[m.end():line_end].decode("utf-8", errors="replace")):
+                            found.append(m.start())
+                        p = line_end + 1  # ein Treffer pro Zeile
+                        if eol < 0:
+                            break
+                if found:
+                    self.offsets_ready.emit(self.job_id, found)
+                pos = wend
+            self.scan_done.emit(self.job_id, end)
+        finally:
+            mm.close()
+
+class LogTableModel(QAbstractTableModel):
+    """
+    Virtualisiertes Modell: hält nur Zeilenanfänge (Offsets) in einem array("Q").
+    Text wird erst in data() aus der gemappten Datei gelesen und zerlegt.
+    """
+    HEADERS = ["Zeit", "Typ", "Kontext", "Nachricht"]
+    CACHE_MAX = 2000  # zerlegte Zeilen, die sichtbar waren
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.mm = None
+        self.offsets = array("Q")
+        self.cache = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.offsets)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def fields(self, row: int):
+        f = self.cache.get(row)
+        if f is None:
+            off = self.offsets[row]
+            end = self.mm.find(b"\n", off)
+            line = self.mm[off:end if end >= 0 else len(self.mm)].decode("utf-8", errors="replace")
+            m = LINE_RE.match(line)
+            f = (m.group(1), m.group(2), m.group(3) or "", m.group(4)) if m else ("", "", "", line)
+            if len(self.cache) >= self.CACHE_MAX:
+                self.cache.clear()
+            self.cache[row] = f
+        return f
+
+    def data(self, idx, role=Qt.ItemDataRole.DisplayRole):
+        if not idx.isValid() or self.mm is None:
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.fields(idx.row())[idx.column()]
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return TYP_FARBEN.get(self.fields(idx.row())[1])
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def set_map(self, mm):
+        # Neu gemappt (Datei gewachsen): Offsets bleiben gültig
+        old, self.mm = self.mm, mm
+        if old is not None:
+            old.close()
+
+    def reset(self):
+        self.beginResetModel()
+        self.offsets = array("Q")
+        self.cache = {}
+        self.endResetModel()
+
+    def append_offsets(self, offsets):
+        if not offsets:
+            return
+        n = len(self.offsets)
+        self.beginInsertRows(QModelIndex(), n, n + len(offsets) - 1)
+        self.offsets.extend(offsets)
+        self.endInsertRows()
+
+class LogViewerWidget(QWidget):
+    def __init__(self, path: str = LOGFILE):
+        super().__init__()
+        self.path = path
+        self.setWindowTitle("Mudschikato Log-Explorer")
+        self.resize(900, 600)
+        self.layout = QVBoxLayout()
+
+        filter_ly = QHBoxLayout()
+        self.typ_box = QComboBox()
+        self.typ_box.addItems(LOG_TYPEN)
+        filter_ly.addWidget(QLabel("Typ:"))
+        filter_ly.addWidget(self.typ_box)
+        self.ctx_field = QLineEdit()
+        self.ctx_field.setPlaceholderText("Kontext (z. B. DownloadsManager)")
+        filter_ly.addWidget(self.ctx_field)
+        self.regex_field = QLineEdit()
+        self.regex_field.setPlaceholderText("Suchmuster (regulärer Ausdruck)")
+        self.regex_field.returnPressed.connect(self.apply_filter)
+        filter_ly.addWidget(self.regex_field)
+        self.btn_filter = QPushButton("Filtern")
+        self.btn_filter.clicked.connect(self.apply_filter)
+        filter_ly.addWidget(self.btn_filter)
+        self.btn_reset = QPushButton("Alle Zeilen")
+        self.btn_reset.clicked.connect(self.reset_filter)
+        filter_ly.addWidget(self.btn_reset)
+        self.layout.addLayout(filter_ly)
+
+        self.model = LogTableModel(self)
+        self.view = QTableView()
+        self.view.setModel(self.model)
+        self.view.verticalHeader().setDefaultSectionSize(20)
+        self.view.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
+        self.view.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.layout.addWidget(self.view)
+        self.status_label = QLabel("")
+        self.layout.addWidget(self.status_label)
+        self.setLayout(self.layout)
+
+        self.pattern = None
+        self.job_id = 0
+        self.worker = None
+        self.retired_workers = set()  # abgebrochene Durchläufe, die noch auslaufen
+        self.scanned = 0      # bis hierhin ist die Datei durchsucht/indiziert
+        self.inode = None
+        self.follow = True    # bei neuen Zeilen ans Ende scrollen, solange man unten ist
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(POLL_MS)
+        self.poll_timer.timeout.connect(self.poll)  # läuft nur, solange der Tab sichtbar ist
+        self.restart()
+
+    def current_filter(self):
+        typ = self.typ_box.currentText()
+        return ("" if typ == "Alle" else typ, self.ctx_field.text().strip(), self.regex_field.text())
+
+    def apply_filter(self):
+        try:
+            self.pattern = build_pattern(*self.current_filter())
+        except re.error as e:
+            QMessageBox.warning(self, "Fehler", f"Ungültiges Suchmuster: {e}")
+            return
+        log_event(f"Log-Filter: {self.current_filter()}", "LogViewer", "INFO", print_console=False)
+        self.restart()
+
+    def reset_filter(self):
+        self.typ_box.setCurrentIndex(0)
+        self.ctx_field.clear()
+        self.regex_field.clear()
+        self.pattern = None
+        self.restart()
+
+    def restart(self):
+        # Von vorne: Modell leeren, Datei neu mappen, Bereich 0..Ende im Hintergrund durchlaufen
+        if self.worker is not None:
+            old = self.worker
+            old.cancel()
+            old.finished.connect(lambda: self.retired_workers.discard(old))
+            if not old.isFinished():
+                self.retired_workers.add(old)
+            self.worker = None
+        self.job_id += 1
+        self.scanned = 0
+        self.model.reset()
+        self.model.set_map(None)
+        self.poll()
+
+    def poll(self):
+        if self.worker is not None:
+            return  # laufender Durchlauf, danach geht es weiter
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return
+        if self.inode is not None and (st.st_ino != self.inode or st.st_size < self.scanned):
+            # Log wurde rotiert: neue Datei von vorne anzeigen
+            self.inode = st.st_ino
+            self.restart()
+            return
+        self.inode = st.st_ino
+        if st.st_size <= self.scanned:
+            return
+        try:
+            self.model.set_map(map_file(self.path, st.st_size))
+        except (OSError, ValueError) as e:
+            self.status_label.setText(f"Log nicht lesbar: {e}")
+            return
+        bar = self.view.verticalScrollBar()
+        self.follow = bar.value() >= bar.maximum()
+        worker = ScanWorker(self.job_id, self.path, self.scanned, st.st_size, self.pattern, parent=self)
+        worker.offsets_ready.connect(self.add_offsets)
+        worker.scan_done.connect(self.scan_finished)
+        worker.finished.connect(worker.deleteLater)
+        self.worker = worker
+        if self.scanned == 0:
+            self.status_label.setText("Durchsuche Log ..." if self.pattern else "Lese Log ...")
+        worker.start()
+
+    def add_offsets(self, job_id, offsets):
+        if job_id != self.job_id:
+            return  # Treffer eines abgebrochenen Filters
+        self.model.append_offsets(offsets)
+        if self.follow and self.scanned:
+            self.view.scrollToBottom()
+
+    def scan_finished(self, job_id, end):
+        if job_id != self.job_id:
+            return
+        self.worker = None
+        self.scanned = end
+        n = self.model.rowCount()
+        self.status_label.setText(f"{n} Treffer" if self.pattern else f"{n} Zeilen")
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.poll()  # inzwischen Geschriebenes sofort nachholen
+        self.poll_timer.start()
+
+    def hideEvent(self, event):
+        self.poll_timer.stop()
+        super().hideEvent(event)
+
+    def shutdown(self):
+        self.poll_timer.stop()
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.wait()
+        for worker in list(self.retired_workers):
+            worker.wait()
+        self.model.set_map(None)
+
+    def closeEvent(self, event):
+        self.shutdown()
+        super().closeEvent(event)
+
+if __name__ == "__main__":
+    app = QApplication([])
+    win = LogViewerWidget()
+    win.show()
+    app.exec()
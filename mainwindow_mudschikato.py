@@ -8,6 +8,7 @@ Zentrales Hauptfenster für Mudschikato – Struktur & Hilfstool 2025
 - Theme-/Settings-Modul integriert
 - Wiki-/Info-Modul integriert
 - Downloads-Manager integriert
+- Log-Explorer integriert
 - Keine Codeeingabe für User nötig
 """
 
@@ -25,9 +26,10 @@ from filemanager_mudschikato import FileManagerWidget
 from imagepreview_mudschikato import ImagePreviewWidget
 from mediaplayer_mudschikato import MediaPlayerWidget
 from kalender_mudschikato import KalenderWidget
-from settings_mudschikato import SettingsWidget
+from settings_mudschikato import SettingsWidget, load_settings, set_structured_log
 from wiki_mudschikato import WikiWidget
 from downloadsmanager_mudschikato import DownloadsManagerWidget
+from logviewer_mudschikato import LogViewerWidget
 
 class MainMudschikato(QMainWindow):
     def __init__(self):
@@ -35,6 +37,8 @@ class MainMudschikato(QMainWindow):
         self.setWindowTitle("Mudschikato Struktur & Hilfstool 2025")
         self.resize(1320, 870)
         self.undo_manager = UndoManager()
+        # Gespeicherte Log-Option vor allen Tabs setzen (das Dashboard zählt sofort)
+        set_structured_log(load_settings().get("structured_log", False))
 
         # Zentrales Tab-Interface für alle Module
         self.tabs = QTabWidget()
@@ -84,6 +88,10 @@ class MainMudschikato(QMainWindow):
         self.downloads_tab = DownloadsManagerWidget(self.undo_manager)
         self.tabs.addTab(self.downloads_tab, "Downloads-Manager")
 
+        # 12. Log-Explorer
+        self.log_tab = LogViewerWidget()
+        self.tabs.addTab(self.log_tab, "Log")
+
         # Menüleiste: Undo, Dashboard, Einstellungen, Wiki, Info, Exit
         menubar = self.menuBar()
         action_undo = QAction("Undo", self)
@@ -106,6 +114,10 @@ class MainMudschikato(QMainWindow):
         action_downloads.triggered.connect(lambda: self.tabs.setCurrentIndex(11))
         menubar.addAction(action_downloads)
 
+        action_log = QAction("Log", self)
+        action_log.triggered.connect(lambda: self.tabs.setCurrentIndex(self.tabs.indexOf(self.log_tab)))
+        menubar.addAction(action_log)
+
         action_exit = QAction("Beenden", self)
         action_exit.triggered.connect(self.close)
         menubar.addAction(action_exit)
@@ -116,6 +128,16 @@ class MainMudschikato(QMainWindow):
 
         log_event("Mudschikato-Hauptfenster gestartet.", "MainWindow", "INFO")
 
+    def closeEvent(self, event):
+        # Tabs bekommen beim Schließen des Hauptfensters kein eigenes closeEvent:
+        # Hintergrund-Threads, Timer und Caches hier für alle Tabs beenden
+        for i in range(self.tabs.count()):
+            tab = self.tabs.widget(i)
+            if hasattr(tab, "shutdown"):
+                tab.shutdown()
+        log_event("Mudschikato-Hauptfenster beendet.", "MainWindow", "INFO")
+        super().closeEvent(event)
+
     def handle_undo(self):
         msg = self.undo_manager.undo()
         QMessageBox.information(self, "Undo", msg)
@@ -17,9 +17,11 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, QTimer
 from logging_mudschikato import log_event
+from filetypes_mudschikato import dialog_filter
 from undo_mudschikato import UndoManager, UndoAction
 
 PLAYLISTDATEI = "mudschikato_playlist.txt"
+ABSPIELBAR = (".mp3", ".wav", ".ogg")  # Teilmenge von "Audio", die pygame sicher abspielt
 
 class MediaPlayerWidget(QWidget):
     def __init__(self, undo_manager: UndoManager):
@@ -98,7 +100,7 @@ class MediaPlayerWidget(QWidget):
         self.set_volume()
 
     def add_song(self):
-        files, _ = QFileDialog.getOpenFileNames(self, "Audio-Dateien wählen", "", "Audio (*.mp3 *.wav *.ogg)")
+        files, _ = QFileDialog.getOpenFileNames(self, "Audio-Dateien wählen", "", dialog_filter("Audio", nur=ABSPIELBAR))
         if files:
             for f in files:
                 self.playlist.addItem(f)
@@ -236,8 +238,11 @@ class MediaPlayerWidget(QWidget):
         msg = self.undo_manager.undo()
         QMessageBox.information(self, "Undo", msg)
 
-    def closeEvent(self, event):
+    def shutdown(self):
         self.save_playlist()
         pygame.mixer.music.stop()
         pygame.mixer.quit()
+
+    def closeEvent(self, event):
+        self.shutdown()
         super().closeEvent(event)
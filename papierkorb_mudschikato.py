@@ -0,0 +1,291 @@
+"""
+papierkorb_mudschikato.py
+-------------------------
+Papierkorb mit Manifest für Mudschikato.
+- Jede Datei liegt unter einem eindeutigen Schlüssel im Papierkorb (keine Überschreibung)
+- Manifest (JSON Lines, nur Anhängen) merkt Originalpfad, Löschzeit und Größe
+- Wiederherstellen, Auflisten und Endgültig-Löschen über Schlüssel in O(1)
+- Zähler (Anzahl, Gesamtgröße) ohne os.listdir
+- Anzahl und Gesamtgröße werden bei jeder Änderung an den Ereignis-Bus gemeldet
+- Endgültiges Löschen stapelweise im Hintergrund (auch Ordner), ganz oder nach Alter/Größe
+"""
+
+import os
+import json
+import time
+import uuid
+import shutil
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from PyQt6.QtCore import QThread, pyqtSignal
+from logging_mudschikato import log_event
+from eventbus_mudschikato import PAPIERKORB_ANZAHL, PAPIERKORB_BYTES, get_bus
+from transfer_mudschikato import unique_target
+
+PAPIERKORB = "mudschikato_papierkorb"
+MANIFEST = ".manifest.jsonl"
+PURGE_BATCH = 500  # Einträge pro Manifest-Schreibvorgang beim Leeren
+
+# Auswahl beim Leeren: (Text, Modus, Wert)
+PURGE_OPTS = [
+    ("Alles", "alle", None),
+    ("Älter als 7 Tage", "alter", 7 * 86400),
+    ("Älter als 30 Tage", "alter", 30 * 86400),
+    ("Dateien über 100 MB", "groesse", 100 * 1_000_000),   # MB wie bei den Download-Filtern
+    ("Auf 1 GB verkleinern", "limit", 1000 * 1_000_000),
+]
+
+class TrashEntry(NamedTuple):
+    key: str        # Dateiname im Papierkorb
+    orig: str       # ursprünglicher Pfad ("" bei übernommenen Altbeständen)
+    deleted: float  # Zeitpunkt des Verschiebens
+    size: int
+
+def tree_size(path: str) -> int:
+    """Größe einer Datei oder eines ganzen Ordners (Links werden nicht verfolgt)."""
+    if not os.path.isdir(path) or os.path.islink(path):
+        return os.lstat(path).st_size
+    total = 0
+    for dirpath, dirnames, filenames in os.walk(path):
+        for fname in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, fname)).st_size
+            except OSError:
+                pass
+    return total
+
+class TrashStore:
+    """
+    Papierkorb-Verzeichnis plus Manifest-Index.
+    entries ist nach Löschzeit geordnet (älteste zuerst), by_orig findet Einträge
+    zu einem Originalpfad. Alle Änderungen werden als eine Zeile ans Manifest angehängt.
+    """
+    def __init__(self, root: str = PAPIERKORB):
+        self.root = root
+        self.manifest = os.path.join(root, MANIFEST)
+        self.lock = threading.RLock()
+        self.entries: Dict[str, TrashEntry] = {}
+        self.by_orig: Dict[str, List[str]] = {}
+        self.total_size = 0
+        self.log_lines = 0
+        os.makedirs(root, exist_ok=True)
+        self.load()
+        self.publish()
+
+    # --- Manifest ---
+    def load(self):
+        if not os.path.exists(self.manifest):
+            self.adopt_existing()
+            return
+        with open(self.manifest, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # abgebrochene letzte Zeile
+                self.log_lines += 1
+                if rec.get("op") == "put":
+                    self._insert(TrashEntry(rec["key"], rec["orig"], rec["deleted"], rec["size"]))
+                elif rec.get("op") == "del":
+                    self._drop(rec["key"])
+        # Viele gelöschte Einträge im Log? Dann kompakt neu schreiben
+        if self.log_lines > 2 * len(self.entries) + 100:
+            self.compact()
+
+    def adopt_existing(self):
+        # Altbestand ohne Manifest übernehmen (einmalig); listdir liefert keine Zeitordnung,
+        # select() erwartet aber die ältesten Einträge zuerst
+        adopted = []
+        for fname in os.listdir(self.root):
+            fpath = os.path.join(self.root, fname)
+            if fname == MANIFEST or fname == MANIFEST + ".tmp":
+                continue
+            try:
+                adopted.append(TrashEntry(fname, "", os.lstat(fpath).st_mtime, tree_size(fpath)))
+            except OSError:
+                continue  # inzwischen verschwunden
+        with self.lock:
+            merged = sorted(list(self.entries.values()) + adopted, key=lambda e: e.deleted)
+            self.entries, self.by_orig, self.total_size = {}, {}, 0
+            for entry in merged:
+                self._insert(entry)
+        self.compact()
+
+    def compact(self):
+        with self.lock:
+            tmp = self.manifest + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                for e in self.entries.values():
+                    f.write(json.dumps({"op": "put", **e._asdict()}, ensure_ascii=False) + "\n")
+            os.replace(tmp, self.manifest)
+            self.log_lines = len(self.entries)
+
+    def _append(self, records: List[dict]):
+        with open(self.manifest, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+        self.log_lines += len(records)
+
+    def publish(self):
+        bus = get_bus()
+        bus.set(PAPIERKORB_ANZAHL, len(self.entries))
+        bus.set(PAPIERKORB_BYTES, self.total_size)
+
+    def _insert(self, entry: TrashEntry):
+        self.entries[entry.key] = entry
+        self.by_orig.setdefault(entry.orig, []).append(entry.key)
+        self.total_size += entry.size
+
+    def _drop(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return None
+        keys = self.by_orig.get(entry.orig, [])
+        if key in keys:
+            keys.remove(key)
+            if not keys:
+                del self.by_orig[entry.orig]
+        self.total_size -= entry.size
+        return entry
+
+    # --- Öffentliche Operationen ---
+    def put(self, src: str) -> TrashEntry:
+        """Verschiebt src in den Papierkorb und liefert den Manifest-Eintrag."""
+        fname = os.path.basename(src)
+        key = f"{uuid.uuid4().hex[:12]}_{fname}"
+        size = tree_size(src)
+        dst = os.path.join(self.root, key)
+        shutil.move(src, dst)
+        entry = TrashEntry(key, os.path.abspath(src), time.time(), size)
+        with self.lock:
+            try:
+                self._append([{"op": "put", **entry._asdict()}])
+            except OSError:
+                # Ohne Manifest-Zeile wäre die Datei nach dem Neustart verwaist: zurück an den Ursprung
+                shutil.move(dst, src)
+                raise
+            self._insert(entry)
+        self.publish()
+        return entry
+
+    def restore(self, key: str) -> str:
+        """Holt den Eintrag an den Originalort zurück (bei Namenskonflikt mit neuem Namen)."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                raise KeyError(key)
+            # Übernommene Altbestände kennen ihren Ursprung nicht: neben den Papierkorb-Ordner
+            orig = entry.orig or os.path.join(os.path.dirname(os.path.abspath(self.root)), key)
+            target = unique_target(os.path.dirname(orig), os.path.basename(orig), set())
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.move(os.path.join(self.root, key), target)
+            self._drop(key)
+            self._append([{"op": "del", "key": key}])
+        self.publish()
+        return target
+
+    def purge(self, keys: List[str], progress: Optional[Callable[[int, int, int], None]] = None,
+              cancelled: Optional[Callable[[], bool]] = None) -> Tuple[int, int, List[str]]:
+        """
+        Löscht Einträge endgültig, Ordner samt Inhalt.
+        Das Manifest wird pro Stapel (PURGE_BATCH) fortgeschrieben, damit ein Abbruch
+        oder Absturz höchstens einen Stapel nachträglich als "noch da" führt.
+        progress(erledigt, gesamt, freigegebene Bytes); liefert (Anzahl, Bytes, Fehler).
+        """
+        total = len(keys)
+        purged = freed = 0
+        errors = []
+        for start in range(0, total, PURGE_BATCH):
+            if cancelled and cancelled():
+                break
+            done = []
+            with self.lock:  # restore() im GUI-Thread ändert entries gleichzeitig
+                batch = [(key, self.entries.get(key)) for key in keys[start:start + PURGE_BATCH]]
+            for key, entry in batch:
+                if entry is None:
+                    continue
+                fpath = os.path.join(self.root, key)
+                try:
+                    if os.path.isdir(fpath) and not os.path.islink(fpath):
+                        shutil.rmtree(fpath)
+                    elif os.path.lexists(fpath):
+                        os.remove(fpath)
+                except OSError as e:
+                    errors.append(f"{key}: {e}")
+                    continue
+                done.append(key)
+            if done:
+                with self.lock:
+                    # Inzwischen wiederhergestellte Einträge nicht doppelt austragen
+                    dropped = [e for e in map(self._drop, done) if e is not None]
+                    self._append([{"op": "del", "key": e.key} for e in dropped])
+                purged += len(dropped)
+                freed += sum(e.size for e in dropped)
+                self.publish()
+            if progress:
+                progress(min(start + PURGE_BATCH, total), total, freed)
+        if errors:
+            log_event(f"Papierkorb: {len(errors)} Eintrag/Einträge nicht löschbar, z. B. {errors[0]}",
+                      "Papierkorb", "ERROR")
+        return purged, freed, errors
+
+    def select(self, mode: str = "alle", value=None, now: Optional[float] = None) -> List[str]:
+        """
+        Schlüssel für ein (Teil-)Leeren, älteste zuerst:
+        "alle", "alter" (älter als value Sekunden), "groesse" (ab value Bytes),
+        "limit" (älteste löschen, bis höchstens value Bytes übrig sind).
+        """
+        now = time.time() if now is None else now
+        entries = self.all_entries()
+        if mode == "alter":
+            return [e.key for e in entries if e.deleted < now - value]
+        if mode == "groesse":
+            return [e.key for e in entries if e.size >= value]
+        if mode == "limit":
+            keys, rest = [], self.total_size
+            for e in entries:
+                if rest <= value:
+                    break
+                keys.append(e.key)
+                rest -= e.size
+            return keys
+        return [e.key for e in entries]
+
+    def count(self) -> int:
+        return len(self.entries)
+
+    def all_entries(self) -> List[TrashEntry]:
+        """Alle Einträge, älteste zuerst."""
+        with self.lock:
+            return list(self.entries.values())
+
+    def find(self, orig: str) -> List[TrashEntry]:
+        """Einträge zu einem Originalpfad (neueste zuletzt)."""
+        with self.lock:
+            return [self.entries[k] for k in self.by_orig.get(os.path.abspath(orig), [])]
+
+class PurgeWorker(QThread):
+    """Leert den Papierkorb (ganz oder teilweise) im Hintergrund."""
+    progress = pyqtSignal(int, int, object)     # erledigt, gesamt, Bytes (object: > 2 GB)
+    purge_done = pyqtSignal(int, object, list)  # Anzahl, Bytes, Fehler
+
+    def __init__(self, store: TrashStore, keys: List[str], parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.keys = keys
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        purged, freed, errors = self.store.purge(self.keys, self.progress.emit, lambda: self._cancelled)
+        self.purge_done.emit(purged, freed, errors)
+
+_store = None
+
+def get_store() -> TrashStore:
+    """Gemeinsame Instanz für alle Module (ein Manifest, ein In-Memory-Index)."""
+    global _store
+    if _store is None:
+        _store = TrashStore()
+    return _store
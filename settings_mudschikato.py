@@ -4,6 +4,7 @@ settings_mudschikato.py
 Laienfreundliches Theme-/Settings-Modul für Mudschikato.
 - Farbmodus (Hell/Dunkel/Benutzerdefiniert)
 - Schriftgröße: Normal/Groß/Extra Groß
+- Optionale strukturierte Log-Einträge (Fehler-Zähler im Dashboard)
 - Sofort-Vorschau
 - Undo, Reset
 - Persistenz in settings.json
@@ -12,10 +13,12 @@ Laienfreundliches Theme-/Settings-Modul für Mudschikato.
 import os, json
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QComboBox, QColorDialog, QMessageBox
+    QComboBox, QColorDialog, QMessageBox, QCheckBox
 )
 from PyQt6.QtGui import QFont, QColor, QPalette
 from undo_mudschikato import UndoManager, UndoAction
+from logging_mudschikato import configure_events
+from eventbus_mudschikato import LOG_STRUKTURIERT, get_bus
 
 SETTINGSFILE = "mudschikato_settings.json"
 
@@ -24,9 +27,24 @@ DEFAULT_SETTINGS = {
     "theme": "Hell",
     "bg_color": "#ffffff",
     "fg_color": "#222222",
-    "font_size": 10
+    "font_size": 10,
+    "structured_log": False
 }
 
+def load_settings():
+    if os.path.exists(SETTINGSFILE):
+        try:
+            with open(SETTINGSFILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            pass
+    return dict(DEFAULT_SETTINGS)
+
+def set_structured_log(on: bool):
+    # Schalter setzen und melden (das Dashboard aktualisiert darauf seinen Fehler-Zähler)
+    configure_events(on)
+    get_bus().set(LOG_STRUKTURIERT, int(bool(on)))
+
 class SettingsWidget(QWidget):
     def __init__(self, undo_manager: UndoManager, mainwindow=None):
         super().__init__()
@@ -57,6 +75,11 @@ class SettingsWidget(QWidget):
         self.layout.addWidget(QLabel("Schriftgröße:"))
         self.layout.addWidget(self.font_box)
 
+        # Strukturierte Log-Einträge (jeder Eintrag wird dann zweimal geschrieben)
+        self.chk_events = QCheckBox("Strukturierte Log-Einträge (Fehler-Zähler im Dashboard)")
+        self.chk_events.toggled.connect(self.toggle_structured_log)
+        self.layout.addWidget(self.chk_events)
+
         # Vorschau
         self.preview_label = QLabel("Vorschau – Mudschikato Struktur & Hilfstool 2025")
         self.layout.addWidget(self.preview_label)
@@ -82,13 +105,7 @@ class SettingsWidget(QWidget):
         self.update_preview()
 
     def load_settings(self):
-        if os.path.exists(SETTINGSFILE):
-            try:
-                with open(SETTINGSFILE, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except Exception:
-                pass
-        return dict(DEFAULT_SETTINGS)
+        return load_settings()
 
     def save_settings(self):
         with open(SETTINGSFILE, "w", encoding="utf-8") as f:
@@ -106,6 +123,10 @@ class SettingsWidget(QWidget):
             self.settings["fg_color"] = color.name()
             self.update_preview()
 
+    def toggle_structured_log(self, on):
+        # Wirkt erst mit "Übernehmen", wie die übrigen Einstellungen
+        self.settings["structured_log"] = on
+
     def update_preview(self):
         # Theme setzen
         theme = self.theme_box.currentText()
@@ -132,6 +153,10 @@ class SettingsWidget(QWidget):
             f"color: {settings['fg_color']}; background:{settings['bg_color']};"
         )
         self.setAutoFillBackground(True)
+        if not preview_only:
+            # Haken und tatsächlicher Zustand bleiben auch nach Undo/Reset gleich
+            self.chk_events.setChecked(settings.get("structured_log", False))
+            set_structured_log(settings.get("structured_log", False))
         if not preview_only and self.mainwindow:
             self.mainwindow.setFont(font)
             self.mainwindow.setStyleSheet(
@@ -175,8 +200,13 @@ class SettingsWidget(QWidget):
         self.settings = dict(DEFAULT_SETTINGS)
         self.theme_box.setCurrentIndex(0)
         self.font_box.setCurrentIndex(0)
+        self.chk_events.setChecked(False)
         self.update_preview()
         self.save_settings()
+        self.apply_to_gui(self.settings)
+        if self.mainwindow:
+            self.apply_to_all_tabs(self.settings)
+        self.last_settings = dict(self.settings)
         def undo():
             self.settings = dict(prev)
             self.save_settings()
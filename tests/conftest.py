@@ -0,0 +1,13 @@
+import os
+import sys
+
+import pytest
+
+# Die Module liegen flach im Projektordner
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture(autouse=True)
+def arbeitsordner(tmp_path, monkeypatch):
+    # Caches, Logs und Ablagen werden relativ zum Arbeitsverzeichnis angelegt
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+pytest.importorskip("PyQt6")
+
+import backup_mudschikato
+from backup_mudschikato import BackupStore
+
+def schreibe(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    # mtime_ns muss sich auch bei schnellen Folgeschreibvorgängen ändern
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+def chunks(store):
+    return {fname[:-2] for sub in os.listdir(store.chunk_dir)
+            for fname in os.listdir(os.path.join(store.chunk_dir, sub))}
+
+def used(store):
+    return {d for name in store.snapshots() for info in store.load_snapshot(name).values()
+            for d in info["chunks"]}
+
+def snapshots_mit_versionen(tmp_path, n, **kwargs):
+    store = BackupStore(str(tmp_path / "backup"))
+    path = str(tmp_path / "daten.txt")
+    for i in range(n):
+        schreibe(path, f"Version {i}")
+        store.backup([path], **kwargs)
+    return store, path
+
+def test_prune_keeps_newest_and_sweeps_unused_chunks(tmp_path):
+    store, path = snapshots_mit_versionen(tmp_path, 4, prune=False)
+    names = store.snapshots()
+    assert len(names) == 4
+    store.prune(keep=2)
+    assert store.snapshots() == names[-2:]
+    assert chunks(store) == used(store)
+    os.remove(path)
+    assert store.restore(names[-1]) == [path]
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "Version 3"
+
+def test_prune_is_a_no_op_below_limit(tmp_path):
+    store, path = snapshots_mit_versionen(tmp_path, 2, prune=False)
+    before = chunks(store)
+    store.prune(keep=5)
+    assert len(store.snapshots()) == 2
+    assert chunks(store) == before
+
+def test_backup_prunes_with_current_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(backup_mudschikato, "KEEP_SNAPSHOTS", 2)
+    store, path = snapshots_mit_versionen(tmp_path, 3)
+    assert len(store.snapshots()) == 2
+    schreibe(path, "Version 3")
+    store.backup([path], prune=False)  # Sicherung vor dem Wiederherstellen
+    assert len(store.snapshots()) == 3
+
+def test_unchanged_files_write_no_snapshot(tmp_path):
+    store, path = snapshots_mit_versionen(tmp_path, 1)
+    stats = store.backup([path])
+    assert stats["snapshot"] is None
+    assert len(store.snapshots()) == 1
@@ -0,0 +1,64 @@
+import json
+
+from downloadrules_mudschikato import (
+    DEFAULT_REGELN, compile_rules, evaluate, load_auto, load_rules, save_auto
+)
+from downloadscan_mudschikato import DownloadIndex, FileRecord
+from filetypes_mudschikato import KAT_CODE
+
+NOW = 1_000_000_000.0
+
+def test_missing_rule_file_is_created_with_defaults(tmp_path):
+    path = tmp_path / "regeln.json"
+    assert load_rules(str(path)) == DEFAULT_REGELN
+    assert json.loads(path.read_text(encoding="utf-8")) == DEFAULT_REGELN
+
+def test_rule_file_must_hold_a_list(tmp_path):
+    path = tmp_path / "regeln.json"
+    path.write_text('{"name": "x"}', encoding="utf-8")
+    assert load_rules(str(path)) == []
+    path.write_text("kein json", encoding="utf-8")
+    assert load_rules(str(path)) == []
+
+def test_invalid_rules_are_skipped():
+    rules = [
+        "keine Regel",
+        {"name": "ohne Aktion"},
+        {"name": "falscher Typ", "typ": "Fotos", "aktion": "archiv"},
+        {"name": "negativ", "groesser_als_mb": -1, "aktion": "archiv"},
+        {"name": "Text", "aelter_als_tage": "90", "aktion": "archiv"},
+        {"name": "bool", "groesser_als_mb": True, "aktion": "archiv"},
+        {"name": "gut", "typ": "Video", "groesser_als_mb": 1.5, "aelter_als_tage": 2, "aktion": "papierkorb"},
+    ]
+    compiled = compile_rules(rules, now=NOW)
+    assert len(compiled) == 1
+    rule = compiled[0]
+    assert rule.name == "gut"
+    assert rule.kind == KAT_CODE["Video"]
+    assert rule.size_min == 1_500_000
+    assert rule.mtime_max == NOW - 2 * 86400
+
+def test_first_matching_rule_wins():
+    ix = DownloadIndex()
+    ix.extend([
+        FileRecord("/dl/alt.zip", 10, NOW - 100 * 86400, KAT_CODE["Archive"]),
+        FileRecord("/dl/neu.zip", 10, NOW, KAT_CODE["Archive"]),
+        FileRecord("/dl/gross.mp4", 200_000_000, NOW, KAT_CODE["Video"]),
+        FileRecord("/dl/weg.mp4", 200_000_000, NOW, KAT_CODE["Video"]),
+    ])
+    ix.remove("/dl/weg.mp4")
+    rules = compile_rules([
+        {"name": "alt", "aelter_als_tage": 90, "aktion": "archiv"},
+        {"name": "gross", "groesser_als_mb": 100, "aktion": "papierkorb"},
+        {"name": "alles", "aktion": "papierkorb"},
+    ], now=NOW)
+    hits = evaluate(ix, rules)
+    assert hits["archiv"] == [("/dl/alt.zip", "alt")]
+    assert sorted(hits["papierkorb"]) == [("/dl/gross.mp4", "gross"), ("/dl/neu.zip", "alles")]
+
+def test_auto_option_round_trip():
+    assert load_auto() is False
+    save_auto(True)
+    assert load_auto() is True
+    save_auto(False)
+    assert load_auto() is False
@@ -0,0 +1,81 @@
+import os
+
+from downloadscan_mudschikato import DownloadIndex, FileRecord
+
+def records(n, dirpath="/dl"):
+    return [FileRecord(os.path.join(dirpath, f"f{i:05d}"), i, 1000.0 + i, 0) for i in range(n)]
+
+class Zaehler:
+    # Gleiche Schnittstelle wie DirSizeTree/CounterObserver
+    def __init__(self):
+        self.count = 0
+        self.bytes = 0
+
+    def reset(self):
+        self.count = self.bytes = 0
+
+    def file_added(self, rec):
+        self.count += 1
+        self.bytes += rec.size
+
+    def file_removed(self, rec):
+        self.count -= 1
+        self.bytes -= rec.size
+
+def test_extend_returns_first_new_row():
+    ix = DownloadIndex()
+    assert ix.extend(records(3)) == 0
+    assert ix.extend(records(2, "/other")) == 3
+    assert ix.record(3).path == "/other/f00000"
+
+def test_removed_rows_are_skipped_without_compaction():
+    ix = DownloadIndex()
+    ix.extend(records(10))
+    for rec in records(10)[:3]:
+        assert ix.remove(rec.path)
+    assert not ix.remove("/dl/f00000")
+    assert len(ix.paths) == 10  # nur als tot markiert
+    assert ix.query({}) == list(range(3, 10))
+
+def test_compaction_renumbers_rows_consistently():
+    ix = DownloadIndex()
+    zaehler = Zaehler()
+    ix.observers.append(zaehler)
+    recs = records(3000)
+    ix.extend(recs)
+    for rec in recs[:2000]:
+        ix.remove(rec.path)
+    # Kompaktiert wurde unterwegs: weniger Zeilen als angelegt, Zeilennummern neu vergeben
+    assert len(ix.paths) < 3000
+    assert len(ix) == 1000
+    live = ix.query({})
+    assert len(live) == 1000
+    assert sorted(ix.paths[i] for i in live) == [rec.path for rec in recs[2000:]]
+    for rec in recs[2000:]:
+        i = ix.rows[rec.path]
+        assert ix.record(i) == rec
+    for rec in recs[:2000]:
+        assert rec.path not in ix
+    # Kompaktieren ändert den Inhalt nicht und meldet daher nichts an die Beobachter
+    assert zaehler.count == 1000
+    assert zaehler.bytes == sum(rec.size for rec in recs[2000:])
+
+def test_sync_dir_reports_changed_and_removed():
+    ix = DownloadIndex()
+    ix.extend(records(3))
+    fresh = [
+        FileRecord("/dl/f00000", 0, 1000.0, 0),     # unverändert
+        FileRecord("/dl/f00001", 99, 2000.0, 0),    # geändert
+        FileRecord("/dl/neu", 5, 3000.0, 0),        # neu
+    ]
+    changed, removed = ix.sync_dir("/dl", fresh)
+    assert sorted(changed) == ["/dl/f00001", "/dl/neu"]
+    assert removed == ["/dl/f00002"]
+    assert ix.record(ix.rows["/dl/f00001"]).size == 99
+
+def test_remove_tree_only_touches_subtree():
+    ix = DownloadIndex()
+    ix.extend(records(2, "/dl/a") + records(2, "/dl/a/b") + records(2, "/dl/ab"))
+    gone = ix.remove_tree("/dl/a")
+    assert len(gone) == 4
+    assert sorted(ix.paths[i] for i in ix.query({})) == ["/dl/ab/f00000", "/dl/ab/f00001"]
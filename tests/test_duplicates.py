@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+pytest.importorskip("PyQt6")
+
+import duplicates_mudschikato
+from downloadscan_mudschikato import FileRecord
+from duplicates_mudschikato import HashCache, find_duplicates
+
+def datei(path, data, mtime):
+    with open(path, "wb") as f:
+        f.write(data)
+    os.utime(path, (mtime, mtime))
+    return FileRecord(str(path), len(data), mtime, 0)
+
+def test_groups_identical_files_oldest_first(tmp_path):
+    a = datei(tmp_path / "a", b"gleich" * 1000, 200)
+    b = datei(tmp_path / "b", b"gleich" * 1000, 100)
+    c = datei(tmp_path / "c", b"anders" * 1000, 100)   # gleiche Größe, anderer Inhalt
+    d = datei(tmp_path / "d", b"", 100)                 # leere Dateien zählen nicht
+    e = datei(tmp_path / "e", b"", 100)
+    assert find_duplicates([a, b, c, d, e], workers=2) == [[b, a]]
+
+def test_cache_reuses_hashes_until_file_changes(tmp_path, monkeypatch):
+    a = datei(tmp_path / "a", b"x" * 300_000, 100)
+    b = datei(tmp_path / "b", b"x" * 300_000, 100)
+    cache = HashCache(str(tmp_path / "cache.json"))
+    assert len(find_duplicates([a, b], cache)) == 1
+    cache.save()
+
+    calls = []
+    real_partial = duplicates_mudschikato.partial_digest
+    monkeypatch.setattr(duplicates_mudschikato, "partial_digest",
+                        lambda rec: calls.append(rec.path) or real_partial(rec))
+    cache = HashCache(str(tmp_path / "cache.json"))
+    assert len(find_duplicates([a, b], cache)) == 1
+    assert calls == []
+    b2 = datei(tmp_path / "b", b"x" * 300_000, 200)  # neue mtime: Eintrag gilt nicht mehr
+    find_duplicates([a, b2], cache)
+    assert calls == [b2.path]
+
+def test_prune_drops_vanished_files(tmp_path):
+    a = datei(tmp_path / "a", b"x", 100)
+    cache = HashCache(str(tmp_path / "cache.json"))
+    cache.put(a, "hash")
+    cache.put(FileRecord(str(tmp_path / "weg"), 1, 100, 0), "hash")
+    cache.prune()
+    assert list(cache.entries) == [a.path]
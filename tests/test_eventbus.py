@@ -0,0 +1,32 @@
+import pytest
+
+pytest.importorskip("PyQt6")
+
+from downloadscan_mudschikato import DownloadIndex, FileRecord
+from eventbus_mudschikato import CounterObserver, EventBus
+
+def test_add_and_set_report_only_changes():
+    bus = EventBus()
+    seen = []
+    bus.counter_changed.connect(lambda name, value: seen.append((name, value)))
+    bus.add("x", 3)
+    bus.add("x", 0)     # kein Delta, keine Meldung
+    bus.add("x", -1)
+    bus.set("y", 5)
+    bus.set("y", 5)     # unverändert, keine Meldung
+    bus.set("x", 2)     # gleicher Wert wie nach den Deltas
+    assert seen == [("x", 3), ("x", 2), ("y", 5)]
+    assert bus.get("x") == 2
+    assert bus.get("fehlt") is None
+    assert bus.get("fehlt", 0) == 0
+
+def test_counter_observer_follows_the_index():
+    bus = EventBus()
+    ix = DownloadIndex()
+    ix.observers.append(CounterObserver(bus, "anzahl", "bytes"))
+    ix.extend([FileRecord(f"/dl/{i}", 100, 0.0, 0) for i in range(5)])
+    ix.add(FileRecord("/dl/0", 300, 1.0, 0))  # bekannte Datei wächst
+    ix.remove("/dl/1")
+    assert (bus.get("anzahl"), bus.get("bytes")) == (4, 600)
+    ix.clear()
+    assert (bus.get("anzahl"), bus.get("bytes")) == (0, 0)
@@ -0,0 +1,114 @@
+import os
+import time
+
+import pytest
+
+import logging_mudschikato as lm
+
+@pytest.fixture(autouse=True)
+def frisches_log(arbeitsordner):
+    # Der Schreib-Thread lebt über alle Tests; seinen Zustand auf das neue Arbeitsverzeichnis umstellen
+    lm.flush_log()
+    lm._name_ids.clear()
+    lm._event_indexes.clear()
+    lm.resync_log()
+    yield
+    lm.flush_log()
+    lm.configure_events(False)
+
+def test_tail_lines_reads_only_the_end(tmp_path):
+    path = tmp_path / "x.log"
+    path.write_text("".join(f"Zeile {i} äöü\n" for i in range(100)), encoding="utf-8")
+    # Kleine Blöcke: Grenzen fallen auch mitten in Umlaute
+    assert lm.tail_lines(3, str(path), block=7) == ["Zeile 97 äöü", "Zeile 98 äöü", "Zeile 99 äöü"]
+    assert len(lm.tail_lines(500, str(path), block=7)) == 100
+    assert lm.tail_lines(0, str(path)) == []
+    assert lm.tail_lines(3, str(tmp_path / "fehlt.log")) == []
+
+def test_log_event_lands_in_logfile():
+    lm.log_event("Hallo", "Test", "INFO", print_console=False)
+    lm.log_events(["eins", "zwei"], "Test", "WARNING", print_console=False)
+    lm.flush_log()
+    lines = lm.tail_lines(3, lm.LOGFILE)
+    assert lines[0].endswith("[INFO] [Test] Hallo")
+    assert lines[1].endswith("[WARNING] [Test] eins")
+    assert lines[2].endswith("[WARNING] [Test] zwei")
+
+def warte_auf_komprimierung(timeout=5.0):
+    # Segmente werden in eigenen Threads gepackt; vor dem Verzeichniswechsel abwarten
+    ende = time.time() + timeout
+    while time.time() < ende:
+        index = lm._load_index()
+        # Erst fertig, wenn auch die ungepackten Quellen gelöscht sind
+        offen = [f for f in os.listdir(lm.LOGARCHIV) if f.endswith((".log", ".jsonl", ".tmp"))]
+        if not offen and all(seg["file"].endswith(".gz") and seg.get("events", ".gz").endswith(".gz")
+                             for seg in index):
+            return index
+        time.sleep(0.02)
+    raise AssertionError("Segmente wurden nicht komprimiert")
+
+def schreibe_einzeln(n, context="Test", typ="INFO"):
+    for i in range(n):
+        lm.log_event(f"Eintrag {i:03d}", context, typ, print_console=False)
+        lm.flush_log()  # ein Schreibvorgang pro Eintrag, damit die Rotation greifen kann
+
+def test_rotation_keeps_every_entry_in_order(monkeypatch):
+    monkeypatch.setattr(lm, "LOG_MAX_BYTES", 200)
+    schreibe_einzeln(20)
+    index = warte_auf_komprimierung()
+    assert len(index) > 1
+    for earlier, later in zip(index, index[1:]):
+        assert earlier["start"] <= later["start"]
+    lines = []
+    for path in lm.log_segments():
+        with lm.open_log(path) as f:
+            lines += [line.rstrip("\n") for line in f]
+    assert [line[-11:] for line in lines] == [f"Eintrag {i:03d}" for i in range(20)]
+
+def test_rotation_drops_oldest_segments(monkeypatch):
+    monkeypatch.setattr(lm, "LOG_MAX_BYTES", 100)
+    monkeypatch.setattr(lm, "LOG_KEEP_SEGMENTS", 2)
+    schreibe_einzeln(10)
+    index = warte_auf_komprimierung()
+    assert len(index) == 2
+    assert sorted(os.listdir(lm.LOGARCHIV)) == sorted(["index.json"] + [seg["file"] for seg in index])
+
+def test_log_segments_skips_segments_outside_window(monkeypatch):
+    monkeypatch.setattr(lm, "LOG_MAX_BYTES", 100)
+    schreibe_einzeln(6)
+    index = warte_auf_komprimierung()
+    assert lm.log_segments(until=index[0]["start"] - 10) == []
+    assert lm.log_segments(since=time.time() + 10) == [lm.LOGFILE]
+
+def test_events_are_off_by_default():
+    assert not lm.events_enabled()
+    lm.log_event("nur Text", "Test", "ERROR", print_console=False)
+    lm.flush_log()
+    assert not os.path.exists(lm.EVENTFILE)
+    assert lm.count_events(typ="ERROR") == 0
+
+def test_query_events_by_context_type_and_time():
+    lm.configure_events(True)
+    start = time.time()
+    lm.log_event("a", "Downloads", "ERROR", print_console=False)
+    lm.log_event("b", "Downloads", "INFO", print_console=False)
+    lm.log_events(["c", "d"], "Papierkorb", "ERROR", print_console=False)
+    lm.flush_log()
+    assert lm.count_events(typ="ERROR") == 3
+    assert lm.count_events(context="Downloads") == 2
+    assert lm.count_events(context="Unbekannt") == 0
+    assert [e["msg"] for e in lm.query_events(typ="ERROR")] == ["a", "c", "d"]
+    assert [e["msg"] for e in lm.query_events(typ="ERROR", limit=2)] == ["c", "d"]
+    assert lm.query_events(context="Downloads", typ="INFO")[0]["ctx"] == "Downloads"
+    assert lm.count_events(since=start - 1) == 4
+    assert lm.count_events(since=time.time() + 10) == 0
+
+def test_query_events_across_rotated_segments(monkeypatch):
+    lm.configure_events(True)
+    monkeypatch.setattr(lm, "LOG_MAX_BYTES", 150)
+    schreibe_einzeln(8, "Rotation", "ERROR")
+    warte_auf_komprimierung()
+    assert lm.count_events(context="Rotation", typ="ERROR") == 8
+    assert [e["msg"] for e in lm.query_events(context="Rotation")] == [f"Eintrag {i:03d}" for i in range(8)]
+    assert [e["msg"] for e in lm.query_events(context="Rotation", limit=3)] == [
+        f"Eintrag {i:03d}" for i in range(5, 8)]
@@ -0,0 +1,58 @@
+import os
+import time
+
+import pytest
+
+pytest.importorskip("PyQt6")
+
+from papierkorb_mudschikato import TrashStore
+
+def datei(path, size):
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    return str(path)
+
+def test_manifest_round_trip(tmp_path):
+    store = TrashStore(str(tmp_path / "korb"))
+    a = store.put(datei(tmp_path / "a.txt", 10))
+    b = store.put(datei(tmp_path / "b.txt", 20))
+    c = store.put(datei(tmp_path / "c.txt", 30))
+    assert store.restore(b.key) == str(tmp_path / "b.txt")
+    assert store.purge([c.key]) == (1, 30, [])
+
+    again = TrashStore(str(tmp_path / "korb"))
+    assert again.all_entries() == [a]
+    assert again.total_size == 10
+    assert [e.key for e in again.find(str(tmp_path / "a.txt"))] == [a.key]
+    assert again.find(str(tmp_path / "b.txt")) == []
+
+def test_restore_keeps_existing_file(tmp_path):
+    store = TrashStore(str(tmp_path / "korb"))
+    entry = store.put(datei(tmp_path / "a.txt", 10))
+    datei(tmp_path / "a.txt", 5)  # neue Datei gleichen Namens
+    target = store.restore(entry.key)
+    assert target != str(tmp_path / "a.txt")
+    assert os.path.getsize(target) == 10
+    assert os.path.getsize(tmp_path / "a.txt") == 5
+    assert store.count() == 0
+
+def test_compacts_long_manifest(tmp_path):
+    store = TrashStore(str(tmp_path / "korb"))
+    for i in range(120):
+        store.purge([store.put(datei(tmp_path / f"{i}.txt", 1)).key])
+    keep = store.put(datei(tmp_path / "bleibt.txt", 1))
+    again = TrashStore(str(tmp_path / "korb"))
+    assert again.all_entries() == [keep]
+    assert again.log_lines == 1
+
+def test_adopted_files_are_oldest_first(tmp_path):
+    root = tmp_path / "korb"
+    root.mkdir()
+    now = time.time()
+    for name, days in [("neu", 1), ("alt", 100), ("mittel", 50)]:
+        path = datei(root / name, 10)
+        os.utime(path, (now - days * 86400, now - days * 86400))
+    store = TrashStore(str(root))
+    assert [e.key for e in store.all_entries()] == ["alt", "mittel", "neu"]
+    assert store.select("limit", 10) == ["alt", "mittel"]
+    assert store.select("alter", 30 * 86400, now=now) == ["alt", "mittel"]
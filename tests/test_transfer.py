@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+pytest.importorskip("PyQt6")
+
+from transfer_mudschikato import plan_moves, rename_no_replace
+
+def schreibe(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def lies(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+def test_rename_no_replace_moves_file(tmp_path):
+    src, dst = tmp_path / "a.txt", tmp_path / "b.txt"
+    schreibe(src, "inhalt")
+    rename_no_replace(str(src), str(dst))
+    assert not src.exists()
+    assert lies(dst) == "inhalt"
+
+def test_rename_no_replace_keeps_existing_target(tmp_path):
+    src, dst = tmp_path / "a.txt", tmp_path / "b.txt"
+    schreibe(src, "neu")
+    schreibe(dst, "alt")
+    with pytest.raises(FileExistsError):
+        rename_no_replace(str(src), str(dst))
+    assert lies(src) == "neu"
+    assert lies(dst) == "alt"
+
+def test_rename_no_replace_moves_directory(tmp_path):
+    src, dst = tmp_path / "ordner", tmp_path / "ziel"
+    src.mkdir()
+    schreibe(src / "x.txt", "x")
+    rename_no_replace(str(src), str(dst))
+    assert lies(dst / "x.txt") == "x"
+    dst2 = tmp_path / "belegt"
+    dst2.mkdir()
+    with pytest.raises(FileExistsError):
+        rename_no_replace(str(dst), str(dst2))
+    assert dst.exists()
+
+def test_plan_moves_never_reuses_a_target(tmp_path):
+    target = tmp_path / "archiv"
+    target.mkdir()
+    schreibe(target / "a.txt", "vorhanden")
+    pairs = plan_moves(["/x/a.txt", "/y/a.txt"], str(target))
+    dsts = [dst for src, dst in pairs]
+    assert len(set(dsts)) == 2
+    assert str(target / "a.txt") not in dsts
@@ -0,0 +1,335 @@
+"""
+thumbnails_mudschikato.py
+-------------------------
+Miniaturbilder im Hintergrund für Mudschikato (Bildvorschau).
+- Dekodieren und Verkleinern in einem QThreadPool, die GUI wartet nie auf eine Bilddatei
+- QImageReader.setScaledSize: das Bild wird direkt in Zielgröße gelesen (JPEG skaliert schon
+  beim Dekodieren), die volle Bitmap entsteht nie
+- Veraltete Anfragen werden aus der Warteschlange genommen bzw. ihr Ergebnis verworfen
+- Zwei Cache-Stufen: QPixmaps im Speicher (LRU nach Bytes) vor einem Datei-Cache auf der Platte
+  (Schlüssel aus Pfad, mtime und Größe wie bei freedesktop-Thumbnails, LRU mit Größengrenze)
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QSize, QTimer, Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader, QPixmap
+from logging_mudschikato import log_event
+
+THUMB_SIZE = 220    # Kantenlänge der Vorschau (Bild wird proportional eingepasst)
+THUMB_THREADS = 4   # parallele Dekodierungen
+MEM_CACHE_BYTES = 64 * 1024 * 1024    # QPixmaps im Speicher
+THUMBCACHE = "mudschikato_thumbs"     # Datei-Cache (ein Bild pro Schlüssel + index.db)
+DISK_CACHE_BYTES = 256 * 1024 * 1024  # darüber werden die am längsten unbenutzten gelöscht
+SAVE_DELAY_MS = 5000                  # Index verzögert und gesammelt speichern
+PRIO_SHOW = 10      # sichtbares Bild zuerst ...
+PRIO_PREFETCH = 0   # ... Nachbarn danach
+
+def read_thumbnail(path: str, size: int = THUMB_SIZE) -> QImage:
+    """Liest path direkt verkleinert ein (leeres QImage bei Fehlern)."""
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)  # EXIF-Drehung beachten
+    orig = reader.size()
+    if orig.isValid() and (orig.width() > size or orig.height() > size):
+        reader.setScaledSize(orig.scaled(QSize(size, size), Qt.AspectRatioMode.KeepAspectRatio))
+    img = reader.read()
+    if not img.isNull() and (img.width() > size or img.height() > size):
+        # Formate ohne Größenangabe im Kopf: nachträglich verkleinern
+        img = img.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio,
+                         Qt.TransformationMode.SmoothTransformation)
+    return img
+
+class ThumbDiskCache:
+    """
+    Miniaturen als Dateien in THUMBCACHE, Name = md5(Pfad, mtime, Größe, Kantenlänge).
+    Ändert sich die Quelldatei, ändert sich der Schlüssel; alte Einträge altern per LRU heraus.
+    Der Index (Datei, Bytes, letzte Nutzung) liegt im Speicher und wird gesammelt nach
+    index.db geschrieben; alle Methoden außer save dürfen aus den Pool-Threads kommen.
+    """
+    def __init__(self, root: str = THUMBCACHE, max_bytes: int = DISK_CACHE_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.db = os.path.join(root, "index.db")
+        self.lock = threading.Lock()
+        self.entries: Dict[str, list] = {}  # Schlüssel -> [Dateiname, Bytes, letzte Nutzung]
+        self.total = 0
+        self.dirty = False
+        os.makedirs(root, exist_ok=True)
+        self.load()
+
+    def _connect(self):
+        con = sqlite3.connect(self.db)
+        con.execute("CREATE TABLE IF NOT EXISTS thumbs (key TEXT PRIMARY KEY, file TEXT, bytes INTEGER, used REAL)")
+        return con
+
+    def load(self):
+        try:
+            con = self._connect()
+            try:
+                for key, fname, size, used in con.execute("SELECT key, file, bytes, used FROM thumbs"):
+                    self.entries[key] = [fname, size, used]
+                    self.total += size
+            finally:
+                con.close()
+        except sqlite3.Error as e:
+            log_event(f"Vorschau-Cache nicht lesbar, wird neu aufgebaut: {e}", "ImagePreview", "WARNING")
+        self.reconcile()
+
+    def reconcile(self):
+        """
+        Gleicht den Index mit dem Verzeichnis ab: Dateien ohne Eintrag (nach Absturz nicht mehr
+        gespeichert, liegengebliebene .tmp) werden gelöscht, Einträge ohne Datei verworfen.
+        So bleibt DISK_CACHE_BYTES auch nach unsauberem Beenden eine echte Grenze.
+        """
+        by_file = {e[0]: key for key, e in self.entries.items()}
+        seen = set()
+        try:
+            it = os.scandir(self.root)
+        except OSError:
+            return
+        with it:
+            for entry in it:
+                if entry.name.startswith("index.db"):
+                    continue  # Index samt sqlite-Journal
+                key = by_file.get(entry.name)
+                try:
+                    if key is None:
+                        os.remove(entry.path)
+                        continue
+                    size = entry.stat().st_size
+                except OSError:
+                    continue
+                seen.add(key)
+                if size != self.entries[key][1]:
+                    self.total += size - self.entries[key][1]
+                    self.entries[key][1] = size
+                    self.dirty = True
+        for key in set(self.entries) - seen:
+            self.total -= self.entries.pop(key)[1]
+            self.dirty = True
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            rows = [(key, *e) for key, e in self.entries.items()]
+            self.dirty = False
+        try:
+            con = self._connect()
+            try:
+                with con:
+                    con.execute("DELETE FROM thumbs")
+                    con.executemany("INSERT INTO thumbs VALUES (?, ?, ?, ?)", rows)
+            finally:
+                con.close()
+        except sqlite3.Error as e:
+            log_event(f"Vorschau-Cache konnte nicht gespeichert werden: {e}", "ImagePreview", "ERROR")
+
+    @staticmethod
+    def key(path: str, st: os.stat_result, size: int) -> str:
+        raw = f"{os.path.abspath(path)}\0{st.st_mtime_ns}\0{st.st_size}\0{size}"
+        return hashlib.md5(raw.encode("utf-8", errors="surrogateescape")).hexdigest()
+
+    def get(self, key: str) -> Optional[QImage]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            entry[2] = time.time()
+            self.dirty = True
+        img = QImage(os.path.join(self.root, entry[0]))
+        if img.isNull():
+            self._drop(key)  # Datei fehlt oder ist kaputt
+            return None
+        return img
+
+    def put(self, key: str, img: QImage):
+        # JPEG ist klein; nur Bilder mit Transparenz brauchen PNG
+        fname = key + (".png" if img.hasAlphaChannel() else ".jpg")
+        fpath = os.path.join(self.root, fname)
+        tmp = fpath + ".tmp"
+        try:
+            if not img.save(tmp, "PNG" if fname.endswith(".png") else "JPG", 85):
+                raise OSError("Speichern fehlgeschlagen")
+            os.replace(tmp, fpath)
+            size = os.path.getsize(fpath)
+        except OSError as e:
+            # Läuft im Pool-Thread: eine Ausnahme hier würde das Programm beenden
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            log_event(f"Miniatur nicht im Cache gespeichert: {e}", "ImagePreview", "WARNING", print_console=False)
+            return
+        with self.lock:
+            old = self.entries.get(key)
+            if old is not None:
+                self.total -= old[1]
+            self.entries[key] = [fname, size, time.time()]
+            self.total += size
+            self.dirty = True
+            if self.total <= self.max_bytes:
+                return
+            # Auf 90 % der Grenze zurück, am längsten unbenutzte zuerst
+            victims = []
+            for k, e in sorted(self.entries.items(), key=lambda item: item[1][2]):
+                if self.total <= self.max_bytes * 0.9:
+                    break
+                victims.append(e[0])
+                self.total -= e[1]
+                del self.entries[k]
+        for victim in victims:
+            try:
+                os.remove(os.path.join(self.root, victim))
+            except OSError:
+                pass
+
+    def _drop(self, key: str):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.total -= entry[1]
+                self.dirty = True
+
+_disk_cache = None
+
+def get_disk_cache() -> ThumbDiskCache:
+    """Gemeinsamer Datei-Cache für alle Loader (ein Index, eine Größengrenze)."""
+    global _disk_cache
+    if _disk_cache is None:
+        _disk_cache = ThumbDiskCache()
+    return _disk_cache
+
+class ThumbSignals(QObject):
+    thumb_ready = pyqtSignal(str, QImage, object)  # Pfad, Miniatur (leer = nicht lesbar), mtime_ns
+    thumb_unchanged = pyqtSignal(str)  # Prüfung: Speicher-Eintrag ist noch aktuell
+
+class ThumbTask(QRunnable):
+    def __init__(self, path: str, size: int, disk: ThumbDiskCache, signals: ThumbSignals,
+                 known_mtime: Optional[int] = None):
+        super().__init__()
+        self.setAutoDelete(False)  # Lebensdauer bestimmt der Loader (Python-Referenz)
+        self.path = path
+        self.size = size
+        self.disk = disk
+        self.signals = signals
+        self.known_mtime = known_mtime  # gesetzt: nur neu laden, wenn die Quelle sich geändert hat
+        self.cancelled = False
+
+    def run(self):
+        if self.cancelled:
+            return
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self.signals.thumb_ready.emit(self.path, QImage(), None)
+            return
+        if self.known_mtime is not None and st.st_mtime_ns == self.known_mtime:
+            self.signals.thumb_unchanged.emit(self.path)
+            return
+        key = self.disk.key(self.path, st, self.size)
+        img = self.disk.get(key)  # Treffer: nur die kleine Miniatur lesen
+        if img is None:
+            img = read_thumbnail(self.path, self.size)
+            if not img.isNull():
+                self.disk.put(key, img)
+        if not self.cancelled:
+            self.signals.thumb_ready.emit(self.path, img, st.st_mtime_ns)
+
+class ThumbnailLoader(QObject):
+    """
+    Verwaltet Anfragen: request() reiht ein (doppelte Anfragen werden zusammengelegt),
+    retain() verwirft alles, was nicht mehr gebraucht wird. Ergebnisse kommen über thumb_ready
+    im GUI-Thread als QPixmap an und liegen danach im Speicher-LRU (get, reines Nachschlagen
+    ohne Dateizugriff, also auch aus data() heraus billig). Jeder Speicher-Eintrag merkt sich
+    die mtime der Quelle; request() auf einen vorhandenen Eintrag lässt den Worker nur die mtime
+    prüfen und erkennt so an Ort und Stelle bearbeitete Bilder (dafür meldet der Ordner-Watcher
+    nichts), die dann neu geladen werden.
+    """
+    thumb_ready = pyqtSignal(str, QPixmap)
+
+    def __init__(self, size: int = THUMB_SIZE, mem_bytes: int = MEM_CACHE_BYTES, parent=None):
+        super().__init__(parent)
+        self.size = size
+        self.mem_bytes = mem_bytes
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(THUMB_THREADS)
+        self.disk = get_disk_cache()
+        self.signals = ThumbSignals()
+        self.signals.thumb_ready.connect(self._finished)
+        self.signals.thumb_unchanged.connect(self._unchanged)
+        self.queued: Dict[str, ThumbTask] = {}
+        self.cache: "OrderedDict[str, tuple]" = OrderedDict()  # Pfad -> (QPixmap, mtime_ns)
+        self.cache_bytes = 0
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(SAVE_DELAY_MS)
+        self.save_timer.timeout.connect(self.disk.save)
+
+    def get(self, path: str) -> Optional[QPixmap]:
+        hit = self.cache.get(path)
+        if hit is None:
+            return None
+        self.cache.move_to_end(path)
+        return hit[0]
+
+    def request(self, path: str, priority: int = PRIO_SHOW):
+        """Lädt path im Hintergrund; liegt er schon im Speicher, prüft der Worker nur die mtime."""
+        if path in self.queued:
+            return
+        hit = self.cache.get(path)
+        task = ThumbTask(path, self.size, self.disk, self.signals, None if hit is None else hit[1])
+        self.queued[path] = task
+        self.pool.start(task, priority)
+
+    def retain(self, paths: Iterable[str]):
+        """Bricht alle Anfragen ab, deren Pfad nicht in paths liegt."""
+        keep = set(paths)
+        for path, task in list(self.queued.items()):
+            if path in keep:
+                continue
+            task.cancelled = True  # läuft sie schon, wird das Ergebnis verworfen
+            self.pool.tryTake(task)
+            del self.queued[path]
+
+    def invalidate(self, path: str):
+        """Datei umbenannt/gelöscht/geändert: Speicher-Eintrag verwerfen (der Platten-Schlüssel ändert sich selbst)."""
+        hit = self.cache.pop(path, None)
+        if hit is not None:
+            self.cache_bytes -= self._bytes(hit[0])
+
+    def clear(self):
+        self.retain(())
+        self.cache.clear()
+        self.cache_bytes = 0
+
+    @staticmethod
+    def _bytes(pix: QPixmap) -> int:
+        return pix.width() * pix.height() * max(pix.depth(), 8) // 8
+
+    def _unchanged(self, path):
+        self.queued.pop(path, None)
+
+    def _finished(self, path, img, mtime):
+        if self.queued.pop(path, None) is None:
+            return  # inzwischen verworfen
+        pix = QPixmap.fromImage(img) if not img.isNull() else QPixmap()
+        self.invalidate(path)
+        self.cache[path] = (pix, mtime)
+        self.cache_bytes += self._bytes(pix)
+        while self.cache_bytes > self.mem_bytes and len(self.cache) > 1:
+            old_path, (old, old_mtime) = self.cache.popitem(last=False)
+            self.cache_bytes -= self._bytes(old)
+        self.save_timer.start()
+        self.thumb_ready.emit(path, pix)
+
+    def shutdown(self):
+        self.retain(())
+        self.pool.waitForDone()
+        self.save_timer.stop()
+        self.disk.save()
@@ -6,6 +6,7 @@ Einfaches, robustes ToDo-/Aufgabenlisten-Modul für Mudschikato.
 - Persistente Speicherung in Textdatei
 - Logging jeder Aktion
 - Undo für die letzten 5 Aktionen (z. B. Aufgabe gelöscht oder abgehakt)
+- Offene/gesamte Aufgaben werden als Deltas an den Ereignis-Bus gemeldet (Dashboard)
 """
 
 import os
@@ -13,15 +14,22 @@ from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton,
     QListWidget, QListWidgetItem, QMessageBox
 )
+from PyQt6.QtCore import Qt
 from logging_mudschikato import log_event
 from undo_mudschikato import UndoManager, UndoAction
+from eventbus_mudschikato import TODOS_OFFEN, TODOS_GESAMT, get_bus
 
 TODODATEI = "mudschikato_todos.txt"
 
+def ist_erledigt(item: QListWidgetItem) -> bool:
+    # checkState() ist in PyQt6 ein Enum und damit immer "wahr"
+    return item.checkState() == Qt.CheckState.Checked
+
 class ToDoWidget(QWidget):
     def __init__(self, undo_manager: UndoManager):
         super().__init__()
         self.undo_manager = undo_manager
+        self.bus = get_bus()
         self.setWindowTitle("Mudschikato ToDo-Liste")
         self.resize(420, 350)
         self.layout = QVBoxLayout()
@@ -36,6 +44,7 @@ class ToDoWidget(QWidget):
         
         self.todolist = QListWidget()
         self.todolist.itemChanged.connect(self.todo_checked)
+        self.erledigt = {}  # Eintrag -> zuletzt bekannter Haken (itemChanged kommt auch bei Textänderung)
         
         self.btn_delete = QPushButton("Markierte löschen")
         self.btn_delete.clicked.connect(self.delete_selected)
@@ -58,26 +67,38 @@ class ToDoWidget(QWidget):
             return
         item = QListWidgetItem(task)
         item.setFlags(item.flags() | item.ItemFlag.ItemIsUserCheckable)
-        item.setCheckState(0)  # Nicht abgehakt
+        item.setCheckState(Qt.CheckState.Unchecked)  # Nicht abgehakt
         self.todolist.addItem(item)
+        self.erledigt[item] = False
         self.input_field.clear()
         self.save_todos()
+        self.bus.add(TODOS_GESAMT, 1)
+        self.bus.add(TODOS_OFFEN, 1)
         log_event(f"Neue Aufgabe hinzugefügt: {task}", "ToDo", "INFO")
         # Undo für Hinzufügen: Aufgabe entfernen
         def undo():
             self.todolist.takeItem(self.todolist.row(item))
             self.save_todos()
+            self.bus.add(TODOS_GESAMT, -1)
+            if not self.erledigt.pop(item, False):
+                self.bus.add(TODOS_OFFEN, -1)
             log_event(f"Aufgabe entfernt (Undo): {task}", "ToDo", "UNDO")
         self.undo_manager.add(UndoAction(undo, description=f"Aufgabe: {task} hinzugefügt"))
     
     def todo_checked(self, item):
-        # Wird aufgerufen, wenn Checkbox geändert wird
-        state = "abgehakt" if item.checkState() else "offen"
+        # Wird aufgerufen, wenn Checkbox (oder Text) geändert wird
+        done = ist_erledigt(item)
+        if self.erledigt.get(item) == done:
+            self.save_todos()  # nur Text geändert
+            return
+        self.erledigt[item] = done
+        state = "abgehakt" if done else "offen"
         log_event(f"Aufgabe geändert: {item.text()} – Status: {state}", "ToDo", "INFO")
         self.save_todos()
-        # Undo für Abhaken: Status zurücksetzen
+        self.bus.add(TODOS_OFFEN, -1 if done else 1)
+        # Undo für Abhaken: Status zurücksetzen (itemChanged führt den Zähler nach)
         def undo():
-            item.setCheckState(0 if item.checkState() else 2)
+            item.setCheckState(Qt.CheckState.Unchecked if ist_erledigt(item) else Qt.CheckState.Checked)
             self.save_todos()
             log_event(f"Aufgabe-Status geändert (Undo): {item.text()}", "ToDo", "UNDO")
         self.undo_manager.add(UndoAction(undo, description=f"Status: {item.text()}"))
@@ -91,7 +112,11 @@ class ToDoWidget(QWidget):
         removed = [(self.todolist.row(item), item.text(), item.checkState()) for item in selected]
         for item in selected:
             self.todolist.takeItem(self.todolist.row(item))
+            self.erledigt.pop(item, None)
         self.save_todos()
+        open_removed = sum(1 for idx, text, state in removed if state != Qt.CheckState.Checked)
+        self.bus.add(TODOS_GESAMT, -len(removed))
+        self.bus.add(TODOS_OFFEN, -open_removed)
         log_event(f"{len(removed)} Aufgaben gelöscht", "ToDo", "INFO")
         # Undo: Aufgaben wieder einfügen
         def undo():
@@ -100,7 +125,10 @@ class ToDoWidget(QWidget):
                 item.setFlags(item.flags() | item.ItemFlag.ItemIsUserCheckable)
                 item.setCheckState(state)
                 self.todolist.insertItem(idx, item)
+                self.erledigt[item] = state == Qt.CheckState.Checked
             self.save_todos()
+            self.bus.add(TODOS_GESAMT, len(removed))
+            self.bus.add(TODOS_OFFEN, open_removed)
             log_event(f"Aufgaben wiederhergestellt (Undo)", "ToDo", "UNDO")
         self.undo_manager.add(UndoAction(undo, description="Aufgaben gelöscht"))
     
@@ -112,20 +140,27 @@ class ToDoWidget(QWidget):
         with open(TODODATEI, "w", encoding="utf-8") as f:
             for i in range(self.todolist.count()):
                 item = self.todolist.item(i)
-                f.write(f"{item.text()}\t{item.checkState()}\n")
+                f.write(f"{item.text()}\t{item.checkState().value}\n")
     
     def load_todos(self):
         self.todolist.clear()
-        if not os.path.exists(TODODATEI):
-            return
-        with open(TODODATEI, "r", encoding="utf-8") as f:
-            for line in f:
-                if "\t" in line:
-                    text, state = line.strip().split("\t")
-                    item = QListWidgetItem(text)
-                    item.setFlags(item.flags() | item.ItemFlag.ItemIsUserCheckable)
-                    item.setCheckState(int(state))
-                    self.todolist.addItem(item)
+        self.erledigt = {}
+        total = open_tasks = 0
+        if os.path.exists(TODODATEI):
+            with open(TODODATEI, "r", encoding="utf-8") as f:
+                for line in f:
+                    if "\t" in line:
+                        text, state = line.strip().split("\t")
+                        item = QListWidgetItem(text)
+                        item.setFlags(item.flags() | item.ItemFlag.ItemIsUserCheckable)
+                        item.setCheckState(Qt.CheckState(int(state)))
+                        self.todolist.addItem(item)
+                        self.erledigt[item] = ist_erledigt(item)
+                        total += 1
+                        open_tasks += not self.erledigt[item]
+        # Startwerte einmalig setzen, danach nur noch Deltas
+        self.bus.set(TODOS_GESAMT, total)
+        self.bus.set(TODOS_OFFEN, open_tasks)
 
 if __name__ == "__main__":
     app = QApplication([])
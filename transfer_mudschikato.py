@@ -0,0 +1,139 @@
+"""
+transfer_mudschikato.py
+-----------------------
+Stapel-Verschiebe-Engine für Mudschikato (Archivieren, Papierkorb, Undo).
+- Zielnamen werden vorab eindeutig vergeben (keine Überschreibung, auch nicht innerhalb des Stapels)
+- Gleiches Dateisystem: harter Link + Löschen der Quelle (überschreibt nie, auch wenn das Ziel
+  nach der Planung entstanden ist), ohne harte Links os.rename nach erneuter Prüfung
+- Bereits belegte Ziele werden als Konflikt gemeldet, nicht überschrieben
+- Anderes Dateisystem: Kopieren+Löschen parallel in einem Thread-Pool
+- Fortschritt per Callback, ein gesammelter Log-Eintrag pro Stapel
+"""
+
+import os
+import errno
+import shutil
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+from PyQt6.QtCore import QThread, pyqtSignal
+from logging_mudschikato import log_events
+
+TRANSFER_WORKERS = 4  # parallele Kopien über Dateisystemgrenzen
+
+def unique_target(target_dir: str, fname: str, taken: set) -> str:
+    """Zielpfad in target_dir, der weder existiert noch schon im Stapel vergeben ist."""
+    target = os.path.join(target_dir, fname)
+    if target not in taken and not os.path.exists(target):
+        return target
+    base, ext = os.path.splitext(fname)
+    ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    target = os.path.join(target_dir, f"{base}_{ts}{ext}")
+    n = 1
+    while target in taken or os.path.exists(target):
+        target = os.path.join(target_dir, f"{base}_{ts}_{n}{ext}")
+        n += 1
+    return target
+
+def plan_moves(paths: List[str], target_dir: str) -> List[Tuple[str, str]]:
+    """Ordnet jeder Quelle einen eindeutigen Zielpfad in target_dir zu."""
+    taken = set()
+    pairs = []
+    for src in paths:
+        dst = unique_target(target_dir, os.path.basename(src), taken)
+        taken.add(dst)
+        pairs.append((src, dst))
+    return pairs
+
+def _conflict(dst: str):
+    return FileExistsError(errno.EEXIST, "Konflikt: Ziel existiert bereits", dst)
+
+def rename_no_replace(src: str, dst: str):
+    """Verschiebt innerhalb eines Dateisystems, ohne ein vorhandenes Ziel zu überschreiben."""
+    try:
+        os.link(src, dst, follow_symlinks=False)  # schlägt atomar fehl, wenn dst existiert
+    except FileExistsError:
+        raise _conflict(dst)
+    except OSError:
+        # Ordner oder Dateisystem ohne harte Links: direkt vorher prüfen, dann umbenennen
+        if os.path.lexists(dst):
+            raise _conflict(dst)
+        os.rename(src, dst)
+        return
+    os.unlink(src)
+
+def move_batch(pairs: List[Tuple[str, str]],
+               progress: Callable[[int, int], None] = None,
+               workers: int = TRANSFER_WORKERS):
+    """
+    Führt alle (Quelle, Ziel)-Paare aus.
+    Liefert (verschoben, fehler) mit fehler als Liste von (Quelle, Fehlertext).
+    """
+    total = len(pairs)
+    moved, errors, slow = [], [], []
+    done = 0
+    dev_cache = {}
+
+    def dev(path):
+        d = os.path.dirname(os.path.abspath(path))
+        if d not in dev_cache:
+            dev_cache[d] = os.stat(d).st_dev
+        return dev_cache[d]
+
+    def report():
+        if progress is not None:
+            progress(done, total)
+
+    # 1. Gleiches Dateisystem: reine Umbenennungen, kein Datenkopieren
+    for src, dst in pairs:
+        try:
+            if dev(src) != dev(dst):
+                slow.append((src, dst))
+                continue
+            rename_no_replace(src, dst)
+            moved.append((src, dst))
+        except OSError as e:
+            errors.append((src, str(e)))
+        done += 1
+        if done % 100 == 0:
+            report()
+    report()
+
+    # 2. Über Dateisystemgrenzen: parallel kopieren und Quelle löschen
+    if slow:
+        def move_one(pair):
+            src, dst = pair
+            try:
+                if os.path.lexists(dst):
+                    raise _conflict(dst)
+                shutil.move(src, dst)
+                return pair, None
+            except Exception as e:
+                return pair, str(e)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for pair, err in pool.map(move_one, slow):
+                if err is None:
+                    moved.append(pair)
+                else:
+                    errors.append((pair[0], err))
+                done += 1
+                report()
+    return moved, errors
+
+def log_batch(moved, errors, label: str, context: str, typ: str = "INFO"):
+    """Ein gesammelter Log-Eintrag pro Stapel statt einer Datei-Öffnung pro Datei."""
+    log_events([f"{label}: {src} -> {dst}" for src, dst in moved], context, typ, print_console=False)
+    log_events([f"Fehler bei {label}: {src} ({err})" for src, err in errors], context, "ERROR", print_console=False)
+
+class TransferWorker(QThread):
+    """Führt move_batch im Hintergrund aus und meldet Fortschritt."""
+    progress = pyqtSignal(int, int)
+    transfer_done = pyqtSignal(list, list)
+
+    def __init__(self, pairs: List[Tuple[str, str]], parent=None):
+        super().__init__(parent)
+        self.pairs = pairs
+
+    def run(self):
+        moved, errors = move_batch(self.pairs, self.progress.emit)
+        self.transfer_done.emit(moved, errors)
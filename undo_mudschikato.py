@@ -11,6 +11,8 @@ from typing import Callable, Any, List
 class UndoAction:
     """
     Kapselt eine Aktion mit ihrem Undo-Callback und optionalen Metadaten.
+    Liefert der Callback einen Text, ersetzt dieser die Beschreibung in der Rückmeldung
+    (z. B. wenn das Undo verschoben werden musste).
     """
     def __init__(self, undo_func: Callable, description: str = "", meta: Any = None):
         self.undo_func = undo_func
@@ -19,7 +21,8 @@ class UndoAction:
 
     def undo(self):
         if callable(self.undo_func):
-            self.undo_func()
+            return self.undo_func()
+        return None
 
 class UndoManager:
     """
@@ -37,8 +40,8 @@ class UndoManager:
     def undo(self):
         if self.stack:
             last_action = self.stack.pop()
-            last_action.undo()
-            return last_action.description
+            msg = last_action.undo()
+            return last_action.description if msg is None else msg
         else:
             return "Nichts rückgängig zu machen!"
 
@@ -5,6 +5,7 @@ Mini-Wiki-/Info-Modul für Mudschikato.
 - Strukturiert nach Themen – Einträge – Details
 - Suchen, Hinzufügen, Bearbeiten, Löschen, Undo
 - Persistente Speicherung als wiki.json
+- Anzahl der Einträge wird an den Ereignis-Bus gemeldet (Dashboard)
 - Keine Codeeingabe für User
 """
 
@@ -15,6 +16,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 from undo_mudschikato import UndoManager, UndoAction
+from eventbus_mudschikato import WIKI_EINTRAEGE, get_bus
 
 WIKIFILE = "mudschikato_wiki.json"
 
@@ -72,7 +74,9 @@ class WikiWidget(QWidget):
         self.layout.addLayout(btn_ly)
 
         self.setLayout(self.layout)
+        self.bus = get_bus()
         self.data = self.load_wiki()
+        self.publish_count()
         self.refresh_themes()
     
     def load_wiki(self):
@@ -85,6 +89,10 @@ class WikiWidget(QWidget):
         # Struktur: {Thema: {Eintrag: Details}}
         return {}
     
+    def publish_count(self):
+        # Absolutwert aus den Daten im Speicher (z. B. nach Undo), sonst Deltas
+        self.bus.set(WIKI_EINTRAEGE, sum(len(entries) for entries in self.data.values()))
+
     def save_wiki(self):
         with open(WIKIFILE, "w", encoding="utf-8") as f:
             json.dump(self.data, f, indent=2)
@@ -126,12 +134,14 @@ class WikiWidget(QWidget):
         theme, ok = self.get_text("Neues Thema anlegen:", "Thema")
         if ok and theme:
             prev = dict(self.data)
+            self.bus.add(WIKI_EINTRAEGE, -len(self.data.get(theme, {})))
             self.data[theme] = {}
             self.save_wiki()
             self.refresh_themes()
             def undo():
                 self.data = prev
                 self.save_wiki()
+                self.publish_count()
                 self.refresh_themes()
             self.undo_manager.add(UndoAction(undo, description=f"Thema {theme} hinzugefügt"))
     
@@ -140,12 +150,14 @@ class WikiWidget(QWidget):
         if not theme:
             return
         prev = dict(self.data)
-        del self.data[theme]
+        removed = self.data.pop(theme)
         self.save_wiki()
+        self.bus.add(WIKI_EINTRAEGE, -len(removed))
         self.refresh_themes()
         def undo():
             self.data = prev
             self.save_wiki()
+            self.publish_count()
             self.refresh_themes()
         self.undo_manager.add(UndoAction(undo, description=f"Thema {theme} gelöscht"))
     
@@ -156,12 +168,15 @@ class WikiWidget(QWidget):
         entry, ok = self.get_text("Neuen Eintrag anlegen:", "Eintrag")
         if ok and entry:
             prev = dict(self.data)
+            if entry not in self.data[theme]:
+                self.bus.add(WIKI_EINTRAEGE, 1)
             self.data[theme][entry] = ""
             self.save_wiki()
             self.load_entries(self.themes_list.currentItem(), None)
             def undo():
                 self.data = prev
                 self.save_wiki()
+                self.publish_count()
                 self.load_entries(self.themes_list.currentItem(), None)
             self.undo_manager.add(UndoAction(undo, description=f"Eintrag {entry} hinzugefügt"))
     
@@ -173,10 +188,12 @@ class WikiWidget(QWidget):
         prev = dict(self.data)
         del self.data[theme][entry]
         self.save_wiki()
+        self.bus.add(WIKI_EINTRAEGE, -1)
         self.load_entries(self.themes_list.currentItem(), None)
         def undo():
             self.data = prev
             self.save_wiki()
+            self.publish_count()
             self.load_entries(self.themes_list.currentItem(), None)
         self.undo_manager.add(UndoAction(undo, description=f"Eintrag {entry} gelöscht"))
     